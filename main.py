@@ -1,25 +1,166 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from tkcalendar import DateEntry
-import json, csv, re, sys
+import json, csv, re, sys, heapq, bisect, itertools, queue, threading, gc
+import sqlite3, os, shutil, tempfile
 
 # import subprocess
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+from matplotlib.collections import PolyCollection
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+from matplotlib.patches import Patch
 from openpyxl import load_workbook
 from openpyxl.styles import Alignment
 from openpyxl.drawing.image import Image
 from pathlib import Path
+from abc import ABC, abstractmethod
 import hashlib, uuid
 import markdown, webbrowser
 
 __version__ = "1.0.1"
 
+# Plans at least this large use the NumPy task store for bulk queries
+COLUMNAR_MIN_TASKS = 5000
+
+# Parts listed in the Gantt legend before the rest are summarized
+LEGEND_MAX_PARTS = 30
+
+# Rows materialized as Tk items above and below the visible ones
+VIRTUAL_BUFFER_ROWS = 100
+
+# Typing pause (ms) before the table filter is applied
+FILTER_DELAY_MS = 150
+
+# Scroll pause (ms) after which blitted zooming ends with a full redraw
+ZOOM_SETTLE_MS = 200
+
+# Interval (ms) at which the UI collects rows parsed by the loader thread
+LOAD_POLL_MS = 50
+
+# CSV rows read and validated per batch
+LOAD_BATCH_ROWS = 1000
+
+# Bump when the layout of database snapshot files changes
+SNAPSHOT_VERSION = 3
+
+# File extensions opened as SQLite nomenclature databases rather than CSV
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Journal size at which saving folds the journal back into the CSV
+JOURNAL_COMPACT_BYTES = 1 << 20
+
+# Pause after the last save before the journal is folded into the CSV
+JOURNAL_COMPACT_DELAY_MS = 5000
+
+# Buffer of AtomicFile, so a large save reaches the disk in long sequential writes
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Positions in a nomenclature row of the columns checked on import
+ID_COLUMN = 0
+TIME_COLUMN = 4
+
+# Rejected rows listed per page of the import errors window
+ERROR_PAGE_ROWS = 500
+
+# Most suggestions an AutoCompleteEntry lists at once
+AUTOCOMPLETE_MAX_HITS = 50
+
+# Least share (0..1) of the typed trigrams a misspelled suggestion contains
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Most similar items re-ranked by edit distance per keystroke
+FUZZY_CANDIDATES = 200
+
+
+class AtomicFile:
+    """Writes a file through a temporary copy that replaces it only once complete"""
+
+    def __init__(self, file_path, mode="w", backup=False, **kwargs):
+        self.file_path = Path(file_path)
+        self.temp_path = None  # Unique per write, created beside the target
+        # The previous version, replaced on every save
+        self.backup_path = (
+            self.file_path.with_name(self.file_path.name + ".bak") if backup else None
+        )
+        self.mode = mode
+        self.kwargs = kwargs  # Passed on to open, e.g. encoding and newline
+        self.file = None
+
+    def __enter__(self):
+        # A unique name, so concurrent saves never share a temporary file and a
+        # user's own <name>.tmp is left alone
+        fd, temp_path = tempfile.mkstemp(
+            prefix=self.file_path.name + ".", suffix=".tmp", dir=self.file_path.parent
+        )
+        self.temp_path = Path(temp_path)
+        try:
+            self.file = os.fdopen(
+                fd, self.mode, buffering=WRITE_BUFFER_BYTES, **self.kwargs
+            )
+        except BaseException:
+            os.close(fd)
+            self.temp_path.unlink(missing_ok=True)
+            raise
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.file.flush()
+                os.fsync(self.file.fileno())  # On disk before the rename
+            self.file.close()
+        except BaseException:
+            self.discard()
+            raise
+        if exc_type is not None:
+            self.discard()
+            return False
+
+        if self.file_path.exists():
+            # mkstemp creates the file private; keep the permissions of the target
+            shutil.copymode(self.file_path, self.temp_path)
+            if self.backup_path is not None:
+                self.keep_backup()
+        self.temp_path.replace(self.file_path)  # Readers see the old or the new file
+        self.sync_directory()
+        return False
+
+    def sync_directory(self):
+        """Flush the directory entry of a rename to disk, where POSIX needs it"""
+        if os.name != "posix":
+            return
+        try:
+            fd = os.open(self.file_path.parent, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Some file systems cannot sync a directory; the file itself is saved
+            pass
+
+    def discard(self):
+        """Drop an unfinished temporary file; the target is left untouched"""
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        self.temp_path.unlink(missing_ok=True)
+
+    def keep_backup(self):
+        """Keep the current version as <name>.bak, linked rather than copied if possible"""
+        self.backup_path.unlink(missing_ok=True)
+        try:
+            os.link(self.file_path, self.backup_path)
+        except OSError:
+            shutil.copy2(self.file_path, self.backup_path)
+
 
 class LicenseChecker:
     def get_pc_id(self):
@@ -36,10 +177,127 @@ class LicenseChecker:
             return False
 
 
+class CompletionIndex:
+    """Sorted items and their trigram index, searched by AutoCompleteEntry
+
+    Holds no widgets, so a large one can be built on a worker thread.
+    """
+
+    def __init__(self):
+        self.items = []  # Items sorted case-insensitively
+        self.lowered = []  # Lowercase items, sorted the same way
+        self.joined = None  # lowered joined by newlines, for short values
+        self.starts = []  # Offset of each item of lowered in joined
+        self.slots = {}  # Item -> its slot in the trigram index
+        self.slot_items = []  # Item in each slot, None once freed
+        self.slot_lowered = []  # Lowercase item in each slot
+        self.free_slots = []
+        self.trigrams = {}  # Trigram or word signature -> slots of the items
+        self.postings = {}  # Index key -> its slots as an array, until they change
+
+    def update(self, added=(), removed=()):
+        """Add and remove items, keeping the sorted list and trigram index current"""
+        added = {item for item in added if item not in self.slots}
+        removed = {item for item in removed if item in self.slots}
+        if not added and not removed:
+            return
+        self.joined = None
+        for item in removed:
+            self.unindex_item(item)
+        for item in added:
+            self.index_item(item)
+        if len(added) + len(removed) > len(self.slots) // 100:
+            # Many changes are cheaper to sort afresh than to splice in
+            self.items = sorted(self.slots, key=str.lower)
+            self.lowered = [item.lower() for item in self.items]
+            return
+        for item in removed:
+            position = bisect.bisect_left(self.lowered, item.lower())
+            while self.items[position] != item:
+                position += 1
+            del self.items[position]
+            del self.lowered[position]
+        for item in added:
+            position = bisect.bisect_right(self.lowered, item.lower())
+            self.items.insert(position, item)
+            self.lowered.insert(position, item.lower())
+
+    def index_item(self, item):
+        """Give item a slot and add it to the postings of its index keys"""
+        if not self.free_slots:
+            self.free_slots.append(len(self.slot_items))
+            self.slot_items.append(None)
+            self.slot_lowered.append("")
+        slot = self.free_slots.pop()
+        keys = self.index_keys(item)
+        self.slots[item] = slot
+        self.slot_items[slot] = item
+        self.slot_lowered[slot] = item.lower()
+        for key in keys:
+            self.trigrams.setdefault(key, {})[slot] = None
+            self.postings.pop(key, None)
+
+    def unindex_item(self, item):
+        """Drop item from the postings of its index keys and free its slot"""
+        slot = self.slots.pop(item)
+        for key in self.index_keys(item):
+            slots = self.trigrams[key]
+            del slots[slot]
+            if not slots:
+                del self.trigrams[key]
+            self.postings.pop(key, None)
+        self.slot_items[slot] = None
+        self.slot_lowered[slot] = ""
+        self.free_slots.append(slot)
+
+    def index_keys(self, item):
+        """Trigrams and word signatures item is indexed under"""
+        return self.trigrams_of(item, padded=True) | self.signatures_of(item)
+
+    def posting(self, key):
+        """Slots of the items indexed under key as an array, kept until they change"""
+        slots = self.postings.get(key)
+        if slots is None:
+            slots = self.trigrams[key]
+            slots = self.postings[key] = np.fromiter(slots, np.int64, len(slots))
+        return slots
+
+    @staticmethod
+    def normalize(text):
+        """Lowercase letters and digits of text, without spaces and punctuation"""
+        return re.sub(r"[\W_]+", "", text.lower())
+
+    @classmethod
+    def trigrams_of(cls, text, padded=False):
+        """Set of 3-character substrings of the letters and digits of text"""
+        if not padded:
+            text = cls.normalize(text)
+            return {text[i : i + 3] for i in range(len(text) - 2)}
+        # Edge trigrams make a typo near either end cost fewer shared trigrams;
+        # each word gets its own, so a drawing number typed alone still matches
+        words = [word for word in map(cls.normalize, text.split()) if word]
+        text = f"  {''.join(words)} "
+        grams = {text[i : i + 3] for i in range(len(text) - 2)}
+        for word in words:
+            word = f"  {word} "
+            grams.update((word[:3], word[1:4], word[-3:]))
+        return grams
+
+    @classmethod
+    def signatures_of(cls, text):
+        """Sorted letters and digits of each word, kept when two of them swap"""
+        words = [word for word in map(cls.normalize, text.split()) if word]
+        return {"#" + "".join(sorted(word)) for word in words}
+
+
 class AutoCompleteEntry(tk.Entry):
-    def __init__(self, master=None, **kwargs):
+    def __init__(self, master=None, preferred=None, **kwargs):
         super().__init__(master, **kwargs)
-        self._completion_list = []
+        self.preferred = preferred  # Callable returning the items to list first
+        self._index = CompletionIndex()
+        self._build = None  # (worker thread, index it fills) while rebuilding
+        self._build_job = None
+        self._pending = []  # (added, removed) since the rebuild started
         self._hits = []
         self._hit_index = 0
 
@@ -52,7 +310,169 @@ class AutoCompleteEntry(tk.Entry):
         self.bind("<KeyRelease>", self.handle_keyrelease)
 
     def set_completion_list(self, completion_list):
-        self._completion_list = sorted(completion_list)
+        """Replace the items; the new index is built on a worker thread"""
+        items = list(completion_list)
+        if self._build is None and self._index.slots.keys() == set(items):
+            return
+        index = CompletionIndex()
+        # Indexing every part of a large nomenclature would stall the UI
+        thread = threading.Thread(target=index.update, args=(items,), daemon=True)
+        self._build = (thread, index)
+        self._pending = []
+        thread.start()
+        if self._build_job is None:
+            self._build_job = self.after(LOAD_POLL_MS, self.poll_build)
+
+    def poll_build(self):
+        """Swap in the rebuilt index once its worker is done"""
+        thread, index = self._build
+        if thread.is_alive():
+            self._build_job = self.after(LOAD_POLL_MS, self.poll_build)
+            return
+        self._build = None
+        self._build_job = None
+        # Changes made while it was built are applied to it as well
+        for added, removed in self._pending:
+            index.update(added, removed)
+        self._pending = []
+        self._index = index
+
+    def update_completions(self, added=(), removed=()):
+        """Add and remove a few items in place, as when one row changes"""
+        self._index.update(added, removed)
+        if self._build is not None:
+            self._pending.append((list(added), list(removed)))
+
+    def find_hits(self, value):
+        """Up to AUTOCOMPLETE_MAX_HITS items: prefix, substring, then fuzzy matches"""
+        index = self._index
+        value = value.lower()
+        hits = []
+        # Prefix matches are a contiguous run of the sorted list
+        position = bisect.bisect_left(index.lowered, value)
+        while (
+            position < len(index.lowered)
+            and len(hits) < AUTOCOMPLETE_MAX_HITS
+            and index.lowered[position].startswith(value)
+        ):
+            hits.append(index.items[position])
+            position += 1
+        tiers = [0] * len(hits)
+
+        grams = index.trigrams_of(value)
+        limit = AUTOCOMPLETE_MAX_HITS - len(hits)
+        if limit and grams:
+            # Only items containing the rarest trigram of value can contain value
+            slots = min((index.trigrams.get(gram, ()) for gram in grams), key=len)
+            lowered = index.slot_lowered
+            found = [
+                slot
+                for slot in slots
+                if value in lowered[slot] and not lowered[slot].startswith(value)
+            ]
+            # Slots are in no particular order; list the matches alphabetically
+            for slot in heapq.nsmallest(limit, found, key=lowered.__getitem__):
+                hits.append(index.slot_items[slot])
+                tiers.append(1)
+        elif limit:
+            # Too short for a trigram: search all items joined into one string
+            if index.joined is None:
+                index.joined = "\n".join(index.lowered)
+                lengths = (len(item) + 1 for item in index.lowered)
+                index.starts = [0, *itertools.accumulate(lengths)]
+            position = index.joined.find(value)
+            while position >= 0 and len(hits) < AUTOCOMPLETE_MAX_HITS:
+                number = bisect.bisect_right(index.starts, position) - 1
+                if position > index.starts[number]:
+                    hits.append(index.items[number])
+                    tiers.append(1)
+                position = index.joined.find(value, index.starts[number + 1])
+
+        if grams and len(hits) < AUTOCOMPLETE_MAX_HITS:
+            exclude = [index.slots[item] for item in hits]
+            fuzzy = self.fuzzy_hits(value, AUTOCOMPLETE_MAX_HITS - len(hits), exclude)
+            hits += [index.slot_items[slot] for slot in fuzzy]
+            tiers += [2] * len(fuzzy)
+
+        items = hits
+        preferred = self.preferred() if self.preferred else None
+        if preferred:
+            # Within each kind of match, preferred items come first
+            order = sorted(
+                range(len(items)), key=lambda i: (tiers[i], items[i] not in preferred)
+            )
+            items = [items[i] for i in order]
+        return items
+
+    def fuzzy_hits(self, value, limit, exclude):
+        """Slots of up to limit items containing the most trigrams of value"""
+        index = self._index
+        grams = index.trigrams_of(value, padded=True)
+        keys = [gram for gram in grams if gram in index.trigrams]
+        # A swap breaks up to three trigrams of a word, but keeps its signature
+        keys += 3 * [key for key in index.signatures_of(value) if key in index.trigrams]
+        if not keys:
+            return []
+        postings = [index.posting(key) for key in keys]
+        # Scored by the typed trigrams an item contains, whatever else it holds
+        shared = np.bincount(np.concatenate(postings), minlength=len(index.slot_items))
+        shared[exclude] = 0
+        if FUZZY_CANDIDATES < len(shared):
+            best = np.argpartition(-shared, FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]
+        else:
+            best = np.arange(len(shared))
+        least = FUZZY_MIN_SIMILARITY * len(grams)
+        best = [int(p) for p in best if shared[p] >= least]
+        if not best:
+            return []
+        # Trigrams shortlist the candidates; edit distance puts the closest first
+        items = [index.slot_items[p] for p in best]
+        distances = dict(zip(best, self.edit_distances(value, items)))
+        best.sort(key=lambda p: (distances[p], -shared[p], index.slot_lowered[p]))
+        return best[:limit]
+
+    @classmethod
+    def edit_distances(cls, value, items):
+        """Edits (insert, delete, replace, swap neighbours) from value to each item.
+
+        value may match any run of whole words of an item, as when just a
+        drawing number is typed. All items are computed at once, row by row.
+        """
+        a = CompletionIndex.normalize(value)
+        words = [
+            [CompletionIndex.normalize(word) for word in item.split()] for item in items
+        ]
+        width = max(sum(map(len, item_words)) for item_words in words)
+        text = "".join("".join(item_words).ljust(width, "\0") for item_words in words)
+        b = np.frombuffer(text.encode("utf-32-le"), np.uint32).reshape(
+            len(items), width
+        )
+        # Skipping whole words is free, skipping part of a word is not
+        lead = np.zeros((len(items), width + 1), dtype=int)
+        trail = np.full((len(items), width + 1), len(a) + width)
+        for row, item_words in enumerate(words):
+            start = trail[row, 0] = 0
+            for word in item_words:
+                end = start + len(word)
+                lead[row, start : end + 1] = np.arange(len(word) + 1)
+                trail[row, start + 1 : end + 1] = np.arange(len(word) - 1, -1, -1)
+                start = end
+
+        columns = np.arange(width + 1)
+        before, previous = None, lead
+        for i, char in enumerate(map(ord, a), 1):
+            current = np.empty_like(previous)
+            current[:, 0] = i
+            replaced = previous[:, :-1] + (b != char)
+            current[:, 1:] = np.minimum(replaced, previous[:, 1:] + 1)
+            if i > 1:
+                swap = (b[:, :-1] == char) & (b[:, 1:] == ord(a[i - 2]))
+                swapped = np.minimum(current[:, 2:], before[:, :-2] + 1)
+                current[:, 2:] = np.where(swap, swapped, current[:, 2:])
+            # Insertions carry each count rightwards at one edit per column
+            current = np.minimum.accumulate(current - columns, axis=1) + columns
+            before, previous = previous, current
+        return (previous + trail).min(axis=1)
 
     def handle_keyrelease(self, event):
         if event.keysym in (
@@ -74,9 +494,7 @@ class AutoCompleteEntry(tk.Entry):
             return
 
         # Search for matches anywhere in the string
-        self._hits = [
-            item for item in self._completion_list if value.lower() in item.lower()
-        ]
+        self._hits = self.find_hits(value)
 
         # Refresh the Listbox
         self.update_listbox()
@@ -100,6 +518,7 @@ class AutoCompleteEntry(tk.Entry):
         self.delete(0, tk.END)
         self.insert(0, selected)
         self.listbox.place_forget()  # Hide the list after selection
+        self.event_generate("<<AutoCompleteSelected>>")
 
     def on_listbox_keyrelease(self, event):
         if event.keysym == "Up":
@@ -147,11 +566,22 @@ class TimeSelector:
 
 class EditableTreeview(ttk.Treeview):
     def __init__(
-        self, parent, columns, valid_values=None, update_app=None, *args, **kwargs
+        self,
+        parent,
+        columns,
+        valid_values=None,
+        update_app=None,
+        on_row_change=None,
+        can_edit=None,
+        *args,
+        **kwargs,
     ):
         super().__init__(parent, columns=columns, show="headings", *args, **kwargs)
-        self.validator = Validator(valid_values or {})
+        # IDs are validated and sorted as integers
+        self.validator = Validator({"ID": "positive_integer", **(valid_values or {})})
         self.update_app = update_app
+        self.on_row_change = on_row_change
+        self.can_edit = can_edit  # Returns whether rows may change now, else warns
 
         for col in columns:
             self.heading(
@@ -160,9 +590,29 @@ class EditableTreeview(ttk.Treeview):
             self.column(col, width=100)
 
         self.data = []
+        self.row_indexes = {}  # Row ID -> index in self.data
+        self.view = []  # Indexes into self.data passing the filter, in display order
+        self.filter_text = ""
+        self.pending_filter = ""
+        self.filter_job = None
+        self.sort_columns = []  # (column index, reverse), most significant first
+        self.sort_keys = {}  # Column index -> typed sort keys of self.data
+        self.search_keys = {}  # Row -> lowercase text searched by the filter
+        self.row_tags = {}  # Row ID -> tags, kept across filtering and sorting
+        self.item_ids = {}  # Row ID -> Tk item currently showing the row
+        self.selected_ids = set()  # Selected row IDs, shown or not
+        # Only view[window_start:window_start + len(window_items)] exist as Tk items
+        self.window_start = 0
+        self.window_items = []
+        self.window_rows = []  # Indexes into self.data shown by window_items
+        self.first_row = 0  # View position shown at the top
+        self.page_rows = 50  # Rows fitting the viewport, measured on scrolling
+        self.scroll_job = None
+        self.yscrollcommand = None
+        super().configure(yscrollcommand=self.on_tk_scroll)
         self.columns_list = columns
-        self.id_counter = 1  # Counter for unique IDs
-        self.editing_entry = None
+        self.id_counter = 1  # Next free ID, only ever grows
+        self.editing_cell = None  # (Entry, row ID, column) of the open cell editor
         self.non_editable_columns = ["ID"]  # Columns that cannot be edited
         self.bind("<Double-1>", self.on_double_click)
         # Key bindings
@@ -174,6 +624,13 @@ class EditableTreeview(ttk.Treeview):
         self.bind("<Control-v>", self.cmd_paste)
         self.bind("<Control-x>", self.cmd_cut)
         self.bind("<Control-a>", self.cmd_select_all)
+        # Shift-click on a heading adds it as a secondary sort column
+        self.bind("<Shift-Button-1>", self.on_shift_click)
+        # The selection lives in the model; Tk only selects the shown rows
+        self.bind("<<TreeviewSelect>>", self.on_select)
+        self.bind("<Button-1>", self.on_click)
+        self.bind("<Up>", self.on_arrow_key)
+        self.bind("<Down>", self.on_arrow_key)
 
     def keypress(self, e):
         """Handle keyboard shortcuts for paste, copy, and cut"""
@@ -192,11 +649,12 @@ class EditableTreeview(ttk.Treeview):
         if isinstance(widget, tk.Entry) or isinstance(widget, tk.Text):
             widget.event_generate("<<Copy>>")
         elif isinstance(widget, EditableTreeview):
-            selected_item = self.selection()
-            if selected_item:
-                values = self.item(selected_item, "values")
+            rows = self.selected_rows()
+            if len(rows):
                 self.clipboard_clear()
-                self.clipboard_append("\t".join(values))
+                self.clipboard_append(
+                    "\n".join("\t".join(map(str, self.data[index])) for index in rows)
+                )
 
     def cmd_cut(self, event=None):
         """Cut handler"""
@@ -216,33 +674,53 @@ class EditableTreeview(ttk.Treeview):
         if isinstance(widget, tk.Entry) or isinstance(widget, tk.Text):
             widget.event_generate("<<SelectAll>>")
         elif isinstance(widget, EditableTreeview):
-            self.selection_set(self.get_children())
+            self.selected_ids = {str(self.data[index][0]) for index in self.view}
+            self.selection_set(self.window_items)
+
+    def editable(self):
+        """Whether the rows may be changed now; can_edit warns when not"""
+        return self.can_edit is None or self.can_edit()
 
     def on_double_click(self, event):
         selected_item = self.selection()
-        if selected_item:
+        if selected_item and self.editable():
             column = self.identify_column(event.x)
             col_index = int(column.replace("#", "")) - 1  # Column index
             col_name = self.columns_list[col_index]
 
             # Check whether the column is editable
             if col_name not in self.non_editable_columns:  # Only allow editable columns
-                self.edit_cell(selected_item, col_index)
+                self.edit_cell(selected_item[0], col_index)
 
     def edit_cell(self, item, col):
-        x, y, width, height = self.bbox(item, col)
+        # Scrolling may drop the item, so the editor follows the row ID instead
+        row_id = str(self.data[self.row_index(item)][0])
         cell_value = self.item(item, "values")[col]
+        self.cancel_edit()
 
         entry = tk.Entry(self)
         entry.insert(0, cell_value)
-        entry.place(x=x, y=y, width=width, height=height)
+        self.editing_cell = (entry, row_id, col)
+        self.place_editor()
 
         entry.focus()
-        entry.bind("<Return>", lambda event: self.save_cell(entry, item, col))
+        entry.bind("<Return>", lambda event: self.save_cell(entry, row_id, col))
         entry.bind("<FocusOut>", lambda event: self.cancel_edit(entry))
-        entry.bind("<Escape>", lambda event: self.cancel_edit(entry))
+        entry.bind("<Escape>", lambda event: self.cancel_edit(entry) or "break")
+
+    def place_editor(self):
+        """Keep the cell editor over its row; close it once the row is not shown"""
+        entry, row_id, col = self.editing_cell
+        item_id = self.item_ids.get(row_id)
+        exists = item_id is not None and self.exists(item_id)
+        bbox = self.bbox(item_id, col) if exists else ""
+        if not bbox:
+            self.cancel_edit(entry)
+            return
+        x, y, width, height = bbox
+        entry.place(x=x, y=y, width=width, height=height)
 
-    def save_cell(self, entry, item, col):
+    def save_cell(self, entry, row_id, col):
         if entry.winfo_exists():
             new_value = entry.get()
             column = self.columns_list[col]
@@ -252,100 +730,392 @@ class EditableTreeview(ttk.Treeview):
                 entry.focus_set()
                 return
 
-            if self.validator.validate_value(column, new_value):
-                self.item(item, values=self.get_values(item, col, new_value))
-            entry.destroy()
+            index = self.row_indexes.get(row_id)
+            if index is not None and self.validator.validate_value(column, new_value):
+                values = list(self.data[index])
+                values[col] = new_value
+                item_id = self.item_ids.get(row_id)
+                if item_id is not None and self.exists(item_id):
+                    self.item(item_id, values=values)
+                self.set_row(index, tuple(values))
+                self.notify_row_change(values[0], values)
+            self.cancel_edit(entry)
             if self.update_app:
                 self.update_app()
 
-    def cancel_edit(self, entry):
-        if entry.winfo_exists():
+    def cancel_edit(self, entry=None):
+        """Close the cell editor, or just entry if another one is open"""
+        if self.editing_cell is not None and entry in (None, self.editing_cell[0]):
+            entry = self.editing_cell[0]
+            self.editing_cell = None
+        if entry is not None and entry.winfo_exists():
             entry.destroy()
 
-    def get_values(self, item, col, new_value):
-        values = list(self.item(item, "values"))
-        values[col] = new_value
-        return values
-
     def get_column_values_by_index(self, column_index):
         # Collect all values from the specified column by its index
-        column_values = [
-            self.item(row_id, "values")[column_index] for row_id in self.get_children()
-        ]
-
-        return column_values
+        return [row[column_index] for row in self.data]
 
     def insert_data(self, data):
-        self.data = data
-        self.populate_data(self.data)
+        self.data = [tuple(row) for row in data]
+        self.index_rows()
+        # New IDs continue from the largest loaded one
+        self.id_counter = max((int(row[0]) for row in self.data), default=0) + 1
+        self.selected_ids.clear()
+        self.sort_keys.clear()
+        self.search_keys.clear()
+        self.refresh_view()
 
     def clear_data(self):
         self.delete(*self.get_children())
+        self.item_ids.clear()
+        self.window_start = 0
+        self.window_items = []
+        self.window_rows = []
 
-    def populate_data(self, data):
+    def clear_rows(self):
+        """Remove all rows from both the data and the view"""
+        self.data = []
+        self.row_indexes.clear()
+        self.id_counter = 1
+        self.row_tags.clear()
+        self.selected_ids.clear()
+        self.sort_keys.clear()
+        self.search_keys.clear()
+        self.refresh_view()
+
+    def index_rows(self):
+        """Map every row ID to its index in self.data"""
+        self.row_indexes = {str(row[0]): index for index, row in enumerate(self.data)}
+
+    def refresh_view(self, first=0):
+        """Re-apply the filter to self.data and redraw the visible rows"""
+        if self.filter_text:
+            self.view = [
+                index for index, row in enumerate(self.data) if self.matches_filter(row)
+            ]
+        else:
+            self.view = list(range(len(self.data)))
         self.clear_data()
-        for row in data:
-            self.insert("", "end", values=row)
+        self.show_rows(first)
+
+    def matches_filter(self, row):
+        """Check a row against the filter text"""
+        if not self.filter_text:
+            return True
+        return self.filter_text in self.search_key(row)
+
+    def search_key(self, row):
+        """Lowercase text of a row, computed once per row"""
+        key = self.search_keys.get(row)
+        if key is None:
+            key = "\0".join(str(value).lower() for value in row)
+            self.search_keys[row] = key
+        return key
+
+    def show_rows(self, first=None):
+        """Materialize the rows around view position first, reusing items kept in view"""
+        if first is None:
+            first = self.first_row
+        first = max(0, min(first, len(self.view) - self.page_rows))
+        start = max(0, first - VIRTUAL_BUFFER_ROWS)
+        end = min(len(self.view), first + self.page_rows + VIRTUAL_BUFFER_ROWS)
+
+        # Keep the items of rows still shown; both lists follow the order of self.data
+        rows = self.view[start:end]
+        shown = dict(zip(self.window_rows, self.window_items))
+        wanted = set(rows)
+        self.delete(*[item for row, item in shown.items() if row not in wanted])
+        items = [
+            shown[row] if row in shown else self.insert_row(row, position)
+            for position, row in enumerate(rows)
+        ]
+
+        self.window_start = start
+        self.window_items = items
+        self.window_rows = rows
+        self.first_row = first
+        if items:
+            self.yview_moveto((first - start) / len(items))
+        if self.editing_cell is not None:
+            self.place_editor()
+        self.update_scrollbar()
+
+    def insert_row(self, index, position="end"):
+        row = self.data[index]
+        row_id = str(row[0])
+        self.item_ids[row_id] = self.insert(
+            "", position, values=row, tags=self.row_tags.get(row_id, ())
+        )
+        if row_id in self.selected_ids:
+            self.selection_add(self.item_ids[row_id])
+        return self.item_ids[row_id]
+
+    def row_index(self, item):
+        """Index in self.data of the row shown by a Tk item, looked up by its ID"""
+        return self.row_indexes[str(self.item(item, "values")[0])]
+
+    def select_row(self, index):
+        """Scroll to the row self.data[index] and select it, if it passes the filter"""
+        position = bisect.bisect_left(self.view, index)
+        if position == len(self.view) or self.view[position] != index:
+            return
+        self.selected_ids = {str(self.data[index][0])}
+        self.show_rows(position - self.page_rows // 2)
+        item = self.window_items[position - self.window_start]
+        self.selection_set(item)
+        self.see(item)
+
+    def on_select(self, event=None):
+        """Mirror the Tk selection of the shown rows into selected_ids"""
+        selected = set(self.selection())
+        for row, item in zip(self.window_rows, self.window_items):
+            row_id = str(self.data[row][0])
+            if item in selected:
+                self.selected_ids.add(row_id)
+            else:
+                self.selected_ids.discard(row_id)
+
+    def on_click(self, event):
+        """A plain click on a row replaces the selection, scrolled-out rows included"""
+        if event.state & 0x5:  # Shift or Control extends the selection
+            return
+        if self.identify_region(event.x, event.y) in ("cell", "tree"):
+            self.deselect_hidden()
+
+    def on_arrow_key(self, event):
+        """Arrow keys move a single selection, like a plain click"""
+        self.deselect_hidden()
+
+    def deselect_hidden(self):
+        """Keep only the selected rows Tk shows; on_select takes it from there"""
+        shown = {str(self.data[row][0]) for row in self.window_rows}
+        self.selected_ids &= shown
+
+    def selected_rows(self):
+        """Indexes into self.data of the selected rows passing the filter, in order"""
+        selected = np.zeros(len(self.data), dtype=bool)
+        selected[[self.row_indexes[row_id] for row_id in self.selected_ids]] = True
+        shown = np.zeros(len(self.data), dtype=bool)
+        shown[self.view] = True
+        return np.flatnonzero(selected & shown)
+
+    def yview(self, *args):
+        """Scroll through the whole view; the scrollbar calls this like a native yview"""
+        if not args:
+            return self.scroll_fractions()
+        if args[0] == "moveto":
+            self.show_rows(round(float(args[1]) * len(self.view)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.page_rows if args[2] == "pages" else 1)
+            self.show_rows(self.first_row + step)
+
+    def configure(self, cnf=None, **kw):
+        # The scrollbar follows the whole view rather than the Tk items
+        if "yscrollcommand" in kw:
+            self.yscrollcommand = kw.pop("yscrollcommand")
+            self.update_scrollbar()
+        return super().configure(cnf, **kw)
+
+    config = configure
+
+    def on_tk_scroll(self, low, high):
+        """Follow native scrolling (wheel, keys) of the materialized rows"""
+        if self.window_items:
+            count = len(self.window_items)
+            self.page_rows = max(1, round((float(high) - float(low)) * count))
+            self.first_row = self.window_start + round(float(low) * count)
+        self.update_scrollbar()
+
+        # Extend the window before native scrolling reaches its edge
+        margin = VIRTUAL_BUFFER_ROWS // 2
+        window_end = self.window_start + len(self.window_items)
+        near_top = self.window_start > 0 and self.first_row < self.window_start + margin
+        near_bottom = (
+            window_end < len(self.view)
+            and self.first_row + self.page_rows > window_end - margin
+        )
+        if (near_top or near_bottom) and self.scroll_job is None:
+            self.scroll_job = self.after_idle(self.on_scroll_idle)
+
+    def on_scroll_idle(self):
+        self.scroll_job = None
+        self.show_rows()
+
+    def scroll_fractions(self):
+        if not self.view:
+            return 0.0, 1.0
+        total = len(self.view)
+        last = min(total, self.first_row + self.page_rows)
+        return self.first_row / total, last / total
+
+    def update_scrollbar(self):
+        if self.yscrollcommand:
+            self.yscrollcommand(*self.scroll_fractions())
+
+    def set_row_tags(self, row_id, tags):
+        """Set tags for a row, whether or not it is currently shown"""
+        if tags:
+            self.row_tags[row_id] = tags
+        else:
+            self.row_tags.pop(row_id, None)
+        item_id = self.item_ids.get(row_id)
+        if item_id is not None and self.exists(item_id):
+            self.item(item_id, tags=tags)
+
+    def notify_row_change(self, row_id, values):
+        """Report an added, edited (values) or deleted (None) row"""
+        if self.on_row_change:
+            self.on_row_change(str(row_id), values)
 
     def filter_rows(self, filter_text):
-        if not filter_text:
-            filtered_data = self.data
+        """Filter rows once typing pauses"""
+        self.pending_filter = filter_text.lower()
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        """Narrow or rebuild the view for the pending filter text"""
+        self.filter_job = None
+        text = self.pending_filter
+        if text == self.filter_text:
+            return
+        if text.startswith(self.filter_text):
+            # A longer filter can only drop rows from the current view
+            candidates = self.view
         else:
-            filtered_data = [
-                row
-                for row in self.data
-                if any(filter_text.lower() in str(value).lower() for value in row)
-            ]
-        self.populate_data(filtered_data)
+            candidates = range(len(self.data))
+        self.filter_text = text
+        self.view = [
+            index for index in candidates if self.matches_filter(self.data[index])
+        ]
+        self.show_rows(0)
 
     def sort_column(self, col, reverse):
-        data = [(self.item(k, "values"), k) for k in self.get_children("")]
-        data.sort(key=lambda x: x[0][self.columns_list.index(col)], reverse=reverse)
-
-        self.data = [x[0] for x in data]
-        self.populate_data(self.data)
+        """Sort by a single column"""
+        column_index = self.columns_list.index(col)
+        self.sort_columns = [(column_index, reverse)]
+        self.sort_data()
 
         self.heading(col, command=lambda: self.sort_column(col, not reverse))
 
-    def generate_unique_id(self):
-        existing_ids = [
-            int(self.item(row_id, "values")[0]) for row_id in self.get_children()
-        ]
-
-        # Generate a unique ID that is greater than the current maximum
-        if existing_ids:
-            return max(existing_ids) + 1
+    def on_shift_click(self, event):
+        """Add a heading to the sort, or flip its direction"""
+        if self.identify_region(event.x, event.y) != "heading":
+            return
+        column_index = int(self.identify_column(event.x).replace("#", "")) - 1
+        for position, (index, reverse) in enumerate(self.sort_columns):
+            if index == column_index:
+                self.sort_columns[position] = (index, not reverse)
+                break
         else:
-            return 1  # Start from 1 when there are no records
+            self.sort_columns.append((column_index, False))
+        self.sort_data()
+        return "break"
+
+    def sort_data(self):
+        """Stable sort of self.data by each sort column, least significant first"""
+        order = np.arange(len(self.data))
+        for column_index, reverse in reversed(self.sort_columns):
+            keys = self.column_sort_keys(column_index)[order]
+            if reverse and keys.dtype.kind == "f":
+                # Unparsable values are NaN, which stays last after negating
+                order = order[np.argsort(-keys, kind="stable")]
+            elif reverse:
+                # Descending, but rows with equal keys keep their order
+                order = order[::-1][np.argsort(keys[::-1], kind="stable")[::-1]]
+            else:
+                order = order[np.argsort(keys, kind="stable")]
+        self.data = [self.data[index] for index in order]
+        self.index_rows()
+        self.sort_keys = {
+            column_index: keys[order] for column_index, keys in self.sort_keys.items()
+        }
+        self.refresh_view(self.first_row)
+
+    def column_sort_keys(self, column_index):
+        """Sort keys of a column, parsed once until the data changes"""
+        if column_index not in self.sort_keys:
+            rows = range(len(self.data))
+            self.sort_keys[column_index] = self.rows_sort_keys(column_index, rows)
+        return self.sort_keys[column_index]
+
+    def rows_sort_keys(self, column_index, indexes):
+        """Sort keys of one column for the rows of self.data at indexes"""
+        column = self.columns_list[column_index]
+        values = [self.data[index][column_index] for index in indexes]
+        return self.validator.sort_keys(column, values)
+
+    def set_row(self, index, row):
+        """Replace self.data[index] and its entries in the cached sort keys"""
+        self.data[index] = row
+        for column_index, keys in self.sort_keys.items():
+            keys[index] = self.rows_sort_keys(column_index, [index])[0]
 
-    def add_row(self, row_data):
-        # Generate a unique ID
-        new_id = self.generate_unique_id()
-        row_data_with_id = [new_id] + row_data
-        self.data.append(tuple(row_data_with_id))
-        self.insert("", "end", values=row_data_with_id)
+    def generate_unique_id(self):
+        # IDs only grow, so the ID of a deleted row is never handed out again
+        new_id = self.id_counter
+        self.id_counter += 1
+        return new_id
+
+    def add_row(self, row_data, notify=True):
+        self.add_rows([row_data], notify)
+
+    def add_rows(self, rows, notify=True):
+        """Append rows under newly allocated IDs and redraw once"""
+        first = len(self.data)
+        for row_data in rows:
+            new_id = self.generate_unique_id()
+            self.data.append(tuple([new_id] + row_data))
+            self.row_indexes[str(new_id)] = len(self.data) - 1
+        added = range(first, len(self.data))
+        self.sort_keys = {
+            column_index: np.concatenate(
+                [keys, self.rows_sort_keys(column_index, added)]
+            )
+            for column_index, keys in self.sort_keys.items()
+        }
+        self.view.extend(
+            index for index in added if self.matches_filter(self.data[index])
+        )
+        self.show_rows()
+        if notify:
+            for index in added:
+                row = self.data[index]
+                self.notify_row_change(row[0], list(row))
 
     def delete_row(self, event=None):
-        selected_items = self.selection()
-        if selected_items:
+        rows = self.selected_rows()
+        if len(rows) and self.editable():
             confirm = messagebox.askyesno(
                 "Delete Confirmation",
                 "Are you sure you want to delete the selected rows?",
             )
             if confirm:
-                for item_id in selected_items:
-                    item_index = self.index(item_id)
-                    if 0 <= item_index < len(self.data):
-                        del self.data[item_index]
-                    self.delete(item_id)
+                # Drop all selected rows in a single pass over self.data
+                deleted = np.zeros(len(self.data), dtype=bool)
+                deleted[rows] = True
+                for index in rows:
+                    row_id = str(self.data[index][0])
+                    self.selected_ids.discard(row_id)
+                    self.item_ids.pop(row_id, None)
+                    self.row_tags.pop(row_id, None)
+                    self.notify_row_change(row_id, None)
+                self.data = [row for row, drop in zip(self.data, deleted) if not drop]
+                self.index_rows()
+                self.sort_keys = {
+                    column_index: keys[~deleted]
+                    for column_index, keys in self.sort_keys.items()
+                }
+                self.refresh_view(self.first_row)
 
     def on_edit_row(self, event=None):
-        selected_item = self.selection()
-        if not selected_item:
+        rows = self.selected_rows()
+        if not len(rows) or not self.editable():
             return
 
-        item_id = selected_item[0]
-        current_values = list(self.item(item_id, "values"))
+        current_values = list(self.data[rows[0]])
+        row_id = str(current_values[0])
 
         dialog = tk.Toplevel(self)
         dialog.resizable(False, False)
@@ -373,12 +1143,11 @@ class EditableTreeview(ttk.Treeview):
                 messagebox.showerror("Error", "None of the fields can be empty")
                 return
 
-            self.item(item_id, values=updated_values)
-            item_index = self.index(item_id)
-            if 0 <= item_index < len(self.data):
-                self.data[item_index] = tuple(updated_values)
-            else:
-                messagebox.showerror("Error", "Index is out of data list bounds.")
+            item_id = self.item_ids.get(row_id)
+            if item_id is not None and self.exists(item_id):
+                self.item(item_id, values=updated_values)
+            self.set_row(self.row_indexes[row_id], tuple(updated_values))
+            self.notify_row_change(updated_values[0], updated_values)
             dialog.destroy()
 
         ok_button = tk.Button(dialog, text="OK", command=on_ok)
@@ -427,6 +1196,1155 @@ class Validator:
 
         return True
 
+    def sort_keys(self, col, values):
+        """Sort keys for a column by its type; unparsable values are NaN"""
+        valid_type = self.valid_values.get(col)
+        values = pd.Series(values, dtype=str)
+        if valid_type == "datetime_format":
+            dates = pd.to_datetime(values, format="%d.%m.%Y %H:%M", errors="coerce")
+            keys = (dates - datetime(1970, 1, 1)).dt.total_seconds()
+        elif valid_type in ("positive_decimal", "positive_integer"):
+            keys = pd.to_numeric(values.str.replace(",", "."), errors="coerce")
+        else:
+            # Object dtype keeps whole strings: a fixed-width "<U" array
+            # would truncate a longer value written into it by set_row
+            return values.to_numpy(dtype=object, copy=True)
+        return keys.to_numpy(dtype=float, copy=True)
+
+
+class Task:
+    __slots__ = (
+        "id",
+        "detail",
+        "setup",
+        "machine",
+        "quantity",
+        "time_per_unit",
+        "start",
+        "end",
+    )
+
+    def __init__(self, id, detail, setup, machine, quantity, time_per_unit, start, end):
+        self.id = id
+        self.detail = detail
+        self.setup = setup
+        self.machine = machine
+        self.quantity = quantity
+        self.time_per_unit = time_per_unit
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_values(cls, values):
+        """Parse a task table row (strings) into a Task"""
+        id, detail, setup, machine, quantity, time_per_unit, start, end = values
+        return cls(
+            str(id),
+            detail,
+            setup,
+            machine,
+            int(quantity),
+            float(str(time_per_unit).replace(",", ".")),
+            datetime.strptime(start, "%d.%m.%Y %H:%M"),
+            datetime.strptime(end, "%d.%m.%Y %H:%M"),
+        )
+
+
+class ConflictDetector:
+    def __init__(self, min_overlap=timedelta(seconds=30)):
+        self.min_overlap = min_overlap
+
+    def group_by_machine(self, records):
+        """Group record indexes by machine, each group sorted by start time"""
+        machines = {}
+        for index, (machine, start, end) in enumerate(records):
+            machines.setdefault(machine, []).append((start, end, index))
+        for tasks in machines.values():
+            tasks.sort()
+        return machines
+
+    def find_pairs(self, records):
+        """Return sorted (i, j) index pairs of records that overlap on one machine.
+
+        records is a sequence of (machine, start, end) tuples.
+        """
+        pairs = []
+        for tasks in self.group_by_machine(records).values():
+            active = []  # Heap of (end, index) for tasks still running
+            for start, end, index in tasks:
+                threshold = start + self.min_overlap
+                # Tasks ending before the threshold cannot overlap any later task
+                while active and active[0][0] < threshold:
+                    heapq.heappop(active)
+                if end < threshold:
+                    continue  # Too short to overlap anything by min_overlap
+                for _, other in active:
+                    pairs.append((min(index, other), max(index, other)))
+                heapq.heappush(active, (end, index))
+        pairs.sort()
+        return pairs
+
+    def find_conflicting(self, records):
+        """Return the set of record indexes involved in at least one conflict"""
+        conflicting = set()
+        for tasks in self.group_by_machine(records).values():
+            active = []  # Heap of (end, index) for tasks still running
+            unmarked = []  # Active tasks not yet known to be in conflict
+            for start, end, index in tasks:
+                threshold = start + self.min_overlap
+                while active and active[0][0] < threshold:
+                    heapq.heappop(active)
+                if end < threshold:
+                    continue
+                if active:
+                    # Every remaining active task overlaps this one
+                    conflicting.add(index)
+                    conflicting.update(
+                        other for other_end, other in unmarked if other_end >= threshold
+                    )
+                    unmarked = []
+                else:
+                    unmarked = [(end, index)]
+                heapq.heappush(active, (end, index))
+        return conflicting
+
+
+class IntervalIndex:
+    def __init__(self, min_overlap=timedelta(seconds=30)):
+        self.min_overlap = min_overlap
+        self.intervals = {}  # key -> (machine, start, end)
+        self.starts = {}  # machine -> sorted start times
+        self.entries = {}  # machine -> (start, end, key) sorted like starts
+        self.durations = {}  # machine -> sorted durations of its intervals
+
+    def __contains__(self, key):
+        return key in self.intervals
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def clear(self):
+        self.intervals.clear()
+        self.starts.clear()
+        self.entries.clear()
+        self.durations.clear()
+
+    def add(self, key, machine, start, end):
+        """Insert an interval, replacing any previous one with the same key"""
+        if key in self.intervals:
+            self.remove(key)
+        entries = self.entries.setdefault(machine, [])
+        position = bisect.bisect_left(entries, (start, end, key))
+        entries.insert(position, (start, end, key))
+        self.starts.setdefault(machine, []).insert(position, start)
+        self.intervals[key] = (machine, start, end)
+        bisect.insort(self.durations.setdefault(machine, []), end - start)
+
+    def remove(self, key):
+        machine, start, end = self.intervals.pop(key)
+        entries = self.entries[machine]
+        position = bisect.bisect_left(entries, (start, end, key))
+        del entries[position]
+        del self.starts[machine][position]
+        durations = self.durations[machine]
+        del durations[bisect.bisect_left(durations, end - start)]
+
+    def longest(self, machine):
+        """Longest interval currently on machine; shrinks as intervals are removed"""
+        # Intervals shorter than min_overlap never conflict, so it is a safe floor
+        durations = self.durations.get(machine)
+        return max(durations[-1], self.min_overlap) if durations else self.min_overlap
+
+    def overlapping(self, machine, start, end, exclude=None):
+        """Return keys of intervals on machine overlapping [start, end] by min_overlap"""
+        if end - start < self.min_overlap or machine not in self.starts:
+            return []
+        starts = self.starts[machine]
+        entries = self.entries[machine]
+        # Only intervals starting within this window can overlap long enough
+        longest = self.longest(machine)
+        low = bisect.bisect_left(starts, start - longest)
+        high = bisect.bisect_right(starts, end - self.min_overlap)
+        return [
+            other
+            for other_start, other_end, other in entries[low:high]
+            if other != exclude
+            and min(end, other_end) - max(start, other_start) >= self.min_overlap
+        ]
+
+    def in_range(self, machine, start, end):
+        """Return keys of intervals on machine intersecting [start, end]"""
+        if machine not in self.starts:
+            return []
+        starts = self.starts[machine]
+        entries = self.entries[machine]
+        longest = self.longest(machine)
+        low = bisect.bisect_left(starts, start - longest)
+        high = bisect.bisect_right(starts, end)
+        return [key for _, other_end, key in entries[low:high] if other_end >= start]
+
+    def at(self, machine, moment):
+        """Return the key of an interval on machine containing moment, or None"""
+        if machine not in self.starts:
+            return None
+        starts = self.starts[machine]
+        entries = self.entries[machine]
+        longest = self.longest(machine)
+        low = bisect.bisect_left(starts, moment - longest)
+        high = bisect.bisect_right(starts, moment)
+        # The latest start is drawn on top, so it wins
+        for _, end, key in reversed(entries[low:high]):
+            if end >= moment:
+                return key
+        return None
+
+    def conflicts(self, key):
+        """Return keys of intervals conflicting with the interval stored under key"""
+        machine, start, end = self.intervals[key]
+        return self.overlapping(machine, start, end, exclude=key)
+
+
+class TaskColumns:
+    """Columnar NumPy copy of the tasks for whole-plan queries such as conflicts
+
+    Time-range queries are answered by IntervalIndex instead: it is kept
+    current between edits, while a mask over these columns would need the
+    whole copy rebuilt after every change.
+    """
+
+    def __init__(self, tasks, machines=()):
+        tasks = list(tasks)
+        self.ids = [task.id for task in tasks]
+        # pandas converts datetime lists far faster than np.array does
+        self.starts = self.to_minutes([task.start for task in tasks])
+        self.ends = self.to_minutes([task.end for task in tasks])
+
+        # Intern machines (known machines keep their position) and parts
+        self.machines = list(machines)
+        machine_codes = {machine: code for code, machine in enumerate(self.machines)}
+        for task in tasks:
+            if task.machine not in machine_codes:
+                machine_codes[task.machine] = len(self.machines)
+                self.machines.append(task.machine)
+        self.machine_codes = np.array(
+            [machine_codes[task.machine] for task in tasks], dtype=np.int32
+        )
+        part_codes = {}
+        self.part_codes = np.array(
+            [part_codes.setdefault(task.detail, len(part_codes)) for task in tasks],
+            dtype=np.int32,
+        )
+        self.parts = list(part_codes)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def to_minutes(values):
+        return pd.to_datetime(values).values.astype("datetime64[m]")
+
+    def machine_view(self, code):
+        """Indexes of one machine's tasks sorted by start time"""
+        indexes = np.flatnonzero(self.machine_codes == code)
+        return indexes[np.argsort(self.starts[indexes], kind="stable")]
+
+    def conflict_mask(self, min_overlap=timedelta(seconds=30)):
+        """Mask of tasks overlapping another task on the same machine"""
+        mask = np.zeros(len(self), dtype=bool)
+        min_overlap = min_overlap / timedelta(minutes=1)
+        for code in np.unique(self.machine_codes):
+            indexes = self.machine_view(code)
+            starts = self.starts[indexes].astype(np.int64)
+            ends = self.ends[indexes].astype(np.int64)
+
+            # A task conflicts with an earlier one if the longest earlier end
+            # reaches min_overlap past its start
+            conflicts = np.zeros(len(indexes), dtype=bool)
+            previous_end = np.maximum.accumulate(ends)[:-1]
+            conflicts[1:] = (
+                np.minimum(previous_end, ends[1:]) - starts[1:] >= min_overlap
+            )
+
+            # ...and with a later one if a long enough later task starts
+            # min_overlap before its end
+            long_starts = np.where(
+                ends - starts >= min_overlap, starts, np.iinfo(np.int64).max
+            )
+            next_start = np.minimum.accumulate(long_starts[::-1])[::-1][1:]
+            conflicts[:-1] |= next_start <= ends[:-1] - min_overlap
+
+            mask[indexes] = conflicts
+        return mask
+
+
+class GanttChart:
+    def __init__(self, ax, canvas, tasks, task_index):
+        self.ax = ax
+        self.canvas = canvas
+        self.tasks = tasks  # Task ID -> Task, shared with the App
+        self.task_index = task_index  # IntervalIndex over the same tasks
+        self.machines = []
+        self.lanes = {}  # Machine -> PolyCollection drawing its bars
+        self.lane_keys = {}  # Machine -> task IDs drawn in the lane
+        self.lane_parts = {}  # Machine -> parts drawn in the lane
+        self.task_lanes = {}  # Task ID -> machine lane it is drawn in
+        self.part_colors = {}
+        self.span = None  # Drawn x-range, wider than the view
+        self.legend_parts = None
+        self.dirty = False
+        self.background = None  # Figure without bars and x-axis, cached while scrolling
+        self.hover_key = None  # Task ID under the cursor
+        self.hover_background = None  # Figure without the tooltip
+
+        self.ax.xaxis_date()
+        self.ax.set_xlabel("")
+        self.ax.xaxis.grid(False)
+        self.ax.yaxis.grid(False)
+        for spine in self.ax.spines.values():
+            spine.set_visible(False)
+        self.ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
+        self.tooltip = self.ax.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(12, 12),
+            textcoords="offset points",
+            fontsize="small",
+            bbox=dict(boxstyle="round", facecolor="lightyellow", alpha=0.9),
+            visible=False,
+            animated=True,
+        )
+
+    def set_machines(self, machines):
+        """Create one lane per machine; existing lanes are kept if unchanged"""
+        if list(machines) == self.machines:
+            return
+        for lane in self.lanes.values():
+            lane.remove()
+        self.machines = list(machines)
+        self.lanes = {}
+        self.lane_keys = {}
+        self.lane_parts = {}
+        self.task_lanes = {}
+        for machine in self.machines:
+            lane = PolyCollection([], edgecolors="none")
+            self.ax.add_collection(lane, autolim=False)
+            self.lanes[machine] = lane
+        self.ax.set_yticks(range(len(self.machines)))
+        self.ax.set_yticklabels(self.machines)
+        self.ax.set_ylim(-0.5, len(self.machines) - 0.5)
+        self.refresh()
+
+    def set_view(self, min_dt, max_dt):
+        self.ax.set_xlim([min_dt, max_dt])
+        self.dirty = True
+
+    def part_color(self, part):
+        """Color per part; golden-ratio hues stay stable as parts are added"""
+        if part not in self.part_colors:
+            hue = (len(self.part_colors) * 0.618033988749895) % 1
+            self.part_colors[part] = mcolors.hsv_to_rgb((hue, 0.8, 0.8))
+        return self.part_colors[part]
+
+    def on_xlim_changed(self, ax):
+        """Re-query the visible tasks after zooming or panning"""
+        if self.update_span() and self.background is None:
+            self.canvas.draw_idle()
+
+    def update_span(self):
+        """Redraw all lanes when the view leaves the drawn span.
+
+        Half a window of margin is drawn on each side; returns False when the
+        bars already drawn still cover the view.
+        """
+        xmin, xmax = self.ax.get_xlim()
+        width = xmax - xmin
+        if self.span is not None:
+            span_min, span_max = self.span
+            covered = span_min <= xmin and xmax <= span_max
+            if covered and width * 4 >= span_max - span_min:
+                return False
+
+        self.span = (xmin - width / 2, xmax + width / 2)
+        self.redraw_lanes(self.machines)
+        return True
+
+    def refresh(self):
+        """Redraw every lane, e.g. after the whole plan was replaced"""
+        self.span = None
+        self.update_span()
+
+    def update_tasks(self, keys):
+        """Patch the lanes showing the given added, moved or deleted tasks"""
+        machines = set()
+        for key in keys:
+            if key in self.task_lanes:
+                machines.add(self.task_lanes[key])
+            task = self.tasks.get(key)
+            if task is not None:
+                machines.add(task.machine)
+        self.redraw_lanes([machine for machine in self.machines if machine in machines])
+
+    def redraw_lanes(self, machines):
+        """Rebuild the bars of the given lanes for the drawn span"""
+        if self.span is None:
+            return
+        start = mdates.num2date(self.span[0]).replace(tzinfo=None)
+        end = mdates.num2date(self.span[1]).replace(tzinfo=None)
+
+        for machine in machines:
+            for key in self.lane_keys.get(machine, ()):
+                self.task_lanes.pop(key, None)
+
+            keys = self.task_index.in_range(machine, start, end)
+            tasks = [self.tasks[key] for key in keys]
+            verts = np.empty((len(tasks), 4, 2))
+            if tasks:
+                left = mdates.date2num([task.start for task in tasks])
+                width = [(task.end - task.start) / timedelta(days=1) for task in tasks]
+                bottom = self.machines.index(machine) - 0.4
+                verts[:, :2, 0] = left[:, None]
+                verts[:, 2:, 0] = (left + width)[:, None]
+                verts[:, [0, 3], 1] = bottom
+                verts[:, [1, 2], 1] = bottom + 0.8
+
+            colors = [self.part_color(task.detail) for task in tasks]
+            lane = self.lanes[machine]
+            lane.set_verts(verts)
+            lane.set_facecolor(np.array(colors).reshape(-1, 3))
+            self.lane_keys[machine] = keys
+            self.lane_parts[machine] = dict.fromkeys(task.detail for task in tasks)
+            for key in keys:
+                self.task_lanes[key] = machine
+
+        self.update_legend()
+        self.dirty = True
+
+    def update_legend(self):
+        """List the parts in view rather than every task"""
+        visible_parts = {}
+        for parts in self.lane_parts.values():
+            visible_parts.update(parts)
+        if list(visible_parts) == self.legend_parts or self.background is not None:
+            return  # While blitting, the legend is part of the cached background
+        self.legend_parts = list(visible_parts)
+
+        legend_handles = [
+            Patch(color=self.part_color(part), label=part)
+            for part in list(visible_parts)[:LEGEND_MAX_PARTS]
+        ]
+        if len(visible_parts) > LEGEND_MAX_PARTS:
+            hidden = len(visible_parts) - LEGEND_MAX_PARTS
+            legend_handles.append(Patch(color="none", label=f"... and {hidden} more"))
+
+        if legend_handles:
+            self.ax.legend(
+                handles=legend_handles,
+                loc="upper left",
+                bbox_to_anchor=(1, 1),
+                fontsize="small",
+            )
+        elif self.ax.get_legend():
+            self.ax.get_legend().remove()
+
+    def task_at(self, x, y):
+        """Return the task drawn at data coordinates (x, y), or None"""
+        lane = round(y)
+        if not 0 <= lane < len(self.machines) or abs(y - lane) > 0.4:
+            return None
+        moment = mdates.num2date(x).replace(tzinfo=None)
+        return self.tasks.get(self.task_index.at(self.machines[lane], moment))
+
+    def on_draw(self, event):
+        """Cache the backgrounds for blitting after every full redraw"""
+        if self.background is not None:
+            # The toolbar redraws while panning; the animated bars are left out
+            self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+            for artist in self.animated_artists():
+                self.ax.draw_artist(artist)
+            return
+        self.hover_background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        if self.tooltip.get_visible():
+            self.ax.draw_artist(self.tooltip)
+
+    def on_motion(self, event):
+        """Show a tooltip for the bar under the cursor"""
+        if self.background is not None or self.hover_background is None:
+            return
+        task = None
+        if event.inaxes is self.ax:
+            task = self.task_at(event.xdata, event.ydata)
+        key = task.id if task is not None else None
+        if key == self.hover_key:
+            return
+        self.hover_key = key
+
+        if task is not None:
+            # Open the tooltip towards the middle so it stays inside the figure
+            left = event.x < self.ax.bbox.x0 + self.ax.bbox.width / 2
+            self.tooltip.xy = (event.xdata, event.ydata)
+            self.tooltip.set_text(self.format_tooltip(task))
+            self.tooltip.set_position((12 if left else -12, 12))
+            self.tooltip.set_horizontalalignment("left" if left else "right")
+        self.tooltip.set_visible(task is not None)
+
+        self.canvas.restore_region(self.hover_background)
+        self.ax.draw_artist(self.tooltip)
+        self.canvas.blit(self.ax.figure.bbox)
+
+    def format_tooltip(self, task):
+        """Tooltip text for a task"""
+        return "\n".join(
+            [
+                f"Part: {task.detail}",
+                f"Setup: {task.setup}",
+                f"Qty: {task.quantity}",
+                f"Start: {task.start:%d.%m.%Y %H:%M}",
+                f"End: {task.end:%d.%m.%Y %H:%M}",
+            ]
+        )
+
+    def start_blit(self):
+        """Cache everything but the bars and the x-axis for fast redraws"""
+        if self.background is not None:
+            return
+        self.tooltip.set_visible(False)
+        self.hover_key = None
+        for artist in self.animated_artists():
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        self.hover_background = None
+
+    def blit(self):
+        """Redraw only the bars and the x-axis over the cached background"""
+        self.start_blit()
+        self.canvas.restore_region(self.background)
+        for artist in self.animated_artists():
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.figure.bbox)
+
+    def stop_blit(self):
+        """Return to normal drawing with one full redraw"""
+        if self.background is None:
+            return
+        for artist in self.animated_artists():
+            artist.set_animated(False)
+        self.background = None
+        self.update_legend()
+        self.dirty = True
+        self.flush()
+
+    def animated_artists(self):
+        return [*self.lanes.values(), self.ax.xaxis]
+
+    def flush(self):
+        """Schedule a single redraw once a change is complete"""
+        if self.dirty and self.background is None:
+            self.dirty = False
+            self.ax.axis("on" if self.tasks else "off")
+            self.canvas.draw_idle()
+
+
+class BackgroundLoader(ABC):
+    """Reads and validates database rows on a worker thread, handing batches to the UI"""
+
+    def __init__(self, validate, prepare=None):
+        self.validate = validate  # validate(rows, offset) -> (valid rows, errors)
+        # prepare(valid rows) runs on the worker once all are read, into prepared
+        self.prepare = prepare
+        # (valid rows, errors, rows read, progress) per batch, then None or an error
+        self.batches = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.valid_data = []
+        self.errors = []
+        self.rows_read = 0
+        self.progress = 0.0  # Share of the file collected so far, from 0 to 1
+        self.prepared = None  # What prepare returned, set before the queue ends
+        self.done = False
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        """Ask the worker to stop after its current batch"""
+        self.cancelled.set()
+
+    @abstractmethod
+    def read_batches(self):
+        """Yield (rows, progress) until the source is exhausted; runs on the worker"""
+
+    def run(self):
+        """Worker thread: read batches until the source ends or loading is cancelled"""
+        batches = self.read_batches()
+        try:
+            rows_read = 0
+            valid_rows = []
+            for rows, progress in batches:
+                if self.cancelled.is_set():
+                    break
+                valid_data, errors = self.validate(rows, rows_read)
+                rows_read += len(rows)
+                valid_rows += valid_data
+                self.batches.put((valid_data, errors, len(rows), progress))
+            self.finish(valid_rows)
+        except Exception as e:
+            self.batches.put(e)
+        finally:
+            batches.close()
+
+    def finish(self, valid_data):
+        """Worker thread: prepare the rows read, then mark the end of the queue"""
+        if self.prepare is not None and not self.cancelled.is_set():
+            self.prepared = self.prepare(valid_data)
+        self.batches.put(None)
+
+    def collect(self):
+        """Take the batches parsed so far on the Tk thread; True once all are in"""
+        while not self.done:
+            try:
+                batch = self.batches.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+            if batch is None:
+                self.done = True
+                self.progress = 1.0
+                break
+            valid_data, errors, rows_read, progress = batch
+            self.valid_data.extend(valid_data)
+            self.errors.extend(errors)
+            self.rows_read += rows_read
+            self.progress = min(1.0, progress)
+        return self.done
+
+
+class CsvLoader(BackgroundLoader):
+    """Parses a CSV database on a worker thread"""
+
+    def __init__(
+        self, file_path, delimiter, encoding, validate, prepare=None, snapshot=None
+    ):
+        super().__init__(validate, prepare)
+        self.snapshot = snapshot  # DatabaseSnapshot read before parsing, or None
+        # Checked here so a missing file is reported before the thread starts
+        if not file_path.is_file():
+            raise FileNotFoundError(file_path)
+        self.file_path = file_path
+        self.encoding = encoding
+        self.delimiter = delimiter
+
+    def run(self):
+        """Worker thread: reuse the snapshot of an unchanged file, else parse it"""
+        # A journal of this file still being folded in would rewrite it under us
+        ChangeJournal.wait_for(self.file_path)
+        cached = self.snapshot.read() if self.snapshot is not None else None
+        if cached is None:
+            super().run()
+            return
+        valid_data, errors = cached
+        self.batches.put((valid_data, errors, len(valid_data) + len(errors), 1.0))
+        try:
+            self.finish(valid_data)
+        except Exception as e:
+            self.batches.put(e)
+
+    def read_batches(self):
+        with self.file_path.open(newline="", encoding=self.encoding) as file:
+            size = max(1, os.fstat(file.fileno()).st_size)
+            reader = csv.reader(file, delimiter=self.delimiter)
+            next(reader, None)  # Skip header
+            while True:
+                batch = list(itertools.islice(reader, LOAD_BATCH_ROWS))
+                rows = [row for row in batch if row]  # Skip empty rows
+                yield rows, file.buffer.tell() / size
+                if len(batch) < LOAD_BATCH_ROWS:
+                    break
+
+
+class SqliteLoader(BackgroundLoader):
+    """Reads the nomenclature table of a SQLite database on a worker thread"""
+
+    def __init__(self, file_path, validate, prepare=None):
+        super().__init__(validate, prepare)
+        # sqlite3 would quietly create a missing file, so check it up front
+        if not file_path.is_file():
+            raise FileNotFoundError(file_path)
+        self.file_path = file_path
+
+    def read_batches(self):
+        # A connection may only be used by the thread that opened it
+        connection = sqlite3.connect(self.file_path)
+        try:
+            count = connection.execute("SELECT COUNT(*) FROM nomenclature")
+            total = max(1, count.fetchone()[0])
+            cursor = connection.execute(
+                "SELECT id, part, setup, machine, time_per_unit"
+                " FROM nomenclature ORDER BY id"
+            )
+            rows_read = 0
+            while True:
+                batch = cursor.fetchmany(LOAD_BATCH_ROWS)
+                rows_read += len(batch)
+                yield [[str(row[0]), *row[1:]] for row in batch], rows_read / total
+                if len(batch) < LOAD_BATCH_ROWS:
+                    break
+        finally:
+            connection.close()
+
+
+class NomenclatureIndex:
+    """Nomenclature rows by (part, setup, machine), with the part counts suggested
+
+    Holds no widgets, so a loaded table is indexed on the loader's worker thread.
+    """
+
+    def __init__(self, rows=()):
+        self.keys = {}  # (part, setup, machine) -> nomenclature row IDs
+        self.rows = {}  # Nomenclature row ID -> its (part, setup, machine)
+        self.detail_counts = {}  # Part -> number of its nomenclature keys
+        self.details_by_context = {}  # (setup, machine) -> part counts, "" for any
+        for row in rows:
+            self.index_row(str(row[0]), row)
+
+    @staticmethod
+    def key(values):
+        """(part, setup, machine) of a nomenclature row"""
+        return tuple(str(value).strip() for value in values[1:4])
+
+    def index_row(self, row_id, values):
+        """Keep the index in step with one row; values is None once it is deleted"""
+        key = self.rows.pop(row_id, None)
+        if key is not None:
+            row_ids = self.keys[key]
+            del row_ids[row_id]
+            if not row_ids:
+                del self.keys[key]
+                self.count_detail(key, -1)
+        if values is not None:
+            key = self.key(values)
+            self.rows[row_id] = key
+            if key not in self.keys:
+                self.count_detail(key, 1)
+            self.keys.setdefault(key, {})[row_id] = None
+
+    def count_detail(self, key, step):
+        """Count a (part, setup, machine) key in (1) or out (-1) of the part counts"""
+        part, setup, machine = key
+        contexts = ((setup, machine), (setup, ""), ("", machine))
+        counts = [self.detail_counts]
+        counts += [
+            self.details_by_context.setdefault(context, {}) for context in contexts
+        ]
+        for parts in counts:
+            parts[part] = parts.get(part, 0) + step
+            if not parts[part]:
+                del parts[part]
+
+    def find(self, detail, setup, machine):
+        """ID of the matching row, or None"""
+        row_ids = self.keys.get((detail, setup, machine))
+        if not row_ids:
+            return None
+        # Duplicates are kept in insertion order; the earliest one is reported
+        return next(iter(row_ids))
+
+
+class NomenclatureDatabase:
+    """SQLite storage for the nomenclature; a save writes only the changed rows"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS nomenclature (
+            id INTEGER PRIMARY KEY,
+            part TEXT NOT NULL,
+            setup TEXT NOT NULL,
+            machine TEXT NOT NULL,
+            time_per_unit TEXT NOT NULL
+        );
+        -- Also serves lookups by part alone, as its leftmost column
+        CREATE INDEX IF NOT EXISTS nomenclature_key
+            ON nomenclature (part, setup, machine);
+        CREATE INDEX IF NOT EXISTS nomenclature_machine ON nomenclature (machine);
+    """
+
+    def __init__(self, file_path):
+        self.file_path = Path(file_path)
+        self.connection = sqlite3.connect(self.file_path)
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    @staticmethod
+    def record(values):
+        """(id, part, setup, machine, time_per_unit) parameters of a table row"""
+        fields = (*map(str, values[1:5]),) + ("",) * (5 - len(values))
+        return (int(values[0]), *fields)
+
+    def save(self, changes):
+        """Apply row ID -> values (None when deleted) in a single transaction"""
+        deleted = [(int(row_id),) for row_id, values in changes.items() if not values]
+        changed = [self.record(values) for values in changes.values() if values]
+        with self.connection:  # Commits, or rolls back if a statement fails
+            self.connection.executemany(
+                "DELETE FROM nomenclature WHERE id = ?", deleted
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO nomenclature VALUES (?, ?, ?, ?, ?)", changed
+            )
+
+    def replace_all(self, rows):
+        """Make the table hold exactly these rows, in a single transaction"""
+        with self.connection:
+            self.connection.execute("DELETE FROM nomenclature")
+            self.connection.executemany(
+                "INSERT INTO nomenclature VALUES (?, ?, ?, ?, ?)",
+                map(self.record, rows),
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+class DatabaseSnapshot:
+    """Validated rows of a CSV database, cached beside it for fast reopening"""
+
+    def __init__(self, file_path, encoding, delimiter):
+        self.file_path = Path(file_path).resolve()
+        self.path = self.file_path.with_name(self.file_path.name + ".snapshot")
+        # A snapshot only applies to the same file read the same way
+        self.settings = (SNAPSHOT_VERSION, str(self.file_path), encoding, delimiter)
+        self.stat = None  # Size and mtime of the CSV when it was last checked
+        self.current = False  # True when read found the snapshot up to date
+        self.hash = None  # SHA-1 of the CSV once computed
+
+    def file_key(self, stat):
+        return stat.st_size, stat.st_mtime_ns
+
+    def file_hash(self):
+        """SHA-1 of the CSV contents"""
+        digest = hashlib.sha1()
+        with self.file_path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def read(self):
+        """(valid rows, errors) if the snapshot matches the CSV, otherwise None
+
+        Decoding the snapshot, and hashing a CSV whose mtime changed but whose
+        size did not, take long enough that this runs on the loader's worker.
+        """
+        try:
+            self.stat = self.file_path.stat()
+            with self.path.open("rb") as f:
+                # Decoding many small lists is much faster without the cyclic GC
+                gc.disable()
+                try:
+                    # Plain JSON: a shared snapshot cannot run code when read
+                    snapshot = json.loads(f.read())
+                finally:
+                    gc.enable()
+        except Exception:
+            return None
+
+        if snapshot.get("settings") != list(self.settings):
+            return None
+        if snapshot["file"] != list(self.file_key(self.stat)):
+            # A copied or touched file keeps its snapshot while the contents match
+            if snapshot["file"][0] != self.stat.st_size:
+                return None
+            try:
+                self.hash = self.file_hash()
+            except OSError:
+                return None
+            if snapshot["hash"] != self.hash:
+                return None
+        else:
+            self.current = True
+        return snapshot["rows"], snapshot["errors"]
+
+    def save(self, rows, errors):
+        """Write the snapshot on a background thread; failures only cost the cache"""
+        threading.Thread(
+            target=self.write, args=(rows, errors, self.hash), daemon=True
+        ).start()
+
+    def write(self, rows, errors, file_hash):
+        try:
+            file_hash = file_hash or self.file_hash()
+            file_key = self.file_key(self.file_path.stat())
+            if self.stat is not None and file_key != self.file_key(self.stat):
+                return  # The CSV changed after it was read
+            snapshot = {
+                "settings": self.settings,
+                "file": file_key,
+                "hash": file_hash,
+                "rows": rows,
+                "errors": errors,
+            }
+            with AtomicFile(self.path, "wb") as f:
+                f.write(json.dumps(snapshot, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            print(f"Could not save the database snapshot: {e}")
+
+
+class ChangeJournal:
+    """Append-only log of saved nomenclature edits beside a CSV database"""
+
+    # Serializes appends with the end of a compaction, whichever journal runs it
+    lock = threading.Lock()
+    # Resolved CSV path -> thread folding its journal; outlives a closed journal
+    compactions = {}
+
+    def __init__(self, file_path):
+        self.file_path = Path(file_path).resolve()
+        self.path = self.file_path.with_name(self.file_path.name + ".journal")
+        try:
+            self.size = self.path.stat().st_size
+        except FileNotFoundError:
+            self.size = 0
+
+    def replay(self, rows):
+        """Rows of the CSV with the journaled changes applied in order"""
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return rows
+
+        rows = list(rows)
+        indexes = {str(row[0]): i for i, row in enumerate(rows)}
+        for line in lines:
+            try:
+                row_id, values = json.loads(line)
+            except ValueError:
+                continue  # A record torn by an interrupted save
+            i = indexes.get(row_id)
+            if values is None:
+                if i is not None:
+                    rows[i] = None
+                    del indexes[row_id]
+            elif i is None:
+                indexes[row_id] = len(rows)
+                rows.append(values)
+            else:
+                rows[i] = values
+        return [row for row in rows if row is not None]
+
+    def save(self, changes):
+        """Append row ID -> values (None when deleted) and flush them to disk"""
+        # Start on a fresh line even if an earlier save was torn
+        records = "\n" + "".join(
+            json.dumps(
+                [row_id, None if values is None else [str(v) for v in values]],
+                ensure_ascii=False,
+            )
+            + "\n"
+            for row_id, values in changes.items()
+        )
+        with self.lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(records)
+                f.flush()
+                os.fsync(f.fileno())
+                self.size = f.tell()
+
+    def compact(self, rows, header, delimiter, encoding):
+        """Fold the journal into the CSV in the background; False if already folding"""
+        thread = self.compactions.get(self.file_path)
+        if thread is not None and thread.is_alive():
+            return False
+        thread = threading.Thread(
+            target=self.write,
+            args=(rows, self.size, header, delimiter, encoding),
+            daemon=True,
+        )
+        self.compactions[self.file_path] = thread
+        thread.start()
+        return True
+
+    def write(self, rows, offset, header, delimiter, encoding):
+        try:
+            with AtomicFile(
+                self.file_path, backup=True, newline="", encoding=encoding
+            ) as f:
+                writer = csv.writer(f, delimiter=delimiter)
+                writer.writerow(header)
+                writer.writerows(rows)
+            with self.lock:
+                # Records saved while the CSV was being written stay in the journal
+                with self.path.open("rb") as f:
+                    f.seek(offset)
+                    tail = f.read()
+                # Replaying the old journal over the new CSV is harmless if this step is cut short
+                if tail:
+                    with AtomicFile(self.path, "wb") as f:
+                        f.write(tail)
+                else:
+                    self.path.unlink()
+                self.size = len(tail)
+            DatabaseSnapshot(self.file_path, encoding, delimiter).write(rows, [], None)
+        except Exception as e:
+            print(f"Could not compact the database journal: {e}")
+
+    def wait(self):
+        """Block until a running compaction finishes"""
+        self.wait_for(self.file_path)
+
+    @classmethod
+    def wait_for(cls, file_path):
+        """Block until a running compaction of the CSV at file_path finishes"""
+        thread = cls.compactions.get(Path(file_path).resolve())
+        if thread is not None:
+            thread.join()
+
+    @classmethod
+    def wait_all(cls):
+        """Block until the compactions of every CSV finish"""
+        for thread in list(cls.compactions.values()):
+            thread.join()
+
+    def clear(self):
+        """Drop the journal once the CSV has been rewritten in full"""
+        with self.lock:
+            self.path.unlink(missing_ok=True)
+            self.size = 0
+
+
+class ValidationReport:
+    """Rows rejected while importing the nomenclature, by the check they failed"""
+
+    MESSAGES = {
+        ID_COLUMN: "ID is not an integer",
+        TIME_COLUMN: "Time/unit is not a number",
+    }
+
+    def __init__(self, errors):
+        self.errors = errors  # (line, column, value), ordered by line
+
+    def describe(self, error):
+        line, column, value = error
+        return f"Line {line}: {self.MESSAGES[column]} ({value!r})"
+
+    def summary(self):
+        """Number of rejected rows per failed check"""
+        counts = {}
+        for _, column, _ in self.errors:
+            counts[column] = counts.get(column, 0) + 1
+        return "\n".join(
+            f"{self.MESSAGES[column]}: {count}"
+            for column, count in sorted(counts.items())
+        )
+
+    def page_count(self):
+        return max(1, -(-len(self.errors) // ERROR_PAGE_ROWS))
+
+    def page(self, number):
+        """Descriptions of the errors on one page of ERROR_PAGE_ROWS"""
+        start = number * ERROR_PAGE_ROWS
+        return [
+            self.describe(error)
+            for error in self.errors[start : start + ERROR_PAGE_ROWS]
+        ]
+
+    def export(self, file_path, encoding, delimiter):
+        """Write every error to a CSV file"""
+        with AtomicFile(file_path, newline="", encoding=encoding) as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(["Line", "Error", "Value"])
+            writer.writerows(
+                (line, self.MESSAGES[column], value)
+                for line, column, value in self.errors
+            )
+
+
+class ImportErrorsWindow(tk.Toplevel):
+    def __init__(self, parent, report, encoding, delimiter):
+        super().__init__(parent)
+        self.report = report
+        self.encoding = encoding  # Used for the exported error list
+        self.delimiter = delimiter
+        self.page_number = 0
+        self.title("Import errors")
+        self.geometry("520x400")
+
+        self.create_widgets()
+        self.show_page(0)
+
+    def create_widgets(self):
+        """Create widgets in the import errors window"""
+        button_width = 15  # Button width in characters
+
+        self.grid_rowconfigure(1, weight=1)  # Errors list
+        self.grid_columnconfigure(0, weight=1)
+
+        # Counts per failed check
+        tk.Label(
+            self,
+            text=f"Rows not imported: {len(self.report.errors)}\n{self.report.summary()}",
+            justify=tk.LEFT,
+        ).grid(row=0, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+
+        self.error_listbox = tk.Listbox(self)
+        self.error_listbox.grid(row=1, column=0, padx=(10, 0), pady=5, sticky="nsew")
+        scrollbar = tk.Scrollbar(self, command=self.error_listbox.yview)
+        scrollbar.grid(row=1, column=1, padx=(0, 10), pady=5, sticky="ns")
+        self.error_listbox.config(yscrollcommand=scrollbar.set)
+
+        # Paging and buttons at the bottom of the window
+        button_frame = tk.Frame(self)
+        button_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+
+        self.previous_button = tk.Button(
+            button_frame, text="<", command=lambda: self.show_page(self.page_number - 1)
+        )
+        self.previous_button.pack(side=tk.LEFT, padx=5)
+
+        self.page_label = tk.Label(button_frame)
+        self.page_label.pack(side=tk.LEFT, padx=5)
+
+        self.next_button = tk.Button(
+            button_frame, text=">", command=lambda: self.show_page(self.page_number + 1)
+        )
+        self.next_button.pack(side=tk.LEFT, padx=5)
+
+        self.close_button = tk.Button(button_frame, text="Close", command=self.destroy)
+        self.close_button.config(width=button_width)
+        self.close_button.pack(side=tk.RIGHT, padx=5)
+
+        self.export_button = tk.Button(
+            button_frame, text="Export...", command=self.export_errors
+        )
+        self.export_button.config(width=button_width)
+        self.export_button.pack(side=tk.RIGHT, padx=5)
+
+    def show_page(self, number):
+        """Show one page of errors"""
+        self.page_number = number
+        self.error_listbox.delete(0, tk.END)
+        self.error_listbox.insert(tk.END, *self.report.page(number))
+
+        page_count = self.report.page_count()
+        self.page_label.config(text=f"Page {number + 1} of {page_count}")
+        self.previous_button.config(state=tk.NORMAL if number > 0 else tk.DISABLED)
+        self.next_button.config(
+            state=tk.NORMAL if number + 1 < page_count else tk.DISABLED
+        )
+
+    def export_errors(self):
+        """Save the full list of errors to a CSV file"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".csv", filetypes=[("CSV files", "*.csv")]
+        )
+        if not file_path:
+            return
+        try:
+            self.report.export(Path(file_path), self.encoding, self.delimiter)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export errors: {e}", parent=self)
+            return
+        messagebox.showinfo("Success", "File saved successfully.", parent=self)
+
 
 class SettingsWindow(tk.Toplevel):
     def __init__(self, parent, parent_app):
@@ -580,12 +2498,13 @@ class SettingsWindow(tk.Toplevel):
         }
 
         settings_path = Path("settings.json").resolve()
-        with settings_path.open("w", encoding="utf-8") as f:
+        with AtomicFile(settings_path, backup=True, encoding="utf-8") as f:
             json.dump(settings, f)
 
         self.parent_app.change_style(style)
         self.parent_app.csv_separator = csv_separator
         self.parent_app.encoding = encoding
+        self.parent_app.update_gantt_chart()
 
         self.destroy()
 
@@ -640,16 +2559,30 @@ class App:
         self.setup_variables()
         self.create_widgets()
 
-        self.load_database_silently(self.current_file_path, self.csv_separator)
+        self.load_database_silently(self.last_opened_file, self.csv_separator)
         self.update_statusbar()
 
     """Update"""
 
-    def update_app(self):
+    def update_app(self, stages=("statusbar", "gantt")):
+        """Schedule the given stages for a single after_idle pass"""
         self.mark_data_as_modified()
-        self.update_statusbar()
-        self.highlight_conflicts()
-        self.update_gantt_chart()
+        self.pending_stages.update(stages)
+        if self.update_job is None:
+            self.update_job = self.root.after_idle(self.run_update)
+
+    def run_update(self):
+        """Run every pending update stage once"""
+        self.update_job = None
+        stages, self.pending_stages = self.pending_stages, set()
+        if "conflicts" in stages:
+            row_ids, self.changed_rows = self.changed_rows, set()
+            self.highlight_conflicts(row_ids)
+            self.gantt.update_tasks(row_ids)
+        if "statusbar" in stages:
+            self.update_statusbar()
+        if "gantt" in stages:
+            self.gantt.flush()
 
     def update_gantt_chart(self, event=None):
         now = datetime.now()
@@ -676,55 +2609,9 @@ class App:
                 end_of_month = datetime(now.year, now.month + 1, 1) - timedelta(days=1)
             min_dt, max_dt = start_of_month, end_of_month
 
-        if not self.task_table.get_children():
-            self.ax.clear()
-            self.ax.axis("off")
-            self.canvas.draw()
-            return
-
-        self.ax.clear()
-        self.ax.axis("on")
-
-        # Generate enough colors for the tasks
-        num_tasks = len(self.task_table.get_children())
-        colors = self.generate_colors(num_tasks)
-
-        # for item in self.task_table.get_children():
-        for index, item in enumerate(self.task_table.get_children()):
-            (
-                id,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            start_dt = datetime.strptime(start_datetime, "%d.%m.%Y %H:%M")
-            end_dt = datetime.strptime(end_datetime, "%d.%m.%Y %H:%M")
-            machine_index = self.all_machines.index(machine)
-
-            # Set bar length based on the selected range
-            bar_length = (end_dt - start_dt).total_seconds() / (60 * 60 * 24)  # In days
-
-            # print(f"start_dt: {start_dt}, bar_length: {bar_length}, start_offset: {start_offset}")
-
-            # Draw a bar with a single color per machine (kept for reference)
-            # self.ax.barh(machine_index, bar_length, left=start_offset, color=plt.cm.tab10(machine_index % 10),
-            #             edgecolor="black", label=detail)
-
-            # Draw a bar with an individual color per task
-            color = colors[index]  # Pick a color
-            self.ax.barh(
-                machine_index, bar_length, left=start_dt, color=color, label=detail
-            )
-
-            # min_dt = min(min_dt, start_dt)
-            # max_dt = max(max_dt, end_dt)
-
-        # Update X axis bounds
-        self.ax.set_xlim([min_dt, max_dt])
+        # Lanes and bars are kept between calls and only patched on edits
+        self.gantt.set_machines(self.all_machines)
+        self.gantt.set_view(min_dt, max_dt)
 
         # Set X axis ticks
         if range_selection == "Day":
@@ -737,26 +2624,15 @@ class App:
             self.ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
             self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%d.%m"))
 
-        self.ax.set_xlabel("")
-        self.ax.set_yticks(range(len(self.all_machines)))
-        self.ax.set_yticklabels(self.all_machines)
-        self.ax.xaxis.set_visible(True)
-        self.ax.xaxis.grid(False)
-        self.ax.yaxis.grid(False)
-        self.ax.spines["top"].set_visible(False)
-        self.ax.spines["right"].set_visible(False)
-        self.ax.spines["left"].set_visible(False)
-        self.ax.spines["bottom"].set_visible(False)
-        self.ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize="small")
         plt.setp(
             self.ax.get_xticklabels(), rotation=90, ha="right", rotation_mode="anchor"
         )
-        self.canvas.draw()
+        self.gantt.flush()
 
     def update_statusbar(self):
         """Update the status bar with counters and shortened path"""
-        num_tasks = len(self.task_table.get_children())
-        num_items = len(self.nomenclature_table.get_children())
+        num_tasks = len(self.tasks)
+        num_items = len(self.nomenclature_table.data)
         if self.current_file_path == "":
             short_path = "Not set"
         else:
@@ -767,58 +2643,109 @@ class App:
         )
 
     def update_detail_list(self):
-        self.detailList = self.nomenclature_table.get_column_values_by_index(1)
-        self.detail_entry.set_completion_list(self.detailList)
-        self.mark_data_as_modified()
-        self.update_statusbar()
+        self.detail_entry.set_completion_list(self.nomenclature_index.detail_counts)
+        self.update_app(("statusbar",))
+
+    def preferred_details(self):
+        """Parts recorded for the setup and machine entered on the planning tab"""
+        key = (self.setup_entry.get().strip(), self.machine_combo.get().strip())
+        return self.nomenclature_index.details_by_context.get(key)
 
     def mark_data_as_modified(self, *args):
         self.is_data_modified = True
 
-    def highlight_conflicts(self):
-        if not self.task_table.get_children():
-            return
-        self.task_table.tag_configure("conflict", background="red", foreground="white")
+    def highlight_conflicts(self, row_ids=None):
+        """Tag conflicting tasks; re-checks only row_ids when given"""
+        if row_ids is None:
+            # Full resync: rebuild the task models and the interval index
+            self.tasks.clear()
+            self.task_index.clear()
+            for row in self.task_table.data:
+                task = Task.from_values(row)
+                self.tasks[task.id] = task
+                self.task_index.add(task.id, task.machine, task.start, task.end)
+
+            self.task_columns = None
+            self.gantt.refresh()
+            row_ids = list(self.tasks)
+            if len(row_ids) >= COLUMNAR_MIN_TASKS:
+                mask = self.get_task_columns().conflict_mask()
+                conflicting = {row_ids[index] for index in np.flatnonzero(mask)}
+            else:
+                records = [
+                    (task.machine, task.start, task.end) for task in self.tasks.values()
+                ]
+                conflicting = {
+                    row_ids[index]
+                    for index in self.conflict_detector.find_conflicting(records)
+                }
+        else:
+            row_ids = [row_id for row_id in row_ids if row_id in self.task_index]
+            conflicting = {
+                row_id for row_id in row_ids if self.task_index.conflicts(row_id)
+            }
+
+        for row_id in row_ids:
+            tags = ("conflict",) if row_id in conflicting else ()
+            self.task_table.set_row_tags(row_id, tags)
+
+    def get_task_columns(self):
+        """Columnar snapshot of the tasks, rebuilt after any change"""
+        if self.task_columns is None:
+            self.task_columns = TaskColumns(self.tasks.values(), self.all_machines)
+        return self.task_columns
+
+    def on_nomenclature_row_change(self, row_id, values):
+        """Record an added, edited or deleted nomenclature row"""
+        index = self.nomenclature_index
+        keys = [index.rows.get(row_id)]
+        index.index_row(row_id, values)
+        keys.append(index.rows.get(row_id))
+        # Only parts that appeared or disappeared altogether change the suggestions
+        parts = {key[0] for key in keys if key is not None}
+        self.detail_entry.update_completions(
+            [part for part in parts if part in index.detail_counts],
+            [part for part in parts if part not in index.detail_counts],
+        )
+        self.nomenclature_changes[row_id] = values
+        self.update_app(("statusbar",))
+
+    def find_nomenclature(self, detail, setup, machine):
+        """Index in the nomenclature data of the matching record, or None"""
+        row_id = self.nomenclature_index.find(detail, setup, machine)
+        if row_id is None:
+            return None
+        return self.nomenclature_table.row_indexes[row_id]
+
+    def nomenclature_editable(self):
+        """False, with a warning, while a database is loading into the table"""
+        if self.bulk_load is None:
+            return True
+        messagebox.showwarning(
+            "Warning",
+            "The database is still loading. Wait for it or press Esc to cancel.",
+        )
+        return False
+
+    def on_task_row_change(self, row_id, values):
+        """Update the task model and index for one row and queue its neighbours"""
+        self.task_columns = None
+        affected = set()
+        if row_id in self.task_index:
+            affected.update(self.task_index.conflicts(row_id))
+            self.task_index.remove(row_id)
+
+        if values is None:
+            self.tasks.pop(row_id, None)
+        else:
+            task = Task.from_values(values)
+            self.tasks[row_id] = task
+            self.task_index.add(row_id, task.machine, task.start, task.end)
+            affected.update(self.task_index.conflicts(row_id))
 
-        # Remove conflict tags before re-checking
-        for item in self.task_table.get_children():
-            self.task_table.item(item, tags="")
-
-        machine_tasks = {}
-
-        for item in self.task_table.get_children():
-            (
-                id,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            start_dt = datetime.strptime(start_datetime, "%d.%m.%Y %H:%M")
-            end_dt = datetime.strptime(end_datetime, "%d.%m.%Y %H:%M")
-
-            # Group tasks by machine
-            if machine not in machine_tasks:
-                machine_tasks[machine] = []
-            machine_tasks[machine].append((item, start_dt, end_dt))
-
-        # Check overlaps per machine
-        for machine, tasks in machine_tasks.items():
-            for i in range(len(tasks)):
-                item1, start1, end1 = tasks[i]
-                for j in range(i + 1, len(tasks)):
-                    item2, start2, end2 = tasks[j]
-                    overlap_start = max(start1, start2)
-                    overlap_end = min(end1, end2)
-                    overlap_duration = (
-                        overlap_end - overlap_start
-                    ).total_seconds() / 60
-                    if overlap_duration >= 0.5:  # Duration in minutes
-                        self.task_table.item(item1, tags="conflict")
-                        self.task_table.item(item2, tags="conflict")
+        self.changed_rows.update(affected)
+        self.changed_rows.add(row_id)
+        self.update_app(("conflicts", "statusbar", "gantt"))
 
     """Settings"""
 
@@ -863,7 +2790,9 @@ class App:
         window_state = settings.get("window_state", "normal")
         self.root.state(window_state)
 
-        self.current_file_path = settings.get("last_opened_file", "")
+        # Becomes current_file_path once the database has loaded
+        self.last_opened_file = settings.get("last_opened_file") or ""
+        self.current_file_path = ""
         self.save_settings()
 
     def save_settings(self):
@@ -871,8 +2800,10 @@ class App:
         geometry = self.root.geometry()
         window_state = self.root.state()
 
-        if self.current_file_path and Path(self.current_file_path).exists():
-            path = str(self.current_file_path)
+        # A database that has not finished loading is still reopened next time
+        path = self.current_file_path or self.last_opened_file
+        if path and Path(path).exists():
+            path = str(path)
         else:
             path = None
 
@@ -887,7 +2818,7 @@ class App:
         }
 
         settings_path = Path("settings.json").resolve()
-        with settings_path.open("w", encoding="utf-8") as f:
+        with AtomicFile(settings_path, backup=True, encoding="utf-8") as f:
             json.dump(settings, f)
 
     def change_style(self, style_name):
@@ -905,7 +2836,24 @@ class App:
         self.is_data_modified = False
         # Create validator instance
         self.validator = Validator(valid_values=self.get_valid_values())
-        self.detailList = []
+        self.conflict_detector = ConflictDetector()
+        self.task_index = IntervalIndex()
+        self.tasks = {}  # Row ID -> Task, parsed once per change
+        self.task_columns = None  # TaskColumns snapshot of self.tasks
+        self.pending_stages = set()  # Update stages waiting for the after_idle pass
+        self.changed_rows = set()  # Row IDs whose conflicts and bars need rechecking
+        self.update_job = None
+        self.zoom_job = None
+        self.pan_motion = None  # Motion callback id while the toolbar pans
+        self.bulk_load = None  # (loader, on_loaded, on_failed, snapshot)
+        self.load_job = None
+        self.load_escape = None  # Id of the Escape callback that cancels a load
+        self.nomenclature_index = NomenclatureIndex()  # Rows by part, setup, machine
+        self.database = None  # NomenclatureDatabase when the file is SQLite
+        self.journal = None  # ChangeJournal of an open CSV database
+        self.compact_job = None
+        self.compact_rows = None  # Rows as last saved, until the scheduled compaction
+        self.nomenclature_changes = {}  # Row ID -> values (None if deleted) to save
         self.settings_window = None
         self.about_window = None
 
@@ -933,6 +2881,9 @@ class App:
         file_menu.add_command(
             label="Save database", command=self.save_to_database, accelerator="Ctrl+S"
         )
+        file_menu.add_command(
+            label="Save database as...", command=self.save_database_as
+        )
         file_menu.add_command(label="Close database", command=self.close_database)
         file_menu.add_separator()
         file_menu.add_command(
@@ -1041,20 +2992,28 @@ class App:
         # Input fields
         tk.Label(frame, text="Part").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         # self.detail_entry = tk.Entry(frame, width=100)
-        self.detail_entry = AutoCompleteEntry(frame, width=100)
+        self.detail_entry = AutoCompleteEntry(
+            frame, width=100, preferred=self.preferred_details
+        )
         self.detail_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        # Time per unit is filled in once the part, setup and machine are known
+        self.detail_entry.bind("<FocusOut>", self.fill_time_per_unit, add="+")
+        self.detail_entry.bind("<<AutoCompleteSelected>>", self.fill_time_per_unit)
 
         tk.Label(frame, text="Setup").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         self.setup_entry = tk.Entry(frame, width=13)
         self.setup_entry.bind(
             "<FocusOut>", lambda event: self.on_focus_out(event, "setup")
         )
+        self.setup_entry.bind("<FocusOut>", self.fill_time_per_unit, add="+")
         self.setup_entry.grid(row=1, column=1, padx=5, pady=5, sticky="w")
 
         tk.Label(frame, text="Machine").grid(
             row=2, column=0, padx=5, pady=5, sticky="w"
         )
         self.machine_combo = ttk.Combobox(frame, width=10, values=self.all_machines)
+        self.machine_combo.bind("<<ComboboxSelected>>", self.fill_time_per_unit)
+        self.machine_combo.bind("<FocusOut>", self.fill_time_per_unit)
         self.machine_combo.grid(row=2, column=1, padx=5, pady=5, sticky="w")
 
         tk.Label(frame, text="Quantity, pcs").grid(
@@ -1135,8 +3094,10 @@ class App:
             ],
             valid_values=self.get_valid_values(),
             update_app=self.update_app,
+            on_row_change=self.on_task_row_change,
         )
         self.task_table.grid(row=9, columnspan=3, pady=10, sticky="nsew")
+        self.task_table.tag_configure("conflict", background="red", foreground="white")
         self.task_table.column(
             "ID", anchor="center", width=1, minwidth=1, stretch=False
         )
@@ -1206,6 +3167,7 @@ class App:
 
         # Create canvas for the chart
         self.canvas = FigureCanvasTkAgg(self.figure, master=canvas_frame)
+        self.gantt = GanttChart(self.ax, self.canvas, self.tasks, self.task_index)
 
         # Create navigation toolbar
         self.toolbar = NavigationToolbar2Tk(self.canvas, canvas_frame)
@@ -1215,8 +3177,13 @@ class App:
             side=tk.TOP, fill="both", expand=True
         )  # Center the canvas
 
-        # Bind scroll event
+        # Bind scroll and hover events
         self.canvas.mpl_connect("scroll_event", self.zoom)
+        self.canvas.mpl_connect("draw_event", self.gantt.on_draw)
+        self.canvas.mpl_connect("motion_notify_event", self.gantt.on_motion)
+        # Connected after the toolbar's own press and release handlers
+        self.canvas.mpl_connect("button_press_event", self.start_pan)
+        self.canvas.mpl_connect("button_release_event", self.stop_pan)
 
         # Initial chart render
         self.update_gantt_chart()
@@ -1286,7 +3253,9 @@ class App:
             frame,
             columns=["ID", "Part", "Setup", "Machine", "Time/unit"],
             valid_values=self.get_valid_values(),
-            update_app=self.update_app,
+            update_app=lambda: self.update_app(("statusbar",)),
+            on_row_change=self.on_nomenclature_row_change,
+            can_edit=self.nomenclature_editable,
         )
         self.nomenclature_table.grid(row=7, columnspan=3, pady=10, sticky="nsew")
         self.nomenclature_table.column(
@@ -1353,69 +3322,184 @@ class App:
 
     """Menu"""
 
-    def validate_and_import_data(self, data):
-        valid_data = []
-        errors = []
+    def validate_and_import_data(self, data, start=0):
+        """Check rows a column at a time; start is the number of rows before data"""
+        failed = {}  # Row position -> (column, value) of its first failed check
+
+        # IDs must be integers; values are parsed one by one only if the column fails
+        ids = [row[ID_COLUMN] for row in data]
+        if not all(map(str.isdecimal, ids)):
+            for i, value in enumerate(ids):
+                try:
+                    int(value)
+                except ValueError:
+                    failed[i] = (ID_COLUMN, value)
+
+        # Time/unit, when present, must be a number; decimal commas become points
+        timed = [i for i, row in enumerate(data) if len(row) > TIME_COLUMN]
+        times = [data[i][TIME_COLUMN].replace(",", ".") for i in timed]
+        for i, value in zip(timed, times):
+            data[i][TIME_COLUMN] = value
+        try:
+            for _ in map(float, times):
+                pass
+        except ValueError:
+            for i, value in zip(timed, times):
+                try:
+                    float(value)
+                except ValueError:
+                    failed.setdefault(i, (TIME_COLUMN, value))
+
+        if not failed:
+            return data, []
+        valid_data = [row for i, row in enumerate(data) if i not in failed]
+        # (line, column, value) for ValidationReport
+        errors = [(start + i + 1, *failed[i]) for i in sorted(failed)]
+        return valid_data, errors
 
-        for i, row in enumerate(data):
-            try:
-                # Validate first column (must be an integer)
-                int(row[0])
+    def start_bulk_load(self, loader, on_loaded, on_failed, snapshot=None):
+        """Read a database on a worker thread and poll for its rows; Esc cancels"""
+        self.cancel_bulk_load()
+        self.bulk_load = (loader, on_loaded, on_failed, snapshot)
+        self.load_escape = self.root.bind("<Escape>", self.cancel_bulk_load, add="+")
+        loader.start()
+        self.load_job = self.root.after(LOAD_POLL_MS, self.poll_bulk_load)
 
-                # Validate 5th column (replace comma and ensure float)
-                if len(row) > 4:
-                    row[4] = row[4].replace(",", ".")
-                    float(row[4])
+    def poll_bulk_load(self):
+        loader, on_loaded, on_failed, snapshot = self.bulk_load
+        try:
+            done = loader.collect()
+        except Exception as e:
+            self.cancel_bulk_load()
+            on_failed(e)
+            return
 
-                # If validation passes, add row to valid data
-                valid_data.append(row)
-            except Exception as e:
-                # On error, record the row index and message
-                errors.append((i + 1, str(e)))
+        if not done:
+            self.statusbar.config(
+                text=f"Loading database: {loader.progress:.0%}, {len(loader.valid_data)} records (Esc to cancel)"
+            )
+            self.load_job = self.root.after(LOAD_POLL_MS, self.poll_bulk_load)
+            return
 
-        return valid_data, errors
+        self.cancel_bulk_load()
+        if snapshot is not None and not snapshot.current:
+            snapshot.save(loader.valid_data, loader.errors)
+        on_loaded(loader.valid_data, loader.errors, loader.prepared)
 
-    def load_database_silently(self, file_path=None, delimiter=","):
-        if not file_path:
+    def cancel_bulk_load(self, event=None):
+        """Stop a running load; the table keeps its previous contents"""
+        if self.bulk_load is None:
             return
+        self.root.after_cancel(self.load_job)
+        self.bulk_load[0].cancel()
+        self.bulk_load = None
+        self.load_job = None
+        # Before Python 3.13 unbind with a funcid drops every Escape binding; drop ours
+        script = self.root.bind("<Escape>").splitlines()
+        kept = [line for line in script if self.load_escape not in line]
+        self.root.bind("<Escape>", "\n".join(kept))
+        self.root.deletecommand(self.load_escape)
+        self.load_escape = None
+        self.update_statusbar()
 
-        file_path = Path(file_path) if isinstance(file_path, str) else file_path
-        data = []
+    def load_database(self, file_path, delimiter, accept, on_loaded, on_failed):
+        """Read a SQLite or CSV database in the background into the nomenclature table
+
+        accept(valid_data, errors) reports what was read and returns whether it
+        replaces the table, on_loaded(count) follows the replacement and
+        on_failed(error) reports a database that could not be read.
+        """
+
+        def prepare(valid_data):
+            # Runs on the loader's worker, leaving the UI only the swap below
+            if not self.is_sqlite(file_path):
+                # Saves since the last compaction are kept in the journal
+                valid_data = ChangeJournal(file_path).replay(valid_data)
+            return valid_data, NomenclatureIndex(valid_data)
+
+        def loaded(valid_data, errors, prepared):
+            if not accept(valid_data, errors):
+                return
+
+            valid_data, index = prepared
+            self.attach_database(file_path)
+            # Load valid data into the TreeView
+            self.nomenclature_table.clear_data()
+            self.nomenclature_table.insert_data(valid_data)
+            self.nomenclature_index = index
+            self.compact_journal()
+            self.current_file_path = file_path
+            self.update_detail_list()
+            self.is_data_modified = False
+            on_loaded(len(valid_data))
+
+        snapshot = None
         try:
-            with file_path.open(newline="", encoding=self.encoding) as csvfile:
-                reader = csv.reader(csvfile, delimiter=delimiter)
-                next(reader)  # Skip header
-                for row in reader:
-                    if row:
-                        data.append(row)
-        except FileNotFoundError:
-            print(f"File {file_path} not found.")
-            return
+            # Rows are read and validated on a worker thread
+            if self.is_sqlite(file_path):
+                loader = SqliteLoader(file_path, self.validate_and_import_data, prepare)
+            else:
+                # An unchanged database is restored from its snapshot without parsing
+                snapshot = DatabaseSnapshot(file_path, self.encoding, delimiter)
+                loader = CsvLoader(
+                    file_path,
+                    delimiter,
+                    self.encoding,
+                    self.validate_and_import_data,
+                    prepare,
+                    snapshot,
+                )
         except Exception as e:
-            print(f"Error loading file: {e}")
+            on_failed(e)
             return
 
-        # Validate data before loading into the table
-        valid_data, errors = self.validate_and_import_data(data)
-
-        # Output errors to console
-        if errors:
-            for error in errors:
-                print(f"Error in line {error[0]}: {error[1]}")
+        self.start_bulk_load(loader, loaded, on_failed, snapshot)
 
-        if not valid_data:
-            print("All rows contain errors.")
+    def load_database_silently(self, file_path=None, delimiter=","):
+        if not file_path:
             return
 
-        # Load valid data into the TreeView
-        self.nomenclature_table.clear_data()
-        self.nomenclature_table.insert_data(valid_data)
-        self.update_detail_list()
-        self.is_data_modified = False
-        print(f"Successfully loaded {len(valid_data)} records from {file_path}.")
+        file_path = Path(file_path) if isinstance(file_path, str) else file_path
+
+        def accept(valid_data, errors):
+            # Output an error summary to console
+            if errors:
+                report = ValidationReport(errors)
+                print(f"Rows not imported: {len(errors)}\n{report.summary()}")
+                print("\n".join(report.page(0)))
+
+            if not valid_data:
+                print("All rows contain errors.")
+                return False
+
+            if self.nomenclature_changes:
+                # Unsaved edits made before the load are kept
+                messagebox.showwarning(
+                    "Warning",
+                    f"{file_path} was not loaded: "
+                    "the nomenclature has unsaved changes.",
+                )
+                return False
+            return True
+
+        def on_loaded(count):
+            print(f"Successfully loaded {count} records from {file_path}.")
+
+        def on_failed(e):
+            if isinstance(e, FileNotFoundError):
+                print(f"File {file_path} not found.")
+            else:
+                print(f"Error loading file: {e}")
+
+        self.load_database(file_path, delimiter, accept, on_loaded, on_failed)
 
     def open_database(self):
-        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        file_path = filedialog.askopenfilename(
+            filetypes=[
+                ("CSV Files", "*.csv"),
+                ("SQLite databases", " ".join(f"*{s}" for s in SQLITE_SUFFIXES)),
+            ]
+        )
         if not file_path:
             return  # Exit if the user cancels the dialog
         file_path = Path(file_path)
@@ -1434,49 +3518,116 @@ class App:
         if not delimiter:
             return  # Exit if no delimiter was provided
 
-        data = []
-        try:
-            with file_path.open(newline="", encoding=self.encoding) as csvfile:
-                reader = csv.reader(csvfile, delimiter=delimiter)
-                header = next(reader)  # Skip the first row (header)
-                for row in reader:
-                    if row:  # Ignore empty rows
-                        data.append(row)
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Specified file not found.")
-            return
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not open file: {e}")
-            return
+        def accept(valid_data, errors):
+            if not valid_data and not errors:
+                messagebox.showwarning(
+                    "Warning", "The file is empty or incorrectly formatted."
+                )
+                return False
 
-        if not data:
-            messagebox.showwarning(
-                "Warning", "The file is empty or incorrectly formatted."
+            # Handle validation errors: a summary, a paged list and export
+            if errors:
+                ImportErrorsWindow(
+                    self.root, ValidationReport(errors), self.encoding, delimiter
+                )
+                return False  # Stop execution when errors are present
+
+            return not self.nomenclature_changes or messagebox.askyesno(
+                "Unsaved changes",
+                "The nomenclature has unsaved changes. Discard them and open the file?",
             )
-            return
 
-        # Data validation
-        valid_data, errors = self.validate_and_import_data(data)
+        def on_loaded(count):
+            self.tab_control.select(self.tab_nomenclature)
+            messagebox.showinfo("Success", f"Successfully imported {count} records.")
 
-        # Handle validation errors
-        if errors:
-            error_message = "\n".join(
-                [f"Error in line {i}: {error}" for i, error in errors]
-            )
-            messagebox.showerror(
-                "Import errors", f"The following errors were found:\n{error_message}"
-            )
-            return  # Stop execution when errors are present
+        def on_failed(e):
+            if isinstance(e, FileNotFoundError):
+                messagebox.showerror("Error", "Specified file not found.")
+            else:
+                messagebox.showerror("Error", f"Could not open file: {e}")
+
+        self.load_database(file_path, delimiter, accept, on_loaded, on_failed)
+
+    def is_sqlite(self, file_path):
+        return Path(file_path).suffix.lower() in SQLITE_SUFFIXES
+
+    def attach_database(self, file_path=None):
+        """Open the SQLite database or CSV journal the nomenclature is saved to"""
+        # A compaction scheduled for the previous database no longer applies
+        self.take_compaction()
+        if self.database is not None:
+            self.database.close()
+        self.database = None
+        self.journal = None
+        self.nomenclature_changes.clear()
+        if file_path and self.is_sqlite(file_path):
+            self.database = NomenclatureDatabase(file_path)
+        elif file_path:
+            self.journal = ChangeJournal(file_path)
+
+    def export_to_sqlite(self, file_path):
+        try:
+            database = NomenclatureDatabase(file_path)
+            try:
+                database.replace_all(self.nomenclature_table.data)
+            finally:
+                database.close()
+            return True
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export data: {e}")
+            return False
 
-        # If validation succeeds, clear the table and add valid data
-        self.nomenclature_table.clear_data()
-        self.tab_control.select(self.tab_nomenclature)
-        self.nomenclature_table.insert_data(valid_data)
-        self.current_file_path = file_path
-        self.update_detail_list()
-        messagebox.showinfo(
-            "Success", f"Successfully imported {len(valid_data)} records."
+    def save_changes(self):
+        """Write the rows changed since the last save to SQLite or the CSV journal"""
+        try:
+            (self.database or self.journal).save(self.nomenclature_changes)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save data: {e}")
+            return False
+        self.nomenclature_changes.clear()
+        if self.journal is not None:
+            # Copying the list pins the saved state, as rows are immutable tuples; the
+            # compaction waits until saves pause
+            self.take_compaction()
+            self.compact_rows = list(self.nomenclature_table.data)
+            if self.journal.size >= JOURNAL_COMPACT_BYTES:
+                self.compact_journal()
+            else:
+                self.compact_job = self.root.after(
+                    JOURNAL_COMPACT_DELAY_MS, self.compact_journal
+                )
+        return True
+
+    def take_compaction(self):
+        """Cancel a scheduled compaction and return the rows it would have written"""
+        if self.compact_job is not None:
+            self.root.after_cancel(self.compact_job)
+            self.compact_job = None
+        rows, self.compact_rows = self.compact_rows, None
+        return rows
+
+    def compact_journal(self):
+        """Fold the journal of an open CSV database into the file in the background"""
+        rows = self.take_compaction()
+        if self.journal is None or not self.journal.size or not self.csv_separator:
+            return
+        if rows is None:
+            if self.nomenclature_changes:
+                return  # Unsaved edits must not reach the file
+            rows = list(self.nomenclature_table.data)
+        started = self.journal.compact(
+            rows,
+            self.nomenclature_table["columns"],
+            self.csv_separator,
+            self.encoding,
         )
+        if not started:
+            # The previous compaction is still running; retry after another pause
+            self.compact_rows = rows
+            self.compact_job = self.root.after(
+                JOURNAL_COMPACT_DELAY_MS, self.compact_journal
+            )
 
     def export_to_csv(self, file_path):
         file_path = Path(file_path)
@@ -1490,17 +3641,22 @@ class App:
 
         if not delimiter:
             return  # Exit if no delimiter was provided
+        # A running compaction must not overwrite the export
+        ChangeJournal.wait_for(file_path)
         try:
-            with file_path.open("w", newline="", encoding=self.encoding) as csvfile:
+            with AtomicFile(
+                file_path, backup=True, newline="", encoding=self.encoding
+            ) as csvfile:
                 writer = csv.writer(csvfile, delimiter=delimiter)
 
                 # Write headers (if needed)
                 writer.writerow(self.nomenclature_table["columns"])
 
                 # Write data from the Treeview
-                for row in self.nomenclature_table.get_children():
-                    writer.writerow(self.nomenclature_table.item(row)["values"])
+                writer.writerows(self.nomenclature_table.data)
 
+            # The export already holds every journaled change
+            ChangeJournal(file_path).clear()
             self.current_file_path = file_path
             return True  # Successful export
         except Exception as e:
@@ -1508,25 +3664,52 @@ class App:
             return False  # Failed export
 
     def save_to_database(self):
-        if self.current_file_path and self.current_file_path.exists():
+        if self.database is not None or self.journal is not None:
+            # Only the changed rows are written
+            success = self.save_changes()
+        elif self.current_file_path and self.current_file_path.exists():
             success = self.export_to_csv(self.current_file_path)
         else:
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".csv", filetypes=[("CSV files", "*.csv")]
-            )
-            if file_path:
-                success = self.export_to_csv(file_path)
-            else:
-                return  # Exit if the user cancels the dialog
+            self.save_database_as()
+            return
+
+        if success:
+            messagebox.showinfo("Success", "File saved successfully.")
+            self.update_detail_list()
+            self.is_data_modified = False
+
+    def save_database_as(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("SQLite databases", " ".join(f"*{s}" for s in SQLITE_SUFFIXES)),
+            ],
+        )
+        if not file_path:
+            return  # Exit if the user cancels the dialog
+        file_path = Path(file_path)
+
+        if self.is_sqlite(file_path):
+            success = self.export_to_sqlite(file_path)
+        else:
+            success = self.export_to_csv(file_path)
 
         if success:
+            self.current_file_path = file_path
+            self.attach_database(file_path)
             messagebox.showinfo("Success", "File saved successfully.")
             self.update_detail_list()
+            self.is_data_modified = False
 
     def close_database(self):
-        for item in self.nomenclature_table.get_children():
-            self.nomenclature_table.delete(item)
+        self.cancel_bulk_load()
+        self.compact_journal()
+        self.nomenclature_table.clear_rows()
+        self.nomenclature_index = NomenclatureIndex()
+        self.attach_database()
         self.current_file_path = ""
+        self.last_opened_file = ""
         self.update_detail_list()
 
     def import_tasks(self):
@@ -1546,8 +3729,12 @@ class App:
                 messagebox.showwarning("Error", "The file is empty.")
                 return
 
-            self.task_table.clear_data()
+            self.task_table.clear_rows()
+            self.tasks.clear()
+            self.task_columns = None
+            self.task_index.clear()
 
+            rows = []
             for _, row in df.iterrows():
                 # Read values from rows as-is
                 start_date = row.get("Start date", "")
@@ -1562,8 +3749,10 @@ class App:
                     start_date,
                     end_date,
                 ]
-                self.task_table.add_row(task_data)
+                rows.append(task_data)
+            self.task_table.add_rows(rows, notify=False)
 
+            self.highlight_conflicts()
             self.update_app()
             self.is_data_modified = False
             messagebox.showinfo("Success", "Tasks were loaded successfully.")
@@ -1575,7 +3764,8 @@ class App:
     ):
         file_path = Path(file_path)
         try:
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            target = AtomicFile(file_path, "wb")
+            with target as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
                 # Use default indexes when column names are not provided
                 df = (
                     pd.DataFrame(data, columns=column_names)
@@ -1639,29 +3829,8 @@ class App:
             return
 
         file_path = Path(file_path)
-        data = []
-        for item in self.task_table.get_children():
-            (
-                _,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            data.append(
-                (
-                    detail,
-                    setup,
-                    machine,
-                    quantity,
-                    time_per_unit,
-                    start_datetime,
-                    end_datetime,
-                )
-            )
+        table = self.task_table
+        data = [table.data[index][1:] for index in table.view]
 
         # Provide column names
         column_names = [
@@ -1692,29 +3861,8 @@ class App:
         self.figure.savefig(image_path, bbox_inches="tight")
         plt.close()
 
-        data = []
-        for item in self.task_table.get_children():
-            (
-                _,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            data.append(
-                [
-                    detail,
-                    setup,
-                    machine,
-                    quantity,
-                    time_per_unit,
-                    start_datetime,
-                    end_datetime,
-                ]
-            )
+        table = self.task_table
+        data = [list(table.data[index][1:]) for index in table.view]
 
         # Provide column names
         column_names = [
@@ -1748,6 +3896,12 @@ class App:
                 "There are unsaved changes in the database. Do you really want to exit?",
             ):
                 return
+        if self.journal is not None:
+            # Fold the saves into the CSV before exiting stops the worker threads
+            self.journal.wait()
+            self.compact_journal()
+        # Journals of databases closed earlier may still be folding in as well
+        ChangeJournal.wait_all()
         self.root.quit()
         self.root.destroy()
 
@@ -1828,22 +3982,26 @@ class App:
             )
             return
 
-        for child in self.nomenclature_table.get_children():
-            row_values = self.nomenclature_table.item(child, "values")
-
-            if (
-                row_values[1] == search_row[0]
-                and row_values[2] == search_row[1]
-                and row_values[3] == search_row[2]
-            ):
-                messagebox.showinfo(
-                    "Search result", f"Nomenclature found: {row_values}"
-                )
-                self.time_entry.delete(0, tk.END)
-                self.time_entry.insert(0, row_values[4])
-                return
+        index = self.find_nomenclature(*search_row)
+        if index is None:
+            messagebox.showwarning("Search result", "Nomenclature not found.")
+            return
 
-        messagebox.showwarning("Search result", "Nomenclature not found.")
+        row_values = self.nomenclature_table.data[index]
+        messagebox.showinfo("Search result", f"Nomenclature found: {row_values}")
+        self.time_entry.delete(0, tk.END)
+        self.time_entry.insert(0, row_values[4])
+
+    def fill_time_per_unit(self, event=None):
+        """Fill in the time per unit as soon as part, setup and machine match"""
+        index = self.find_nomenclature(
+            self.detail_entry.get().strip(),
+            self.setup_entry.get().strip(),
+            self.machine_combo.get().strip(),
+        )
+        if index is not None:
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, self.nomenclature_table.data[index][4])
 
     def add_task(self):
         detail = self.detail_entry.get().strip()
@@ -1897,8 +4055,11 @@ class App:
         self.update_app()
 
     def clear_tasks(self):
-        for item in self.task_table.get_children():
-            self.task_table.delete(item)
+        self.task_table.clear_rows()
+        self.tasks.clear()
+        self.task_columns = None
+        self.task_index.clear()
+        self.gantt.refresh()
         self.update_app()
 
     """Nomenclature tab actions"""
@@ -1912,42 +4073,31 @@ class App:
 
         if type_detail and drawing_number and setup and machine and time_per_unit:
             detail = f"{type_detail} {drawing_number}"
+            if not self.nomenclature_editable():
+                return
 
             # Check for an existing record with the same detail, setup, and machine
-            for row_id in self.nomenclature_table.get_children():
-                values = self.nomenclature_table.item(row_id, "values")
-                existing_detail = values[1].strip()
-                existing_setup = values[2].strip()
-                existing_machine = values[3].strip()
-
-                if (
-                    existing_detail == detail
-                    and existing_setup == setup
-                    and existing_machine == machine
-                ):
-                    messagebox.showinfo(
-                        "Information",
-                        f"A record with these values already exists at position {self.nomenclature_table.index(row_id) + 1}",
-                    )
+            index = self.find_nomenclature(detail, setup, machine)
+            if index is not None:
+                messagebox.showinfo(
+                    "Information",
+                    f"A record with these values already exists at position {index + 1}",
+                )
 
-                    # Highlight the existing entry
-                    self.nomenclature_table.selection_set(row_id)
-                    self.nomenclature_table.see(row_id)
-                    return
+                # Highlight the existing entry
+                self.nomenclature_table.select_row(index)
+                return
 
             # Add a new row when there is no duplicate
             self.nomenclature_table.add_row([detail, setup, machine, time_per_unit])
-            self.update_detail_list()
         else:
             messagebox.showwarning("Warning", "Please fill in all fields.")
 
     def edit_nomenclature(self):
         self.nomenclature_table.on_edit_row()
-        self.update_detail_list()
 
     def delete_nomenclature(self):
         self.nomenclature_table.delete_row()
-        self.update_detail_list()
 
     """Miscellaneous functions and methods"""
 
@@ -1972,13 +4122,35 @@ class App:
         else:
             self.ax.xaxis.set_major_locator(mdates.DayLocator(interval=5))
             self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%d.%m.%Y"))
-        self.canvas.draw_idle()
 
-    def generate_colors(self, num_colors):
-        """Generate colors in HSV format"""
-        return [
-            mcolors.hsv_to_rgb((i / num_colors, 0.8, 0.8)) for i in range(num_colors)
-        ]
+        # While scrolling, only the bars and the x-axis are redrawn
+        self.gantt.blit()
+        if self.zoom_job is not None:
+            self.root.after_cancel(self.zoom_job)
+        self.zoom_job = self.root.after(ZOOM_SETTLE_MS, self.stop_zoom)
+
+    def is_panning(self):
+        return self.toolbar.mode == "pan/zoom"
+
+    def start_pan(self, event):
+        """Blit the chart while the toolbar pans it"""
+        if self.is_panning() and event.inaxes is self.ax:
+            self.gantt.start_blit()
+            # The toolbar connects its drag handler on press, so this one runs after it
+            self.pan_motion = self.canvas.mpl_connect("motion_notify_event", self.pan)
+
+    def pan(self, event):
+        self.gantt.blit()
+
+    def stop_pan(self, event):
+        if self.pan_motion is not None:
+            self.canvas.mpl_disconnect(self.pan_motion)
+            self.pan_motion = None
+            self.gantt.stop_blit()
+
+    def stop_zoom(self):
+        self.zoom_job = None
+        self.gantt.stop_blit()
 
     def get_monday_at_midnight(self, reference_date):
         """Return Monday of the current week with time set to 00:00."""
@@ -1,25 +1,166 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from tkcalendar import DateEntry
-import json, csv, re, sys
+import json, csv, re, sys, heapq, bisect, itertools, queue, threading, gc
+import sqlite3, os, shutil, tempfile
 
 # import subprocess
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
+from matplotlib.collections import PolyCollection
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+from matplotlib.patches import Patch
 from openpyxl import load_workbook
 from openpyxl.styles import Alignment
 from openpyxl.drawing.image import Image
 from pathlib import Path
+from abc import ABC, abstractmethod
 import hashlib, uuid
 import markdown, webbrowser
 
 __version__ = "1.0.1"
 
+# Для планов такого размера и больше используется хранилище задач на NumPy
+COLUMNAR_MIN_TASKS = 5000
+
+# Сколько деталей показывать в легенде диаграммы Ганта до сводной строки
+LEGEND_MAX_PARTS = 30
+
+# Сколько строк выше и ниже видимых создаётся как элементы Tk
+VIRTUAL_BUFFER_ROWS = 100
+
+# Пауза ввода (мс) перед применением фильтра таблицы
+FILTER_DELAY_MS = 150
+
+# Пауза прокрутки (мс), после которой блиттинг сменяется полной перерисовкой
+ZOOM_SETTLE_MS = 200
+
+# Период (мс), с которым интерфейс забирает строки, разобранные потоком загрузки
+LOAD_POLL_MS = 50
+
+# Строки CSV, читаемые и проверяемые за одну порцию
+LOAD_BATCH_ROWS = 1000
+
+# Увеличивается при изменении формата файлов снимков базы
+SNAPSHOT_VERSION = 3
+
+# Расширения файлов, открываемых как базы номенклатуры SQLite, а не CSV
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Размер журнала, при котором сохранение переносит журнал обратно в CSV
+JOURNAL_COMPACT_BYTES = 1 << 20
+
+# Пауза после последнего сохранения перед переносом журнала в CSV
+JOURNAL_COMPACT_DELAY_MS = 5000
+
+# Буфер AtomicFile, чтобы большое сохранение шло на диск длинными записями подряд
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Позиции в строке номенклатуры столбцов, проверяемых при импорте
+ID_COLUMN = 0
+TIME_COLUMN = 4
+
+# Отклонённых строк на странице окна ошибок импорта
+ERROR_PAGE_ROWS = 500
+
+# Наибольшее число подсказок в списке AutoCompleteEntry
+AUTOCOMPLETE_MAX_HITS = 50
+
+# Наименьшая доля (0..1) введённых триграмм, которую содержит подсказка с опечаткой
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Самые похожие элементы, переранжируемые по расстоянию правки
+FUZZY_CANDIDATES = 200
+
+
+class AtomicFile:
+    """Запись файла через временную копию, которая заменяет его только целиком"""
+
+    def __init__(self, file_path, mode="w", backup=False, **kwargs):
+        self.file_path = Path(file_path)
+        self.temp_path = None  # Свой на каждую запись, создаётся рядом с файлом
+        # Предыдущая версия, заменяется при каждом сохранении
+        self.backup_path = (
+            self.file_path.with_name(self.file_path.name + ".bak") if backup else None
+        )
+        self.mode = mode
+        self.kwargs = kwargs  # Передаются в open, например encoding и newline
+        self.file = None
+
+    def __enter__(self):
+        # Уникальное имя: параллельные сохранения не делят временный файл,
+        # а собственный файл пользователя <имя>.tmp не затирается
+        fd, temp_path = tempfile.mkstemp(
+            prefix=self.file_path.name + ".", suffix=".tmp", dir=self.file_path.parent
+        )
+        self.temp_path = Path(temp_path)
+        try:
+            self.file = os.fdopen(
+                fd, self.mode, buffering=WRITE_BUFFER_BYTES, **self.kwargs
+            )
+        except BaseException:
+            os.close(fd)
+            self.temp_path.unlink(missing_ok=True)
+            raise
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.file.flush()
+                os.fsync(self.file.fileno())  # На диске до переименования
+            self.file.close()
+        except BaseException:
+            self.discard()
+            raise
+        if exc_type is not None:
+            self.discard()
+            return False
+
+        if self.file_path.exists():
+            # mkstemp создаёт файл закрытым; сохраняются права исходного файла
+            shutil.copymode(self.file_path, self.temp_path)
+            if self.backup_path is not None:
+                self.keep_backup()
+        self.temp_path.replace(self.file_path)  # Атомарно: виден старый или новый файл
+        self.sync_directory()
+        return False
+
+    def sync_directory(self):
+        """Сброс на диск записи каталога о переименовании, где этого требует POSIX"""
+        if os.name != "posix":
+            return
+        try:
+            fd = os.open(self.file_path.parent, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Не все файловые системы умеют синхронизировать каталог; сам файл сохранён
+            pass
+
+    def discard(self):
+        """Удаление незавершённого временного файла; исходный файл не меняется"""
+        try:
+            self.file.close()
+        except OSError:
+            pass
+        self.temp_path.unlink(missing_ok=True)
+
+    def keep_backup(self):
+        """Сохранение текущей версии как <имя>.bak, по возможности ссылкой, а не копией"""
+        self.backup_path.unlink(missing_ok=True)
+        try:
+            os.link(self.file_path, self.backup_path)
+        except OSError:
+            shutil.copy2(self.file_path, self.backup_path)
+
 
 class LicenseChecker:
     """Проверка лицензии"""
@@ -38,12 +179,129 @@ class LicenseChecker:
             return False
 
 
+class CompletionIndex:
+    """Отсортированные элементы и их индекс триграмм для поиска AutoCompleteEntry
+
+    Не содержит виджетов, поэтому большой индекс можно строить в рабочем потоке.
+    """
+
+    def __init__(self):
+        self.items = []  # Элементы, отсортированные без учёта регистра
+        self.lowered = []  # items в нижнем регистре, в том же порядке
+        self.joined = None  # lowered через перевод строки, для коротких значений
+        self.starts = []  # Смещение каждого элемента lowered в joined
+        self.slots = {}  # Элемент -> его ячейка в индексе триграмм
+        self.slot_items = []  # Элемент каждой ячейки, None после освобождения
+        self.slot_lowered = []  # Элемент каждой ячейки в нижнем регистре
+        self.free_slots = []
+        self.trigrams = {}  # Триграмма или подпись слова -> ячейки элементов
+        self.postings = {}  # Ключ индекса -> массив его ячеек до их изменения
+
+    def update(self, added=(), removed=()):
+        """Добавление и удаление элементов с обновлением списка и индекса триграмм"""
+        added = {item for item in added if item not in self.slots}
+        removed = {item for item in removed if item in self.slots}
+        if not added and not removed:
+            return
+        self.joined = None
+        for item in removed:
+            self.unindex_item(item)
+        for item in added:
+            self.index_item(item)
+        if len(added) + len(removed) > len(self.slots) // 100:
+            # Много изменений дешевле отсортировать заново, чем вставлять по одному
+            self.items = sorted(self.slots, key=str.lower)
+            self.lowered = [item.lower() for item in self.items]
+            return
+        for item in removed:
+            position = bisect.bisect_left(self.lowered, item.lower())
+            while self.items[position] != item:
+                position += 1
+            del self.items[position]
+            del self.lowered[position]
+        for item in added:
+            position = bisect.bisect_right(self.lowered, item.lower())
+            self.items.insert(position, item)
+            self.lowered.insert(position, item.lower())
+
+    def index_item(self, item):
+        """Выделение ячейки элементу и добавление его в списки его ключей"""
+        if not self.free_slots:
+            self.free_slots.append(len(self.slot_items))
+            self.slot_items.append(None)
+            self.slot_lowered.append("")
+        slot = self.free_slots.pop()
+        keys = self.index_keys(item)
+        self.slots[item] = slot
+        self.slot_items[slot] = item
+        self.slot_lowered[slot] = item.lower()
+        for key in keys:
+            self.trigrams.setdefault(key, {})[slot] = None
+            self.postings.pop(key, None)
+
+    def unindex_item(self, item):
+        """Удаление элемента из списков его ключей и освобождение ячейки"""
+        slot = self.slots.pop(item)
+        for key in self.index_keys(item):
+            slots = self.trigrams[key]
+            del slots[slot]
+            if not slots:
+                del self.trigrams[key]
+            self.postings.pop(key, None)
+        self.slot_items[slot] = None
+        self.slot_lowered[slot] = ""
+        self.free_slots.append(slot)
+
+    def index_keys(self, item):
+        """Триграммы и подписи слов, по которым индексируется элемент"""
+        return self.trigrams_of(item, padded=True) | self.signatures_of(item)
+
+    def posting(self, key):
+        """Ячейки элементов с ключом key массивом, пока они не изменятся"""
+        slots = self.postings.get(key)
+        if slots is None:
+            slots = self.trigrams[key]
+            slots = self.postings[key] = np.fromiter(slots, np.int64, len(slots))
+        return slots
+
+    @staticmethod
+    def normalize(text):
+        """Буквы и цифры text в нижнем регистре, без пробелов и знаков"""
+        return re.sub(r"[\W_]+", "", text.lower())
+
+    @classmethod
+    def trigrams_of(cls, text, padded=False):
+        """Множество подстрок из 3 символов по буквам и цифрам text"""
+        if not padded:
+            text = cls.normalize(text)
+            return {text[i : i + 3] for i in range(len(text) - 2)}
+        # Краевые триграммы уменьшают потерю общих триграмм при опечатке у края;
+        # у каждого слова они свои, поэтому номер чертежа находится и без названия
+        words = [word for word in map(cls.normalize, text.split()) if word]
+        text = f"  {''.join(words)} "
+        grams = {text[i : i + 3] for i in range(len(text) - 2)}
+        for word in words:
+            word = f"  {word} "
+            grams.update((word[:3], word[1:4], word[-3:]))
+        return grams
+
+    @classmethod
+    def signatures_of(cls, text):
+        """Отсортированные буквы и цифры каждого слова, не меняющиеся от перестановки"""
+        words = [word for word in map(cls.normalize, text.split()) if word]
+        return {"#" + "".join(sorted(word)) for word in words}
+
+
 class AutoCompleteEntry(tk.Entry):
     """Поле ввода с автозаполнением"""
 
-    def __init__(self, master=None, **kwargs):
+    def __init__(self, master=None, preferred=None, **kwargs):
         super().__init__(master, **kwargs)
-        self._completion_list = []
+        self.preferred = preferred  # Возвращает элементы, показываемые первыми
+        self._index = CompletionIndex()
+        self._build = None  # (рабочий поток, заполняемый им индекс) при перестроении
+        self._build_job = None
+        self._pending = []  # (добавленные, удалённые) с начала перестроения
         self._hits = []
         self._hit_index = 0
 
@@ -56,7 +314,169 @@ class AutoCompleteEntry(tk.Entry):
         self.bind("<KeyRelease>", self.handle_keyrelease)
 
     def set_completion_list(self, completion_list):
-        self._completion_list = sorted(completion_list)
+        """Замена элементов; новый индекс строится в рабочем потоке"""
+        items = list(completion_list)
+        if self._build is None and self._index.slots.keys() == set(items):
+            return
+        index = CompletionIndex()
+        # Индексирование всех деталей большой номенклатуры остановило бы интерфейс
+        thread = threading.Thread(target=index.update, args=(items,), daemon=True)
+        self._build = (thread, index)
+        self._pending = []
+        thread.start()
+        if self._build_job is None:
+            self._build_job = self.after(LOAD_POLL_MS, self.poll_build)
+
+    def poll_build(self):
+        """Подстановка перестроенного индекса, когда его поток закончил"""
+        thread, index = self._build
+        if thread.is_alive():
+            self._build_job = self.after(LOAD_POLL_MS, self.poll_build)
+            return
+        self._build = None
+        self._build_job = None
+        # Изменения, сделанные во время построения, применяются и к нему
+        for added, removed in self._pending:
+            index.update(added, removed)
+        self._pending = []
+        self._index = index
+
+    def update_completions(self, added=(), removed=()):
+        """Добавление и удаление нескольких элементов на месте, как при правке строки"""
+        self._index.update(added, removed)
+        if self._build is not None:
+            self._pending.append((list(added), list(removed)))
+
+    def find_hits(self, value):
+        """До AUTOCOMPLETE_MAX_HITS элементов: с начала, подстрокой, затем похожие"""
+        index = self._index
+        value = value.lower()
+        hits = []
+        # Совпадения с начала строки идут подряд в отсортированном списке
+        position = bisect.bisect_left(index.lowered, value)
+        while (
+            position < len(index.lowered)
+            and len(hits) < AUTOCOMPLETE_MAX_HITS
+            and index.lowered[position].startswith(value)
+        ):
+            hits.append(index.items[position])
+            position += 1
+        tiers = [0] * len(hits)
+
+        grams = index.trigrams_of(value)
+        limit = AUTOCOMPLETE_MAX_HITS - len(hits)
+        if limit and grams:
+            # value может входить только в элементы с её самой редкой триграммой
+            slots = min((index.trigrams.get(gram, ()) for gram in grams), key=len)
+            lowered = index.slot_lowered
+            found = [
+                slot
+                for slot in slots
+                if value in lowered[slot] and not lowered[slot].startswith(value)
+            ]
+            # Ячейки идут в произвольном порядке; совпадения выводятся по алфавиту
+            for slot in heapq.nsmallest(limit, found, key=lowered.__getitem__):
+                hits.append(index.slot_items[slot])
+                tiers.append(1)
+        elif limit:
+            # Слишком коротко для триграммы: поиск по всем элементам, склеенным в строку
+            if index.joined is None:
+                index.joined = "\n".join(index.lowered)
+                lengths = (len(item) + 1 for item in index.lowered)
+                index.starts = [0, *itertools.accumulate(lengths)]
+            position = index.joined.find(value)
+            while position >= 0 and len(hits) < AUTOCOMPLETE_MAX_HITS:
+                number = bisect.bisect_right(index.starts, position) - 1
+                if position > index.starts[number]:
+                    hits.append(index.items[number])
+                    tiers.append(1)
+                position = index.joined.find(value, index.starts[number + 1])
+
+        if grams and len(hits) < AUTOCOMPLETE_MAX_HITS:
+            exclude = [index.slots[item] for item in hits]
+            fuzzy = self.fuzzy_hits(value, AUTOCOMPLETE_MAX_HITS - len(hits), exclude)
+            hits += [index.slot_items[slot] for slot in fuzzy]
+            tiers += [2] * len(fuzzy)
+
+        items = hits
+        preferred = self.preferred() if self.preferred else None
+        if preferred:
+            # Внутри каждого вида совпадений предпочтительные элементы идут первыми
+            order = sorted(
+                range(len(items)), key=lambda i: (tiers[i], items[i] not in preferred)
+            )
+            items = [items[i] for i in order]
+        return items
+
+    def fuzzy_hits(self, value, limit, exclude):
+        """Ячейки не более limit элементов, содержащих больше всего триграмм value"""
+        index = self._index
+        grams = index.trigrams_of(value, padded=True)
+        keys = [gram for gram in grams if gram in index.trigrams]
+        # Перестановка рвёт до трёх триграмм слова, но сохраняет его подпись
+        keys += 3 * [key for key in index.signatures_of(value) if key in index.trigrams]
+        if not keys:
+            return []
+        postings = [index.posting(key) for key in keys]
+        # Оценка — число введённых триграмм в элементе, что бы он ещё ни содержал
+        shared = np.bincount(np.concatenate(postings), minlength=len(index.slot_items))
+        shared[exclude] = 0
+        if FUZZY_CANDIDATES < len(shared):
+            best = np.argpartition(-shared, FUZZY_CANDIDATES)[:FUZZY_CANDIDATES]
+        else:
+            best = np.arange(len(shared))
+        least = FUZZY_MIN_SIMILARITY * len(grams)
+        best = [int(p) for p in best if shared[p] >= least]
+        if not best:
+            return []
+        # Триграммы отбирают кандидатов, расстояние правки ставит ближайших первыми
+        items = [index.slot_items[p] for p in best]
+        distances = dict(zip(best, self.edit_distances(value, items)))
+        best.sort(key=lambda p: (distances[p], -shared[p], index.slot_lowered[p]))
+        return best[:limit]
+
+    @classmethod
+    def edit_distances(cls, value, items):
+        """Число правок (вставка, удаление, замена, перестановка) из value в элементы.
+
+        value может совпадать и с любой последовательностью целых слов элемента,
+        например с одним номером чертежа. Все элементы считаются сразу, по строкам.
+        """
+        a = CompletionIndex.normalize(value)
+        words = [
+            [CompletionIndex.normalize(word) for word in item.split()] for item in items
+        ]
+        width = max(sum(map(len, item_words)) for item_words in words)
+        text = "".join("".join(item_words).ljust(width, "\0") for item_words in words)
+        b = np.frombuffer(text.encode("utf-32-le"), np.uint32).reshape(
+            len(items), width
+        )
+        # Пропуск целых слов бесплатен, пропуск части слова — нет
+        lead = np.zeros((len(items), width + 1), dtype=int)
+        trail = np.full((len(items), width + 1), len(a) + width)
+        for row, item_words in enumerate(words):
+            start = trail[row, 0] = 0
+            for word in item_words:
+                end = start + len(word)
+                lead[row, start : end + 1] = np.arange(len(word) + 1)
+                trail[row, start + 1 : end + 1] = np.arange(len(word) - 1, -1, -1)
+                start = end
+
+        columns = np.arange(width + 1)
+        before, previous = None, lead
+        for i, char in enumerate(map(ord, a), 1):
+            current = np.empty_like(previous)
+            current[:, 0] = i
+            replaced = previous[:, :-1] + (b != char)
+            current[:, 1:] = np.minimum(replaced, previous[:, 1:] + 1)
+            if i > 1:
+                swap = (b[:, :-1] == char) & (b[:, 1:] == ord(a[i - 2]))
+                swapped = np.minimum(current[:, 2:], before[:, :-2] + 1)
+                current[:, 2:] = np.where(swap, swapped, current[:, 2:])
+            # Вставки переносят счёт вправо, по одной правке на колонку
+            current = np.minimum.accumulate(current - columns, axis=1) + columns
+            before, previous = previous, current
+        return (previous + trail).min(axis=1)
 
     def handle_keyrelease(self, event):
         if event.keysym in (
@@ -78,9 +498,7 @@ class AutoCompleteEntry(tk.Entry):
             return
 
         # Поиск совпадений в любом месте строки
-        self._hits = [
-            item for item in self._completion_list if value.lower() in item.lower()
-        ]
+        self._hits = self.find_hits(value)
 
         # Обновляем Listbox
         self.update_listbox()
@@ -106,6 +524,7 @@ class AutoCompleteEntry(tk.Entry):
         self.delete(0, tk.END)
         self.insert(0, selected)
         self.listbox.place_forget()  # Скрываем список после выбора
+        self.event_generate("<<AutoCompleteSelected>>")
 
     def on_listbox_keyrelease(self, event):
         if event.keysym == "Up":
@@ -157,11 +576,22 @@ class EditableTreeview(ttk.Treeview):
     """Editable Treeview c dополнительными функциями"""
 
     def __init__(
-        self, parent, columns, valid_values=None, update_app=None, *args, **kwargs
+        self,
+        parent,
+        columns,
+        valid_values=None,
+        update_app=None,
+        on_row_change=None,
+        can_edit=None,
+        *args,
+        **kwargs,
     ):
         super().__init__(parent, columns=columns, show="headings", *args, **kwargs)
-        self.validator = Validator(valid_values or {})
+        # ID проверяются и сортируются как целые числа
+        self.validator = Validator({"ID": "positive_integer", **(valid_values or {})})
         self.update_app = update_app
+        self.on_row_change = on_row_change
+        self.can_edit = can_edit  # Можно ли сейчас менять строки; иначе предупреждает
 
         for col in columns:
             self.heading(
@@ -170,9 +600,29 @@ class EditableTreeview(ttk.Treeview):
             self.column(col, width=100)
 
         self.data = []
+        self.row_indexes = {}  # ID строки -> индекс в self.data
+        self.view = []  # Индексы self.data, прошедшие фильтр, в порядке показа
+        self.filter_text = ""
+        self.pending_filter = ""
+        self.filter_job = None
+        self.sort_columns = []  # (индекс колонки, reverse), главная колонка первой
+        self.sort_keys = {}  # Индекс колонки -> типизированные ключи строк self.data
+        self.search_keys = {}  # Строка -> текст в нижнем регистре для фильтра
+        self.row_tags = {}  # ID строки -> теги, сохраняются при фильтрации и сортировке
+        self.item_ids = {}  # ID строки -> элемент Tk, отображающий строку
+        self.selected_ids = set()  # ID выделенных строк, в том числе вне окна
+        # Элементы Tk есть только у view[window_start:window_start + len(window_items)]
+        self.window_start = 0
+        self.window_items = []
+        self.window_rows = []  # Индексы self.data, показанные window_items
+        self.first_row = 0  # Позиция в view, показанная вверху
+        self.page_rows = 50  # Сколько строк помещается в окне, измеряется при прокрутке
+        self.scroll_job = None
+        self.yscrollcommand = None
+        super().configure(yscrollcommand=self.on_tk_scroll)
         self.columns_list = columns
-        self.id_counter = 1  # Счётчик для уникальных ID
-        self.editing_entry = None
+        self.id_counter = 1  # Следующий свободный ID, только растёт
+        self.editing_cell = None  # (Entry, ID строки, колонка) открытого редактора
         self.non_editable_columns = ["ID"]  # Запрещённые для редактирования колонки
         self.bind("<Double-1>", self.on_double_click)
         # Привязка клавиш
@@ -184,6 +634,13 @@ class EditableTreeview(ttk.Treeview):
         self.bind("<Control-v>", self.cmd_paste)
         self.bind("<Control-x>", self.cmd_cut)
         self.bind("<Control-a>", self.cmd_select_all)
+        # Shift-клик по заголовку добавляет дополнительную колонку сортировки
+        self.bind("<Shift-Button-1>", self.on_shift_click)
+        # Выделение хранится в модели, Tk выделяет только строки окна
+        self.bind("<<TreeviewSelect>>", self.on_select)
+        self.bind("<Button-1>", self.on_click)
+        self.bind("<Up>", self.on_arrow_key)
+        self.bind("<Down>", self.on_arrow_key)
 
     def keypress(self, e):
         """Обработчик комбинаций клавиш для вставки, копирования и вырезания"""
@@ -202,11 +659,12 @@ class EditableTreeview(ttk.Treeview):
         if isinstance(widget, tk.Entry) or isinstance(widget, tk.Text):
             widget.event_generate("<<Copy>>")
         elif isinstance(widget, EditableTreeview):
-            selected_item = self.selection()
-            if selected_item:
-                values = self.item(selected_item, "values")
+            rows = self.selected_rows()
+            if len(rows):
                 self.clipboard_clear()
-                self.clipboard_append("\t".join(values))
+                self.clipboard_append(
+                    "\n".join("\t".join(map(str, self.data[index])) for index in rows)
+                )
 
     def cmd_cut(self, event=None):
         """Обработчик команды вырезания"""
@@ -226,12 +684,17 @@ class EditableTreeview(ttk.Treeview):
         if isinstance(widget, tk.Entry) or isinstance(widget, tk.Text):
             widget.event_generate("<<SelectAll>>")
         elif isinstance(widget, EditableTreeview):
-            self.selection_set(self.get_children())
+            self.selected_ids = {str(self.data[index][0]) for index in self.view}
+            self.selection_set(self.window_items)
+
+    def editable(self):
+        """Можно ли сейчас менять строки; иначе can_edit предупреждает"""
+        return self.can_edit is None or self.can_edit()
 
     def on_double_click(self, event):
         """Обработчик двойного клика для редактирования ячейки"""
         selected_item = self.selection()
-        if selected_item:
+        if selected_item and self.editable():
             column = self.identify_column(event.x)
             col_index = int(column.replace("#", "")) - 1  # Индекс колонки
             col_name = self.columns_list[col_index]
@@ -240,23 +703,38 @@ class EditableTreeview(ttk.Treeview):
             if (
                 col_name not in self.non_editable_columns
             ):  # Если колонка не в списке запрещённых
-                self.edit_cell(selected_item, col_index)
+                self.edit_cell(selected_item[0], col_index)
 
     def edit_cell(self, item, col):
         """Редактирование ячейки"""
-        x, y, width, height = self.bbox(item, col)
+        # Прокрутка может удалить элемент, поэтому редактор следует за ID строки
+        row_id = str(self.data[self.row_index(item)][0])
         cell_value = self.item(item, "values")[col]
+        self.cancel_edit()
 
         entry = tk.Entry(self)
         entry.insert(0, cell_value)
-        entry.place(x=x, y=y, width=width, height=height)
+        self.editing_cell = (entry, row_id, col)
+        self.place_editor()
 
         entry.focus()
-        entry.bind("<Return>", lambda event: self.save_cell(entry, item, col))
+        entry.bind("<Return>", lambda event: self.save_cell(entry, row_id, col))
         entry.bind("<FocusOut>", lambda event: self.cancel_edit(entry))
-        entry.bind("<Escape>", lambda event: self.cancel_edit(entry))
+        entry.bind("<Escape>", lambda event: self.cancel_edit(entry) or "break")
+
+    def place_editor(self):
+        """Редактор ячейки над своей строкой; закрывается, когда строки не видно"""
+        entry, row_id, col = self.editing_cell
+        item_id = self.item_ids.get(row_id)
+        exists = item_id is not None and self.exists(item_id)
+        bbox = self.bbox(item_id, col) if exists else ""
+        if not bbox:
+            self.cancel_edit(entry)
+            return
+        x, y, width, height = bbox
+        entry.place(x=x, y=y, width=width, height=height)
 
-    def save_cell(self, entry, item, col):
+    def save_cell(self, entry, row_id, col):
         """Сохранение редактируемой ячейки"""
         if entry.winfo_exists():
             new_value = entry.get()
@@ -267,109 +745,401 @@ class EditableTreeview(ttk.Treeview):
                 entry.focus_set()
                 return
 
-            if self.validator.validate_value(column, new_value):
-                self.item(item, values=self.get_values(item, col, new_value))
-            entry.destroy()
+            index = self.row_indexes.get(row_id)
+            if index is not None and self.validator.validate_value(column, new_value):
+                values = list(self.data[index])
+                values[col] = new_value
+                item_id = self.item_ids.get(row_id)
+                if item_id is not None and self.exists(item_id):
+                    self.item(item_id, values=values)
+                self.set_row(index, tuple(values))
+                self.notify_row_change(values[0], values)
+            self.cancel_edit(entry)
             if self.update_app:
                 self.update_app()
 
-    def cancel_edit(self, entry):
-        """Отмена редактирования ячейки"""
-        if entry.winfo_exists():
+    def cancel_edit(self, entry=None):
+        """Закрытие редактора ячейки или только entry, если открыт другой"""
+        if self.editing_cell is not None and entry in (None, self.editing_cell[0]):
+            entry = self.editing_cell[0]
+            self.editing_cell = None
+        if entry is not None and entry.winfo_exists():
             entry.destroy()
 
-    def get_values(self, item, col, new_value):
-        """Получаем текущие значения строки и заменяем значение в нужной колонке"""
-        values = list(self.item(item, "values"))
-        values[col] = new_value
-        return values
-
     def get_column_values_by_index(self, column_index):
         """Собираем все значения из указанной колонки по её индексу"""
-        column_values = [
-            self.item(row_id, "values")[column_index] for row_id in self.get_children()
-        ]
-
-        return column_values
+        return [row[column_index] for row in self.data]
 
     def insert_data(self, data):
         """Вставка данных в таблицу"""
-        self.data = data
-        self.populate_data(self.data)
+        self.data = [tuple(row) for row in data]
+        self.index_rows()
+        # Новые ID продолжают максимальный загруженный
+        self.id_counter = max((int(row[0]) for row in self.data), default=0) + 1
+        self.selected_ids.clear()
+        self.sort_keys.clear()
+        self.search_keys.clear()
+        self.refresh_view()
 
     def clear_data(self):
-        """Очистка данных в таблице"""
+        """Очистка элементов Tk в таблице"""
         self.delete(*self.get_children())
+        self.item_ids.clear()
+        self.window_start = 0
+        self.window_items = []
+        self.window_rows = []
 
-    def populate_data(self, data):
-        """Заполнение таблицы данными"""
+    def clear_rows(self):
+        """Удаление всех строк из данных и из таблицы"""
+        self.data = []
+        self.row_indexes.clear()
+        self.id_counter = 1
+        self.row_tags.clear()
+        self.selected_ids.clear()
+        self.sort_keys.clear()
+        self.search_keys.clear()
+        self.refresh_view()
+
+    def index_rows(self):
+        """Сопоставление ID каждой строки с её индексом в self.data"""
+        self.row_indexes = {str(row[0]): index for index, row in enumerate(self.data)}
+
+    def refresh_view(self, first=0):
+        """Повторное применение фильтра к self.data и перерисовка видимых строк"""
+        if self.filter_text:
+            self.view = [
+                index for index, row in enumerate(self.data) if self.matches_filter(row)
+            ]
+        else:
+            self.view = list(range(len(self.data)))
         self.clear_data()
-        for row in data:
-            self.insert("", "end", values=row)
+        self.show_rows(first)
+
+    def matches_filter(self, row):
+        """Проверка строки по тексту фильтра"""
+        if not self.filter_text:
+            return True
+        return self.filter_text in self.search_key(row)
+
+    def search_key(self, row):
+        """Текст строки в нижнем регистре, вычисляется один раз для строки"""
+        key = self.search_keys.get(row)
+        if key is None:
+            key = "\0".join(str(value).lower() for value in row)
+            self.search_keys[row] = key
+        return key
+
+    def show_rows(self, first=None):
+        """Создание строк вокруг позиции first с повторным использованием элементов"""
+        if first is None:
+            first = self.first_row
+        first = max(0, min(first, len(self.view) - self.page_rows))
+        start = max(0, first - VIRTUAL_BUFFER_ROWS)
+        end = min(len(self.view), first + self.page_rows + VIRTUAL_BUFFER_ROWS)
+
+        # Элементы оставшихся строк сохраняются; оба списка идут в порядке self.data
+        rows = self.view[start:end]
+        shown = dict(zip(self.window_rows, self.window_items))
+        wanted = set(rows)
+        self.delete(*[item for row, item in shown.items() if row not in wanted])
+        items = [
+            shown[row] if row in shown else self.insert_row(row, position)
+            for position, row in enumerate(rows)
+        ]
+
+        self.window_start = start
+        self.window_items = items
+        self.window_rows = rows
+        self.first_row = first
+        if items:
+            self.yview_moveto((first - start) / len(items))
+        if self.editing_cell is not None:
+            self.place_editor()
+        self.update_scrollbar()
+
+    def insert_row(self, index, position="end"):
+        """Вставка строки self.data[index] с сохранёнными тегами"""
+        row = self.data[index]
+        row_id = str(row[0])
+        self.item_ids[row_id] = self.insert(
+            "", position, values=row, tags=self.row_tags.get(row_id, ())
+        )
+        if row_id in self.selected_ids:
+            self.selection_add(self.item_ids[row_id])
+        return self.item_ids[row_id]
+
+    def row_index(self, item):
+        """Индекс в self.data строки, показанной элементом Tk, по её ID"""
+        return self.row_indexes[str(self.item(item, "values")[0])]
+
+    def select_row(self, index):
+        """Прокрутка к строке self.data[index] и её выделение, если она не отфильтрована"""
+        position = bisect.bisect_left(self.view, index)
+        if position == len(self.view) or self.view[position] != index:
+            return
+        self.selected_ids = {str(self.data[index][0])}
+        self.show_rows(position - self.page_rows // 2)
+        item = self.window_items[position - self.window_start]
+        self.selection_set(item)
+        self.see(item)
+
+    def on_select(self, event=None):
+        """Перенос выделения Tk по строкам окна в selected_ids"""
+        selected = set(self.selection())
+        for row, item in zip(self.window_rows, self.window_items):
+            row_id = str(self.data[row][0])
+            if item in selected:
+                self.selected_ids.add(row_id)
+            else:
+                self.selected_ids.discard(row_id)
+
+    def on_click(self, event):
+        """Обычный клик по строке заменяет выделение, включая строки вне окна"""
+        if event.state & 0x5:  # Shift или Control расширяют выделение
+            return
+        if self.identify_region(event.x, event.y) in ("cell", "tree"):
+            self.deselect_hidden()
+
+    def on_arrow_key(self, event):
+        """Стрелки переносят одиночное выделение, как обычный клик"""
+        self.deselect_hidden()
+
+    def deselect_hidden(self):
+        """Снятие выделения со строк вне окна; остальное сделает on_select"""
+        shown = {str(self.data[row][0]) for row in self.window_rows}
+        self.selected_ids &= shown
+
+    def selected_rows(self):
+        """Индексы в self.data выделенных строк, прошедших фильтр, по порядку"""
+        selected = np.zeros(len(self.data), dtype=bool)
+        selected[[self.row_indexes[row_id] for row_id in self.selected_ids]] = True
+        shown = np.zeros(len(self.data), dtype=bool)
+        shown[self.view] = True
+        return np.flatnonzero(selected & shown)
+
+    def yview(self, *args):
+        """Прокрутка всего списка; полоса прокрутки вызывает её как обычный yview"""
+        if not args:
+            return self.scroll_fractions()
+        if args[0] == "moveto":
+            self.show_rows(round(float(args[1]) * len(self.view)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.page_rows if args[2] == "pages" else 1)
+            self.show_rows(self.first_row + step)
+
+    def configure(self, cnf=None, **kw):
+        """Полоса прокрутки следует за всем списком, а не за элементами Tk"""
+        if "yscrollcommand" in kw:
+            self.yscrollcommand = kw.pop("yscrollcommand")
+            self.update_scrollbar()
+        return super().configure(cnf, **kw)
+
+    config = configure
+
+    def on_tk_scroll(self, low, high):
+        """Отслеживание обычной прокрутки (колесо, клавиши) созданных строк"""
+        if self.window_items:
+            count = len(self.window_items)
+            self.page_rows = max(1, round((float(high) - float(low)) * count))
+            self.first_row = self.window_start + round(float(low) * count)
+        self.update_scrollbar()
+
+        # Расширяем окно до того, как обычная прокрутка дойдёт до его края
+        margin = VIRTUAL_BUFFER_ROWS // 2
+        window_end = self.window_start + len(self.window_items)
+        near_top = self.window_start > 0 and self.first_row < self.window_start + margin
+        near_bottom = (
+            window_end < len(self.view)
+            and self.first_row + self.page_rows > window_end - margin
+        )
+        if (near_top or near_bottom) and self.scroll_job is None:
+            self.scroll_job = self.after_idle(self.on_scroll_idle)
+
+    def on_scroll_idle(self):
+        """Сдвиг окна строк после прокрутки"""
+        self.scroll_job = None
+        self.show_rows()
+
+    def scroll_fractions(self):
+        """Доли видимой части всего списка для полосы прокрутки"""
+        if not self.view:
+            return 0.0, 1.0
+        total = len(self.view)
+        last = min(total, self.first_row + self.page_rows)
+        return self.first_row / total, last / total
+
+    def update_scrollbar(self):
+        """Обновление полосы прокрутки"""
+        if self.yscrollcommand:
+            self.yscrollcommand(*self.scroll_fractions())
+
+    def set_row_tags(self, row_id, tags):
+        """Установка тегов строки, даже если она сейчас скрыта"""
+        if tags:
+            self.row_tags[row_id] = tags
+        else:
+            self.row_tags.pop(row_id, None)
+        item_id = self.item_ids.get(row_id)
+        if item_id is not None and self.exists(item_id):
+            self.item(item_id, tags=tags)
+
+    def notify_row_change(self, row_id, values):
+        """Сообщение о добавленной, изменённой (values) или удалённой (None) строке"""
+        if self.on_row_change:
+            self.on_row_change(str(row_id), values)
 
     def filter_rows(self, filter_text):
-        """Фильтрация строк по тексту"""
-        if not filter_text:
-            filtered_data = self.data
+        """Фильтрация строк по тексту после паузы ввода"""
+        self.pending_filter = filter_text.lower()
+        if self.filter_job is not None:
+            self.after_cancel(self.filter_job)
+        self.filter_job = self.after(FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        """Сужение или пересборка списка строк по новому тексту фильтра"""
+        self.filter_job = None
+        text = self.pending_filter
+        if text == self.filter_text:
+            return
+        if text.startswith(self.filter_text):
+            # Более длинный фильтр может только убрать строки из текущего списка
+            candidates = self.view
         else:
-            filtered_data = [
-                row
-                for row in self.data
-                if any(filter_text.lower() in str(value).lower() for value in row)
-            ]
-        self.populate_data(filtered_data)
+            candidates = range(len(self.data))
+        self.filter_text = text
+        self.view = [
+            index for index in candidates if self.matches_filter(self.data[index])
+        ]
+        self.show_rows(0)
 
     def sort_column(self, col, reverse):
-        """Сортировка по колонке"""
-        data = [(self.item(k, "values"), k) for k in self.get_children("")]
-        data.sort(key=lambda x: x[0][self.columns_list.index(col)], reverse=reverse)
-
-        self.data = [x[0] for x in data]
-        self.populate_data(self.data)
+        """Сортировка по одной колонке"""
+        column_index = self.columns_list.index(col)
+        self.sort_columns = [(column_index, reverse)]
+        self.sort_data()
 
         self.heading(col, command=lambda: self.sort_column(col, not reverse))
 
-    def generate_unique_id(self):
-        existing_ids = [
-            int(self.item(row_id, "values")[0]) for row_id in self.get_children()
-        ]
-
-        # Генерируем уникальный ID, который больше максимального существующего ID
-        if existing_ids:
-            return max(existing_ids) + 1
+    def on_shift_click(self, event):
+        """Добавление заголовка в сортировку или смена её направления"""
+        if self.identify_region(event.x, event.y) != "heading":
+            return
+        column_index = int(self.identify_column(event.x).replace("#", "")) - 1
+        for position, (index, reverse) in enumerate(self.sort_columns):
+            if index == column_index:
+                self.sort_columns[position] = (index, not reverse)
+                break
         else:
-            return 1  # Если записей еще нет, начинаем с 1
+            self.sort_columns.append((column_index, False))
+        self.sort_data()
+        return "break"
+
+    def sort_data(self):
+        """Устойчивая сортировка self.data по колонкам, начиная с младшей"""
+        order = np.arange(len(self.data))
+        for column_index, reverse in reversed(self.sort_columns):
+            keys = self.column_sort_keys(column_index)[order]
+            if reverse and keys.dtype.kind == "f":
+                # Нераспознанные значения равны NaN и после смены знака остаются в конце
+                order = order[np.argsort(-keys, kind="stable")]
+            elif reverse:
+                # По убыванию, но строки с равными ключами сохраняют порядок
+                order = order[::-1][np.argsort(keys[::-1], kind="stable")[::-1]]
+            else:
+                order = order[np.argsort(keys, kind="stable")]
+        self.data = [self.data[index] for index in order]
+        self.index_rows()
+        self.sort_keys = {
+            column_index: keys[order] for column_index, keys in self.sort_keys.items()
+        }
+        self.refresh_view(self.first_row)
+
+    def column_sort_keys(self, column_index):
+        """Ключи сортировки колонки, вычисляются один раз до изменения данных"""
+        if column_index not in self.sort_keys:
+            rows = range(len(self.data))
+            self.sort_keys[column_index] = self.rows_sort_keys(column_index, rows)
+        return self.sort_keys[column_index]
+
+    def rows_sort_keys(self, column_index, indexes):
+        """Ключи сортировки одной колонки для строк self.data с индексами indexes"""
+        column = self.columns_list[column_index]
+        values = [self.data[index][column_index] for index in indexes]
+        return self.validator.sort_keys(column, values)
+
+    def set_row(self, index, row):
+        """Замена строки self.data[index] и её элементов в кэше ключей сортировки"""
+        self.data[index] = row
+        for column_index, keys in self.sort_keys.items():
+            keys[index] = self.rows_sort_keys(column_index, [index])[0]
+
+    def generate_unique_id(self):
+        """Выдача следующего ID; удалённые ID повторно не используются"""
+        new_id = self.id_counter
+        self.id_counter += 1
+        return new_id
 
-    def add_row(self, row_data):
+    def add_row(self, row_data, notify=True):
         """Генерация уникального ID и добавление строки"""
-        new_id = self.generate_unique_id()
-        row_data_with_id = [new_id] + row_data
-        self.data.append(tuple(row_data_with_id))
-        self.insert("", "end", values=row_data_with_id)
+        self.add_rows([row_data], notify)
+
+    def add_rows(self, rows, notify=True):
+        """Добавление строк с новыми ID и одна перерисовка таблицы"""
+        first = len(self.data)
+        for row_data in rows:
+            new_id = self.generate_unique_id()
+            self.data.append(tuple([new_id] + row_data))
+            self.row_indexes[str(new_id)] = len(self.data) - 1
+        added = range(first, len(self.data))
+        self.sort_keys = {
+            column_index: np.concatenate(
+                [keys, self.rows_sort_keys(column_index, added)]
+            )
+            for column_index, keys in self.sort_keys.items()
+        }
+        self.view.extend(
+            index for index in added if self.matches_filter(self.data[index])
+        )
+        self.show_rows()
+        if notify:
+            for index in added:
+                row = self.data[index]
+                self.notify_row_change(row[0], list(row))
 
     def delete_row(self, event=None):
         """Удаление выбранной строки"""
-        selected_items = self.selection()
-        if selected_items:
+        rows = self.selected_rows()
+        if len(rows) and self.editable():
             confirm = messagebox.askyesno(
                 "Подтверждение удаления",
                 "Вы уверены, что хотите удалить выбранные строки?",
             )
             if confirm:
-                for item_id in selected_items:
-                    item_index = self.index(item_id)
-                    if 0 <= item_index < len(self.data):
-                        del self.data[item_index]
-                    self.delete(item_id)
+                # Удаляем все выбранные строки за один проход по self.data
+                deleted = np.zeros(len(self.data), dtype=bool)
+                deleted[rows] = True
+                for index in rows:
+                    row_id = str(self.data[index][0])
+                    self.selected_ids.discard(row_id)
+                    self.item_ids.pop(row_id, None)
+                    self.row_tags.pop(row_id, None)
+                    self.notify_row_change(row_id, None)
+                self.data = [row for row, drop in zip(self.data, deleted) if not drop]
+                self.index_rows()
+                self.sort_keys = {
+                    column_index: keys[~deleted]
+                    for column_index, keys in self.sort_keys.items()
+                }
+                self.refresh_view(self.first_row)
 
     def on_edit_row(self, event=None):
         """Редактирование строки"""
-        selected_item = self.selection()
-        if not selected_item:
+        rows = self.selected_rows()
+        if not len(rows) or not self.editable():
             return
 
-        item_id = selected_item[0]
-        current_values = list(self.item(item_id, "values"))
+        current_values = list(self.data[rows[0]])
+        row_id = str(current_values[0])
 
         dialog = tk.Toplevel(self)
         dialog.resizable(False, False)
@@ -397,12 +1167,11 @@ class EditableTreeview(ttk.Treeview):
                 messagebox.showerror("Ошибка", "Ни одно из полей не должно быть пустым")
                 return
 
-            self.item(item_id, values=updated_values)
-            item_index = self.index(item_id)
-            if 0 <= item_index < len(self.data):
-                self.data[item_index] = tuple(updated_values)
-            else:
-                messagebox.showerror("Ошибка", "Индекс вне границ списка данных.")
+            item_id = self.item_ids.get(row_id)
+            if item_id is not None and self.exists(item_id):
+                self.item(item_id, values=updated_values)
+            self.set_row(self.row_indexes[row_id], tuple(updated_values))
+            self.notify_row_change(updated_values[0], updated_values)
             dialog.destroy()
 
         ok_button = tk.Button(dialog, text="OK", command=on_ok)
@@ -457,6 +1226,1180 @@ class Validator:
 
         return True
 
+    def sort_keys(self, col, values):
+        """Ключи сортировки колонки по её типу; нераспознанные значения равны NaN"""
+        valid_type = self.valid_values.get(col)
+        values = pd.Series(values, dtype=str)
+        if valid_type == "datetime_format":
+            dates = pd.to_datetime(values, format="%d.%m.%Y %H:%M", errors="coerce")
+            keys = (dates - datetime(1970, 1, 1)).dt.total_seconds()
+        elif valid_type in ("positive_decimal", "positive_integer"):
+            keys = pd.to_numeric(values.str.replace(",", "."), errors="coerce")
+        else:
+            # Тип object хранит строки целиком: в массиве "<U" фиксированной
+            # ширины более длинное значение из set_row было бы обрезано
+            return values.to_numpy(dtype=object, copy=True)
+        return keys.to_numpy(dtype=float, copy=True)
+
+
+class Task:
+    """Задача планирования с разобранными значениями"""
+
+    __slots__ = (
+        "id",
+        "detail",
+        "setup",
+        "machine",
+        "quantity",
+        "time_per_unit",
+        "start",
+        "end",
+    )
+
+    def __init__(self, id, detail, setup, machine, quantity, time_per_unit, start, end):
+        self.id = id
+        self.detail = detail
+        self.setup = setup
+        self.machine = machine
+        self.quantity = quantity
+        self.time_per_unit = time_per_unit
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_values(cls, values):
+        """Разбор строки таблицы задач (строки) в Task"""
+        id, detail, setup, machine, quantity, time_per_unit, start, end = values
+        return cls(
+            str(id),
+            detail,
+            setup,
+            machine,
+            int(quantity),
+            float(str(time_per_unit).replace(",", ".")),
+            datetime.strptime(start, "%d.%m.%Y %H:%M"),
+            datetime.strptime(end, "%d.%m.%Y %H:%M"),
+        )
+
+
+class ConflictDetector:
+    """Поиск пересечений задач на одном станке методом сортировки и сканирования"""
+
+    def __init__(self, min_overlap=timedelta(seconds=30)):
+        self.min_overlap = min_overlap
+
+    def group_by_machine(self, records):
+        """Группировка индексов записей по станкам с сортировкой по времени начала"""
+        machines = {}
+        for index, (machine, start, end) in enumerate(records):
+            machines.setdefault(machine, []).append((start, end, index))
+        for tasks in machines.values():
+            tasks.sort()
+        return machines
+
+    def find_pairs(self, records):
+        """Возвращает отсортированные пары индексов (i, j) пересекающихся записей.
+
+        records - последовательность кортежей (станок, начало, окончание).
+        """
+        pairs = []
+        for tasks in self.group_by_machine(records).values():
+            active = []  # Куча (окончание, индекс) для ещё выполняющихся задач
+            for start, end, index in tasks:
+                threshold = start + self.min_overlap
+                # Задачи, закончившиеся до порога, не пересекутся с последующими
+                while active and active[0][0] < threshold:
+                    heapq.heappop(active)
+                if end < threshold:
+                    continue  # Задача короче min_overlap ни с чем не пересечётся
+                for _, other in active:
+                    pairs.append((min(index, other), max(index, other)))
+                heapq.heappush(active, (end, index))
+        pairs.sort()
+        return pairs
+
+    def find_conflicting(self, records):
+        """Возвращает множество индексов записей, участвующих хотя бы в одном конфликте"""
+        conflicting = set()
+        for tasks in self.group_by_machine(records).values():
+            active = []  # Куча (окончание, индекс) для ещё выполняющихся задач
+            unmarked = []  # Активные задачи, ещё не отмеченные как конфликтные
+            for start, end, index in tasks:
+                threshold = start + self.min_overlap
+                while active and active[0][0] < threshold:
+                    heapq.heappop(active)
+                if end < threshold:
+                    continue
+                if active:
+                    # Все оставшиеся активные задачи пересекаются с текущей
+                    conflicting.add(index)
+                    conflicting.update(
+                        other for other_end, other in unmarked if other_end >= threshold
+                    )
+                    unmarked = []
+                else:
+                    unmarked = [(end, index)]
+                heapq.heappush(active, (end, index))
+        return conflicting
+
+
+class IntervalIndex:
+    """Инкрементальный индекс интервалов задач по станкам"""
+
+    def __init__(self, min_overlap=timedelta(seconds=30)):
+        self.min_overlap = min_overlap
+        self.intervals = {}  # ключ -> (станок, начало, окончание)
+        self.starts = {}  # станок -> отсортированные времена начала
+        self.entries = {}  # станок -> (начало, окончание, ключ) в порядке starts
+        self.durations = {}  # станок -> отсортированные длительности интервалов
+
+    def __contains__(self, key):
+        return key in self.intervals
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def clear(self):
+        self.intervals.clear()
+        self.starts.clear()
+        self.entries.clear()
+        self.durations.clear()
+
+    def add(self, key, machine, start, end):
+        """Добавление интервала с заменой предыдущего с тем же ключом"""
+        if key in self.intervals:
+            self.remove(key)
+        entries = self.entries.setdefault(machine, [])
+        position = bisect.bisect_left(entries, (start, end, key))
+        entries.insert(position, (start, end, key))
+        self.starts.setdefault(machine, []).insert(position, start)
+        self.intervals[key] = (machine, start, end)
+        bisect.insort(self.durations.setdefault(machine, []), end - start)
+
+    def remove(self, key):
+        machine, start, end = self.intervals.pop(key)
+        entries = self.entries[machine]
+        position = bisect.bisect_left(entries, (start, end, key))
+        del entries[position]
+        del self.starts[machine][position]
+        durations = self.durations[machine]
+        del durations[bisect.bisect_left(durations, end - start)]
+
+    def longest(self, machine):
+        """Самый длинный текущий интервал станка; уменьшается при удалении"""
+        # Интервалы короче min_overlap не конфликтуют, поэтому это безопасный минимум
+        durations = self.durations.get(machine)
+        return max(durations[-1], self.min_overlap) if durations else self.min_overlap
+
+    def overlapping(self, machine, start, end, exclude=None):
+        """Ключи интервалов станка, пересекающихся с [start, end] не менее min_overlap"""
+        if end - start < self.min_overlap or machine not in self.starts:
+            return []
+        starts = self.starts[machine]
+        entries = self.entries[machine]
+        # Достаточно долго пересекаться могут только интервалы, начатые в этом окне
+        longest = self.longest(machine)
+        low = bisect.bisect_left(starts, start - longest)
+        high = bisect.bisect_right(starts, end - self.min_overlap)
+        return [
+            other
+            for other_start, other_end, other in entries[low:high]
+            if other != exclude
+            and min(end, other_end) - max(start, other_start) >= self.min_overlap
+        ]
+
+    def in_range(self, machine, start, end):
+        """Ключи интервалов станка, пересекающих [start, end]"""
+        if machine not in self.starts:
+            return []
+        starts = self.starts[machine]
+        entries = self.entries[machine]
+        longest = self.longest(machine)
+        low = bisect.bisect_left(starts, start - longest)
+        high = bisect.bisect_right(starts, end)
+        return [key for _, other_end, key in entries[low:high] if other_end >= start]
+
+    def at(self, machine, moment):
+        """Ключ интервала на станке, содержащего момент moment, или None"""
+        if machine not in self.starts:
+            return None
+        starts = self.starts[machine]
+        entries = self.entries[machine]
+        longest = self.longest(machine)
+        low = bisect.bisect_left(starts, moment - longest)
+        high = bisect.bisect_right(starts, moment)
+        # Бар с самым поздним началом рисуется сверху, он и выбирается
+        for _, end, key in reversed(entries[low:high]):
+            if end >= moment:
+                return key
+        return None
+
+    def conflicts(self, key):
+        """Ключи интервалов, конфликтующих с интервалом по ключу key"""
+        machine, start, end = self.intervals[key]
+        return self.overlapping(machine, start, end, exclude=key)
+
+
+class TaskColumns:
+    """Колоночное хранилище задач на NumPy для массовых запросов, например конфликтов
+
+    Запросы по интервалу времени обслуживает IntervalIndex: он обновляется
+    между правками, а маске по этим колонкам после каждого изменения
+    требовалось бы заново строить всю копию.
+    """
+
+    def __init__(self, tasks, machines=()):
+        tasks = list(tasks)
+        self.ids = [task.id for task in tasks]
+        # pandas преобразует списки дат намного быстрее, чем np.array
+        self.starts = self.to_minutes([task.start for task in tasks])
+        self.ends = self.to_minutes([task.end for task in tasks])
+
+        # Кодируем станки (известные сохраняют свою позицию) и детали
+        self.machines = list(machines)
+        machine_codes = {machine: code for code, machine in enumerate(self.machines)}
+        for task in tasks:
+            if task.machine not in machine_codes:
+                machine_codes[task.machine] = len(self.machines)
+                self.machines.append(task.machine)
+        self.machine_codes = np.array(
+            [machine_codes[task.machine] for task in tasks], dtype=np.int32
+        )
+        part_codes = {}
+        self.part_codes = np.array(
+            [part_codes.setdefault(task.detail, len(part_codes)) for task in tasks],
+            dtype=np.int32,
+        )
+        self.parts = list(part_codes)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def to_minutes(values):
+        return pd.to_datetime(values).values.astype("datetime64[m]")
+
+    def machine_view(self, code):
+        """Индексы задач одного станка, отсортированные по времени начала"""
+        indexes = np.flatnonzero(self.machine_codes == code)
+        return indexes[np.argsort(self.starts[indexes], kind="stable")]
+
+    def conflict_mask(self, min_overlap=timedelta(seconds=30)):
+        """Маска задач, пересекающихся с другой задачей на том же станке"""
+        mask = np.zeros(len(self), dtype=bool)
+        min_overlap = min_overlap / timedelta(minutes=1)
+        for code in np.unique(self.machine_codes):
+            indexes = self.machine_view(code)
+            starts = self.starts[indexes].astype(np.int64)
+            ends = self.ends[indexes].astype(np.int64)
+
+            # Задача конфликтует с более ранней, если самое позднее из прежних
+            # окончаний не меньше чем на min_overlap позже её начала
+            conflicts = np.zeros(len(indexes), dtype=bool)
+            previous_end = np.maximum.accumulate(ends)[:-1]
+            conflicts[1:] = (
+                np.minimum(previous_end, ends[1:]) - starts[1:] >= min_overlap
+            )
+
+            # ...и с более поздней, если достаточно длинная следующая задача
+            # начинается не менее чем за min_overlap до её окончания
+            long_starts = np.where(
+                ends - starts >= min_overlap, starts, np.iinfo(np.int64).max
+            )
+            next_start = np.minimum.accumulate(long_starts[::-1])[::-1][1:]
+            conflicts[:-1] |= next_start <= ends[:-1] - min_overlap
+
+            mask[indexes] = conflicts
+        return mask
+
+
+class GanttChart:
+    """Диаграмма Ганта, которая обновляет бары точечно, без ax.clear()"""
+
+    def __init__(self, ax, canvas, tasks, task_index):
+        self.ax = ax
+        self.canvas = canvas
+        self.tasks = tasks  # ID задачи -> Task, общий с App
+        self.task_index = task_index  # IntervalIndex по тем же задачам
+        self.machines = []
+        self.lanes = {}  # станок -> PolyCollection с его барами
+        self.lane_keys = {}  # станок -> ID задач, нарисованных в дорожке
+        self.lane_parts = {}  # станок -> детали, нарисованные в дорожке
+        self.task_lanes = {}  # ID задачи -> дорожка, в которой она нарисована
+        self.part_colors = {}
+        self.span = None  # Нарисованный диапазон по X, шире видимого
+        self.legend_parts = None
+        self.dirty = False
+        self.background = None  # Кэш фона без баров и оси X на время прокрутки
+        self.hover_key = None  # ID задачи под курсором
+        self.hover_background = None  # Кэш фигуры без подсказки
+
+        self.ax.xaxis_date()
+        self.ax.set_xlabel("")
+        self.ax.xaxis.grid(False)
+        self.ax.yaxis.grid(False)
+        for spine in self.ax.spines.values():
+            spine.set_visible(False)
+        self.ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
+        self.tooltip = self.ax.annotate(
+            "",
+            xy=(0, 0),
+            xytext=(12, 12),
+            textcoords="offset points",
+            fontsize="small",
+            bbox=dict(boxstyle="round", facecolor="lightyellow", alpha=0.9),
+            visible=False,
+            animated=True,
+        )
+
+    def set_machines(self, machines):
+        """Дорожка на каждый станок; без изменений списка дорожки сохраняются"""
+        if list(machines) == self.machines:
+            return
+        for lane in self.lanes.values():
+            lane.remove()
+        self.machines = list(machines)
+        self.lanes = {}
+        self.lane_keys = {}
+        self.lane_parts = {}
+        self.task_lanes = {}
+        for machine in self.machines:
+            lane = PolyCollection([], edgecolors="none")
+            self.ax.add_collection(lane, autolim=False)
+            self.lanes[machine] = lane
+        self.ax.set_yticks(range(len(self.machines)))
+        self.ax.set_yticklabels(self.machines)
+        self.ax.set_ylim(-0.5, len(self.machines) - 0.5)
+        self.refresh()
+
+    def set_view(self, min_dt, max_dt):
+        self.ax.set_xlim([min_dt, max_dt])
+        self.dirty = True
+
+    def part_color(self, part):
+        """Цвет детали; оттенки по золотому сечению не меняются при добавлении деталей"""
+        if part not in self.part_colors:
+            hue = (len(self.part_colors) * 0.618033988749895) % 1
+            self.part_colors[part] = mcolors.hsv_to_rgb((hue, 0.8, 0.8))
+        return self.part_colors[part]
+
+    def on_xlim_changed(self, ax):
+        """Повторный запрос видимых задач после масштабирования или сдвига"""
+        if self.update_span() and self.background is None:
+            self.canvas.draw_idle()
+
+    def update_span(self):
+        """Перерисовка всех дорожек, когда видимая область выходит за нарисованную.
+
+        С каждой стороны добавляется запас в половину окна; возвращает False,
+        если уже нарисованные бары покрывают видимую область.
+        """
+        xmin, xmax = self.ax.get_xlim()
+        width = xmax - xmin
+        if self.span is not None:
+            span_min, span_max = self.span
+            covered = span_min <= xmin and xmax <= span_max
+            if covered and width * 4 >= span_max - span_min:
+                return False
+
+        self.span = (xmin - width / 2, xmax + width / 2)
+        self.redraw_lanes(self.machines)
+        return True
+
+    def refresh(self):
+        """Перерисовка всех дорожек, например после замены всего плана"""
+        self.span = None
+        self.update_span()
+
+    def update_tasks(self, keys):
+        """Обновление дорожек с добавленными, перемещёнными или удалёнными задачами"""
+        machines = set()
+        for key in keys:
+            if key in self.task_lanes:
+                machines.add(self.task_lanes[key])
+            task = self.tasks.get(key)
+            if task is not None:
+                machines.add(task.machine)
+        self.redraw_lanes([machine for machine in self.machines if machine in machines])
+
+    def redraw_lanes(self, machines):
+        """Пересборка баров указанных дорожек для нарисованного диапазона"""
+        if self.span is None:
+            return
+        start = mdates.num2date(self.span[0]).replace(tzinfo=None)
+        end = mdates.num2date(self.span[1]).replace(tzinfo=None)
+
+        for machine in machines:
+            for key in self.lane_keys.get(machine, ()):
+                self.task_lanes.pop(key, None)
+
+            keys = self.task_index.in_range(machine, start, end)
+            tasks = [self.tasks[key] for key in keys]
+            verts = np.empty((len(tasks), 4, 2))
+            if tasks:
+                left = mdates.date2num([task.start for task in tasks])
+                width = [(task.end - task.start) / timedelta(days=1) for task in tasks]
+                bottom = self.machines.index(machine) - 0.4
+                verts[:, :2, 0] = left[:, None]
+                verts[:, 2:, 0] = (left + width)[:, None]
+                verts[:, [0, 3], 1] = bottom
+                verts[:, [1, 2], 1] = bottom + 0.8
+
+            colors = [self.part_color(task.detail) for task in tasks]
+            lane = self.lanes[machine]
+            lane.set_verts(verts)
+            lane.set_facecolor(np.array(colors).reshape(-1, 3))
+            self.lane_keys[machine] = keys
+            self.lane_parts[machine] = dict.fromkeys(task.detail for task in tasks)
+            for key in keys:
+                self.task_lanes[key] = machine
+
+        self.update_legend()
+        self.dirty = True
+
+    def update_legend(self):
+        """Легенда перечисляет видимые детали, а не каждую задачу"""
+        visible_parts = {}
+        for parts in self.lane_parts.values():
+            visible_parts.update(parts)
+        if list(visible_parts) == self.legend_parts or self.background is not None:
+            return  # Во время блиттинга легенда входит в кэшированный фон
+        self.legend_parts = list(visible_parts)
+
+        legend_handles = [
+            Patch(color=self.part_color(part), label=part)
+            for part in list(visible_parts)[:LEGEND_MAX_PARTS]
+        ]
+        if len(visible_parts) > LEGEND_MAX_PARTS:
+            hidden = len(visible_parts) - LEGEND_MAX_PARTS
+            legend_handles.append(Patch(color="none", label=f"... и ещё {hidden}"))
+
+        if legend_handles:
+            self.ax.legend(
+                handles=legend_handles,
+                loc="upper left",
+                bbox_to_anchor=(1, 1),
+                fontsize="small",
+            )
+        elif self.ax.get_legend():
+            self.ax.get_legend().remove()
+
+    def task_at(self, x, y):
+        """Задача, нарисованная в точке (x, y) в координатах данных, или None"""
+        lane = round(y)
+        if not 0 <= lane < len(self.machines) or abs(y - lane) > 0.4:
+            return None
+        moment = mdates.num2date(x).replace(tzinfo=None)
+        return self.tasks.get(self.task_index.at(self.machines[lane], moment))
+
+    def on_draw(self, event):
+        """Кэшировать фоны для блиттинга после каждой полной перерисовки"""
+        if self.background is not None:
+            # Панель инструментов перерисовывает при панорамировании без анимированных баров
+            self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+            for artist in self.animated_artists():
+                self.ax.draw_artist(artist)
+            return
+        self.hover_background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        if self.tooltip.get_visible():
+            self.ax.draw_artist(self.tooltip)
+
+    def on_motion(self, event):
+        """Показать подсказку для бара под курсором"""
+        if self.background is not None or self.hover_background is None:
+            return
+        task = None
+        if event.inaxes is self.ax:
+            task = self.task_at(event.xdata, event.ydata)
+        key = task.id if task is not None else None
+        if key == self.hover_key:
+            return
+        self.hover_key = key
+
+        if task is not None:
+            # Подсказка раскрывается к центру, чтобы не выходить за фигуру
+            left = event.x < self.ax.bbox.x0 + self.ax.bbox.width / 2
+            self.tooltip.xy = (event.xdata, event.ydata)
+            self.tooltip.set_text(self.format_tooltip(task))
+            self.tooltip.set_position((12 if left else -12, 12))
+            self.tooltip.set_horizontalalignment("left" if left else "right")
+        self.tooltip.set_visible(task is not None)
+
+        self.canvas.restore_region(self.hover_background)
+        self.ax.draw_artist(self.tooltip)
+        self.canvas.blit(self.ax.figure.bbox)
+
+    def format_tooltip(self, task):
+        """Текст подсказки для задачи"""
+        return "\n".join(
+            [
+                f"Деталь: {task.detail}",
+                f"Уст: {task.setup}",
+                f"Кол-во: {task.quantity}",
+                f"Запуск: {task.start:%d.%m.%Y %H:%M}",
+                f"Окончание: {task.end:%d.%m.%Y %H:%M}",
+            ]
+        )
+
+    def start_blit(self):
+        """Кэшировать всё, кроме баров и оси X, для быстрой перерисовки"""
+        if self.background is not None:
+            return
+        self.tooltip.set_visible(False)
+        self.hover_key = None
+        for artist in self.animated_artists():
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        self.hover_background = None
+
+    def blit(self):
+        """Перерисовать только бары и ось X поверх кэшированного фона"""
+        self.start_blit()
+        self.canvas.restore_region(self.background)
+        for artist in self.animated_artists():
+            self.ax.draw_artist(artist)
+        self.canvas.blit(self.ax.figure.bbox)
+
+    def stop_blit(self):
+        """Вернуться к обычной отрисовке одной полной перерисовкой"""
+        if self.background is None:
+            return
+        for artist in self.animated_artists():
+            artist.set_animated(False)
+        self.background = None
+        self.update_legend()
+        self.dirty = True
+        self.flush()
+
+    def animated_artists(self):
+        """Артисты, которые перерисовываются при блиттинге"""
+        return [*self.lanes.values(), self.ax.xaxis]
+
+    def flush(self):
+        """Одна отложенная перерисовка после завершения изменения"""
+        if self.dirty and self.background is None:
+            self.dirty = False
+            self.ax.axis("on" if self.tasks else "off")
+            self.canvas.draw_idle()
+
+
+class BackgroundLoader(ABC):
+    """Чтение и валидация строк базы в рабочем потоке с передачей порций интерфейсу"""
+
+    def __init__(self, validate, prepare=None):
+        self.validate = validate  # validate(строки, смещение) -> (валидные, ошибки)
+        # prepare(валидные строки) выполняется в потоке после чтения, в prepared
+        self.prepare = prepare
+        # (валидные, ошибки, прочитано строк, прогресс) на порцию, затем None или ошибка
+        self.batches = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.valid_data = []
+        self.errors = []
+        self.rows_read = 0
+        self.progress = 0.0  # Доля собранного файла от 0 до 1
+        self.prepared = None  # Результат prepare, готов до конца очереди
+        self.done = False
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        """Просим поток остановиться после текущей порции"""
+        self.cancelled.set()
+
+    @abstractmethod
+    def read_batches(self):
+        """Выдача (строки, прогресс) до конца источника; выполняется в рабочем потоке"""
+
+    def run(self):
+        """Рабочий поток: чтение порций до конца источника или отмены загрузки"""
+        batches = self.read_batches()
+        try:
+            rows_read = 0
+            valid_rows = []
+            for rows, progress in batches:
+                if self.cancelled.is_set():
+                    break
+                valid_data, errors = self.validate(rows, rows_read)
+                rows_read += len(rows)
+                valid_rows += valid_data
+                self.batches.put((valid_data, errors, len(rows), progress))
+            self.finish(valid_rows)
+        except Exception as e:
+            self.batches.put(e)
+        finally:
+            batches.close()
+
+    def finish(self, valid_data):
+        """Рабочий поток: подготовка прочитанных строк и отметка конца очереди"""
+        if self.prepare is not None and not self.cancelled.is_set():
+            self.prepared = self.prepare(valid_data)
+        self.batches.put(None)
+
+    def collect(self):
+        """Забираем в потоке Tk разобранные порции; True, когда собраны все"""
+        while not self.done:
+            try:
+                batch = self.batches.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+            if batch is None:
+                self.done = True
+                self.progress = 1.0
+                break
+            valid_data, errors, rows_read, progress = batch
+            self.valid_data.extend(valid_data)
+            self.errors.extend(errors)
+            self.rows_read += rows_read
+            self.progress = min(1.0, progress)
+        return self.done
+
+
+class CsvLoader(BackgroundLoader):
+    """Разбор базы CSV в рабочем потоке"""
+
+    def __init__(
+        self, file_path, delimiter, encoding, validate, prepare=None, snapshot=None
+    ):
+        super().__init__(validate, prepare)
+        self.snapshot = snapshot  # DatabaseSnapshot, читаемый до разбора, или None
+        # Проверяем здесь, чтобы отсутствие файла проявилось до запуска потока
+        if not file_path.is_file():
+            raise FileNotFoundError(file_path)
+        self.file_path = file_path
+        self.encoding = encoding
+        self.delimiter = delimiter
+
+    def run(self):
+        """Рабочий поток: снимок неизменённого файла или разбор файла"""
+        # Журнал этого файла, который ещё переносится, перезаписал бы его при чтении
+        ChangeJournal.wait_for(self.file_path)
+        cached = self.snapshot.read() if self.snapshot is not None else None
+        if cached is None:
+            super().run()
+            return
+        valid_data, errors = cached
+        self.batches.put((valid_data, errors, len(valid_data) + len(errors), 1.0))
+        try:
+            self.finish(valid_data)
+        except Exception as e:
+            self.batches.put(e)
+
+    def read_batches(self):
+        """Порции строк CSV с долей прочитанного файла"""
+        with self.file_path.open(newline="", encoding=self.encoding) as file:
+            size = max(1, os.fstat(file.fileno()).st_size)
+            reader = csv.reader(file, delimiter=self.delimiter)
+            next(reader, None)  # Пропускаем заголовок
+            while True:
+                batch = list(itertools.islice(reader, LOAD_BATCH_ROWS))
+                rows = [row for row in batch if row]  # Пропускаем пустые строки
+                yield rows, file.buffer.tell() / size
+                if len(batch) < LOAD_BATCH_ROWS:
+                    break
+
+
+class SqliteLoader(BackgroundLoader):
+    """Чтение таблицы номенклатуры из базы SQLite в рабочем потоке"""
+
+    def __init__(self, file_path, validate, prepare=None):
+        super().__init__(validate, prepare)
+        # sqlite3 молча создал бы отсутствующий файл, поэтому проверяем заранее
+        if not file_path.is_file():
+            raise FileNotFoundError(file_path)
+        self.file_path = file_path
+
+    def read_batches(self):
+        """Порции строк таблицы nomenclature в порядке ID"""
+        # Соединение можно использовать только в открывшем его потоке
+        connection = sqlite3.connect(self.file_path)
+        try:
+            count = connection.execute("SELECT COUNT(*) FROM nomenclature")
+            total = max(1, count.fetchone()[0])
+            cursor = connection.execute(
+                "SELECT id, part, setup, machine, time_per_unit"
+                " FROM nomenclature ORDER BY id"
+            )
+            rows_read = 0
+            while True:
+                batch = cursor.fetchmany(LOAD_BATCH_ROWS)
+                rows_read += len(batch)
+                yield [[str(row[0]), *row[1:]] for row in batch], rows_read / total
+                if len(batch) < LOAD_BATCH_ROWS:
+                    break
+        finally:
+            connection.close()
+
+
+class NomenclatureIndex:
+    """Строки номенклатуры по (деталь, установ, станок) и счётчики деталей подсказок
+
+    Не содержит виджетов, поэтому загруженная таблица индексируется в рабочем
+    потоке загрузчика.
+    """
+
+    def __init__(self, rows=()):
+        self.keys = {}  # (деталь, установ, станок) -> ID строк
+        self.rows = {}  # ID строки -> её (деталь, установ, станок)
+        self.detail_counts = {}  # Деталь -> число её ключей номенклатуры
+        self.details_by_context = {}  # (установ, станок) -> детали со счётчиками
+        for row in rows:
+            self.index_row(str(row[0]), row)
+
+    @staticmethod
+    def key(values):
+        """(деталь, установ, станок) строки номенклатуры"""
+        return tuple(str(value).strip() for value in values[1:4])
+
+    def index_row(self, row_id, values):
+        """Поддержка индекса для одной строки; values равно None после удаления"""
+        key = self.rows.pop(row_id, None)
+        if key is not None:
+            row_ids = self.keys[key]
+            del row_ids[row_id]
+            if not row_ids:
+                del self.keys[key]
+                self.count_detail(key, -1)
+        if values is not None:
+            key = self.key(values)
+            self.rows[row_id] = key
+            if key not in self.keys:
+                self.count_detail(key, 1)
+            self.keys.setdefault(key, {})[row_id] = None
+
+    def count_detail(self, key, step):
+        """Учёт появившегося (1) или исчезнувшего (-1) ключа (деталь, установ, станок)"""
+        part, setup, machine = key
+        contexts = ((setup, machine), (setup, ""), ("", machine))
+        counts = [self.detail_counts]
+        counts += [
+            self.details_by_context.setdefault(context, {}) for context in contexts
+        ]
+        for parts in counts:
+            parts[part] = parts.get(part, 0) + step
+            if not parts[part]:
+                del parts[part]
+
+    def find(self, detail, setup, machine):
+        """ID подходящей строки или None"""
+        row_ids = self.keys.get((detail, setup, machine))
+        if not row_ids:
+            return None
+        # Дубликаты хранятся в порядке добавления, возвращается самый ранний
+        return next(iter(row_ids))
+
+
+class NomenclatureDatabase:
+    """Хранение номенклатуры в SQLite; сохранение записывает только изменённые строки"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS nomenclature (
+            id INTEGER PRIMARY KEY,
+            part TEXT NOT NULL,
+            setup TEXT NOT NULL,
+            machine TEXT NOT NULL,
+            time_per_unit TEXT NOT NULL
+        );
+        -- Служит и для поиска только по детали, как по первому столбцу
+        CREATE INDEX IF NOT EXISTS nomenclature_key
+            ON nomenclature (part, setup, machine);
+        CREATE INDEX IF NOT EXISTS nomenclature_machine ON nomenclature (machine);
+    """
+
+    def __init__(self, file_path):
+        self.file_path = Path(file_path)
+        self.connection = sqlite3.connect(self.file_path)
+        with self.connection:
+            self.connection.executescript(self.SCHEMA)
+
+    @staticmethod
+    def record(values):
+        """Параметры (id, part, setup, machine, time_per_unit) строки таблицы"""
+        fields = (*map(str, values[1:5]),) + ("",) * (5 - len(values))
+        return (int(values[0]), *fields)
+
+    def save(self, changes):
+        """Применение ID строки -> значения (None при удалении) одной транзакцией"""
+        deleted = [(int(row_id),) for row_id, values in changes.items() if not values]
+        changed = [self.record(values) for values in changes.values() if values]
+        with self.connection:  # Фиксация или откат при ошибке любой команды
+            self.connection.executemany(
+                "DELETE FROM nomenclature WHERE id = ?", deleted
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO nomenclature VALUES (?, ?, ?, ?, ?)", changed
+            )
+
+    def replace_all(self, rows):
+        """Замена всего содержимого таблицы этими строками одной транзакцией"""
+        with self.connection:
+            self.connection.execute("DELETE FROM nomenclature")
+            self.connection.executemany(
+                "INSERT INTO nomenclature VALUES (?, ?, ?, ?, ?)",
+                map(self.record, rows),
+            )
+
+    def close(self):
+        """Закрытие соединения с базой"""
+        self.connection.close()
+
+
+class DatabaseSnapshot:
+    """Проверенные строки базы CSV, сохранённые рядом с ней для быстрого открытия"""
+
+    def __init__(self, file_path, encoding, delimiter):
+        self.file_path = Path(file_path).resolve()
+        self.path = self.file_path.with_name(self.file_path.name + ".snapshot")
+        # Снимок подходит только к тому же файлу, прочитанному так же
+        self.settings = (SNAPSHOT_VERSION, str(self.file_path), encoding, delimiter)
+        self.stat = None  # Размер и время изменения CSV при последней проверке
+        self.current = False  # True, если read нашёл снимок актуальным
+        self.hash = None  # SHA-1 CSV, когда он уже вычислен
+
+    def file_key(self, stat):
+        """Размер и время изменения файла"""
+        return stat.st_size, stat.st_mtime_ns
+
+    def file_hash(self):
+        """SHA-1 содержимого CSV"""
+        digest = hashlib.sha1()
+        with self.file_path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def read(self):
+        """(валидные строки, ошибки), если снимок соответствует CSV, иначе None
+
+        Разбор снимка и хеширование CSV, у которого изменилось время, но не
+        размер, занимают заметное время, поэтому метод выполняется в рабочем
+        потоке загрузчика.
+        """
+        try:
+            self.stat = self.file_path.stat()
+            with self.path.open("rb") as f:
+                # Без циклического сборщика мусора мелкие списки разбираются быстрее
+                gc.disable()
+                try:
+                    # Обычный JSON: чужой снимок не может выполнить код при чтении
+                    snapshot = json.loads(f.read())
+                finally:
+                    gc.enable()
+        except Exception:
+            return None
+
+        if snapshot.get("settings") != list(self.settings):
+            return None
+        if snapshot["file"] != list(self.file_key(self.stat)):
+            # Скопированный или затронутый файл сохраняет снимок, если содержимое то же
+            if snapshot["file"][0] != self.stat.st_size:
+                return None
+            try:
+                self.hash = self.file_hash()
+            except OSError:
+                return None
+            if snapshot["hash"] != self.hash:
+                return None
+        else:
+            self.current = True
+        return snapshot["rows"], snapshot["errors"]
+
+    def save(self, rows, errors):
+        """Запись снимка в фоновом потоке; ошибка записи лишь отключает кэш"""
+        threading.Thread(
+            target=self.write, args=(rows, errors, self.hash), daemon=True
+        ).start()
+
+    def write(self, rows, errors, file_hash):
+        """Атомарная запись снимка через временный файл"""
+        try:
+            file_hash = file_hash or self.file_hash()
+            file_key = self.file_key(self.file_path.stat())
+            if self.stat is not None and file_key != self.file_key(self.stat):
+                return  # CSV изменился после чтения
+            snapshot = {
+                "settings": self.settings,
+                "file": file_key,
+                "hash": file_hash,
+                "rows": rows,
+                "errors": errors,
+            }
+            with AtomicFile(self.path, "wb") as f:
+                f.write(json.dumps(snapshot, ensure_ascii=False).encode("utf-8"))
+        except Exception as e:
+            print(f"Не удалось сохранить снимок базы: {e}")
+
+
+class ChangeJournal:
+    """Журнал сохранённых правок номенклатуры рядом с базой CSV, только дозапись"""
+
+    # Дозапись не пересекается с завершением сжатия, какой бы журнал его ни вёл
+    lock = threading.Lock()
+    # Полный путь CSV -> поток переноса его журнала; переживает закрытый журнал
+    compactions = {}
+
+    def __init__(self, file_path):
+        self.file_path = Path(file_path).resolve()
+        self.path = self.file_path.with_name(self.file_path.name + ".journal")
+        try:
+            self.size = self.path.stat().st_size
+        except FileNotFoundError:
+            self.size = 0
+
+    def replay(self, rows):
+        """Строки CSV с применёнными по порядку изменениями из журнала"""
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return rows
+
+        rows = list(rows)
+        indexes = {str(row[0]): i for i, row in enumerate(rows)}
+        for line in lines:
+            try:
+                row_id, values = json.loads(line)
+            except ValueError:
+                continue  # Запись, оборванная прерванным сохранением
+            i = indexes.get(row_id)
+            if values is None:
+                if i is not None:
+                    rows[i] = None
+                    del indexes[row_id]
+            elif i is None:
+                indexes[row_id] = len(rows)
+                rows.append(values)
+            else:
+                rows[i] = values
+        return [row for row in rows if row is not None]
+
+    def save(self, changes):
+        """Дозапись ID строки -> значения (None при удалении) со сбросом на диск"""
+        # Начинаем с новой строки, даже если прошлое сохранение оборвалось
+        records = "\n" + "".join(
+            json.dumps(
+                [row_id, None if values is None else [str(v) for v in values]],
+                ensure_ascii=False,
+            )
+            + "\n"
+            for row_id, values in changes.items()
+        )
+        with self.lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(records)
+                f.flush()
+                os.fsync(f.fileno())
+                self.size = f.tell()
+
+    def compact(self, rows, header, delimiter, encoding):
+        """Перенос журнала в CSV в фоновом потоке; False, если перенос уже идёт"""
+        thread = self.compactions.get(self.file_path)
+        if thread is not None and thread.is_alive():
+            return False
+        thread = threading.Thread(
+            target=self.write,
+            args=(rows, self.size, header, delimiter, encoding),
+            daemon=True,
+        )
+        self.compactions[self.file_path] = thread
+        thread.start()
+        return True
+
+    def write(self, rows, offset, header, delimiter, encoding):
+        """Фоновый поток: запись CSV и удаление перенесённой части журнала"""
+        try:
+            with AtomicFile(
+                self.file_path, backup=True, newline="", encoding=encoding
+            ) as f:
+                writer = csv.writer(f, delimiter=delimiter)
+                writer.writerow(header)
+                writer.writerows(rows)
+            with self.lock:
+                # Записи, сохранённые во время записи CSV, остаются в журнале
+                with self.path.open("rb") as f:
+                    f.seek(offset)
+                    tail = f.read()
+                # Если этот шаг прервётся, повтор старого журнала поверх нового CSV безвреден
+                if tail:
+                    with AtomicFile(self.path, "wb") as f:
+                        f.write(tail)
+                else:
+                    self.path.unlink()
+                self.size = len(tail)
+            DatabaseSnapshot(self.file_path, encoding, delimiter).write(rows, [], None)
+        except Exception as e:
+            print(f"Не удалось сжать журнал базы данных: {e}")
+
+    def wait(self):
+        """Ожидание завершения идущего сжатия"""
+        self.wait_for(self.file_path)
+
+    @classmethod
+    def wait_for(cls, file_path):
+        """Ожидание завершения идущего сжатия CSV по пути file_path"""
+        thread = cls.compactions.get(Path(file_path).resolve())
+        if thread is not None:
+            thread.join()
+
+    @classmethod
+    def wait_all(cls):
+        """Ожидание завершения сжатия всех CSV"""
+        for thread in list(cls.compactions.values()):
+            thread.join()
+
+    def clear(self):
+        """Удаление журнала после полной перезаписи CSV"""
+        with self.lock:
+            self.path.unlink(missing_ok=True)
+            self.size = 0
+
+
+class ValidationReport:
+    """Строки, отклонённые при импорте номенклатуры, по не пройденной проверке"""
+
+    MESSAGES = {
+        ID_COLUMN: "ID не является целым числом",
+        TIME_COLUMN: "Время/шт не является числом",
+    }
+
+    def __init__(self, errors):
+        self.errors = errors  # (line, column, value), ordered by line
+
+    def describe(self, error):
+        """Описание одной ошибки"""
+        line, column, value = error
+        return f"Строка {line}: {self.MESSAGES[column]} ({value!r})"
+
+    def summary(self):
+        """Количество отклонённых строк по каждой проверке"""
+        counts = {}
+        for _, column, _ in self.errors:
+            counts[column] = counts.get(column, 0) + 1
+        return "\n".join(
+            f"{self.MESSAGES[column]}: {count}"
+            for column, count in sorted(counts.items())
+        )
+
+    def page_count(self):
+        """Количество страниц, не меньше одной"""
+        return max(1, -(-len(self.errors) // ERROR_PAGE_ROWS))
+
+    def page(self, number):
+        """Описания ошибок на одной странице из ERROR_PAGE_ROWS"""
+        start = number * ERROR_PAGE_ROWS
+        return [
+            self.describe(error)
+            for error in self.errors[start : start + ERROR_PAGE_ROWS]
+        ]
+
+    def export(self, file_path, encoding, delimiter):
+        """Запись всех ошибок в CSV файл"""
+        with AtomicFile(file_path, newline="", encoding=encoding) as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(["Строка", "Ошибка", "Значение"])
+            writer.writerows(
+                (line, self.MESSAGES[column], value)
+                for line, column, value in self.errors
+            )
+
+
+class ImportErrorsWindow(tk.Toplevel):
+    """Окно ошибок импорта с постраничным списком и экспортом"""
+
+    def __init__(self, parent, report, encoding, delimiter):
+        super().__init__(parent)
+        self.report = report
+        self.encoding = encoding  # Для экспортируемого списка ошибок
+        self.delimiter = delimiter
+        self.page_number = 0
+        self.title("Ошибки при импорте")
+        self.geometry("520x400")
+
+        self.create_widgets()
+        self.show_page(0)
+
+    def create_widgets(self):
+        """Создание виджетов в окне ошибок импорта"""
+        button_width = 15  # Ширина кнопок в символах
+
+        self.grid_rowconfigure(1, weight=1)  # Список ошибок
+        self.grid_columnconfigure(0, weight=1)
+
+        # Количество по каждой проверке
+        tk.Label(
+            self,
+            text=f"Не импортировано строк: {len(self.report.errors)}\n{self.report.summary()}",
+            justify=tk.LEFT,
+        ).grid(row=0, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+
+        self.error_listbox = tk.Listbox(self)
+        self.error_listbox.grid(row=1, column=0, padx=(10, 0), pady=5, sticky="nsew")
+        scrollbar = tk.Scrollbar(self, command=self.error_listbox.yview)
+        scrollbar.grid(row=1, column=1, padx=(0, 10), pady=5, sticky="ns")
+        self.error_listbox.config(yscrollcommand=scrollbar.set)
+
+        # Листание и кнопки внизу окна
+        button_frame = tk.Frame(self)
+        button_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+
+        self.previous_button = tk.Button(
+            button_frame, text="<", command=lambda: self.show_page(self.page_number - 1)
+        )
+        self.previous_button.pack(side=tk.LEFT, padx=5)
+
+        self.page_label = tk.Label(button_frame)
+        self.page_label.pack(side=tk.LEFT, padx=5)
+
+        self.next_button = tk.Button(
+            button_frame, text=">", command=lambda: self.show_page(self.page_number + 1)
+        )
+        self.next_button.pack(side=tk.LEFT, padx=5)
+
+        self.close_button = tk.Button(
+            button_frame, text="Закрыть", command=self.destroy
+        )
+        self.close_button.config(width=button_width)
+        self.close_button.pack(side=tk.RIGHT, padx=5)
+
+        self.export_button = tk.Button(
+            button_frame, text="Экспорт...", command=self.export_errors
+        )
+        self.export_button.config(width=button_width)
+        self.export_button.pack(side=tk.RIGHT, padx=5)
+
+    def show_page(self, number):
+        """Отображение одной страницы ошибок"""
+        self.page_number = number
+        self.error_listbox.delete(0, tk.END)
+        self.error_listbox.insert(tk.END, *self.report.page(number))
+
+        page_count = self.report.page_count()
+        self.page_label.config(text=f"Страница {number + 1} из {page_count}")
+        self.previous_button.config(state=tk.NORMAL if number > 0 else tk.DISABLED)
+        self.next_button.config(
+            state=tk.NORMAL if number + 1 < page_count else tk.DISABLED
+        )
+
+    def export_errors(self):
+        """Сохранение полного списка ошибок в CSV файл"""
+        file_path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".csv", filetypes=[("CSV files", "*.csv")]
+        )
+        if not file_path:
+            return
+        try:
+            self.report.export(Path(file_path), self.encoding, self.delimiter)
+        except Exception as e:
+            messagebox.showerror(
+                "Ошибка", f"Не удалось экспортировать ошибки: {e}", parent=self
+            )
+            return
+        messagebox.showinfo("Успех", "Файл успешно сохранен.", parent=self)
+
 
 class SettingsWindow(tk.Toplevel):
     """Окно настроек"""
@@ -617,12 +2560,13 @@ class SettingsWindow(tk.Toplevel):
         }
 
         settings_path = Path("settings.json").resolve()
-        with settings_path.open("w", encoding="utf-8") as f:
+        with AtomicFile(settings_path, backup=True, encoding="utf-8") as f:
             json.dump(settings, f)
 
         self.parent_app.change_style(style)
         self.parent_app.csv_separator = csv_separator
         self.parent_app.encoding = encoding
+        self.parent_app.update_gantt_chart()
 
         self.destroy()
 
@@ -679,15 +2623,28 @@ class App:
         self.setup_variables()
         self.create_widgets()
 
-        self.load_database_silently(self.current_file_path, self.csv_separator)
+        self.load_database_silently(self.last_opened_file, self.csv_separator)
         self.update_statusbar()
 
-    def update_app(self):
-        """Обновление приложения"""
+    def update_app(self, stages=("statusbar", "gantt")):
+        """Обновление приложения: этапы stages выполняются за один проход after_idle"""
         self.mark_data_as_modified()
-        self.update_statusbar()
-        self.highlight_conflicts()
-        self.update_gantt_chart()
+        self.pending_stages.update(stages)
+        if self.update_job is None:
+            self.update_job = self.root.after_idle(self.run_update)
+
+    def run_update(self):
+        """Выполнить все накопленные этапы обновления один раз"""
+        self.update_job = None
+        stages, self.pending_stages = self.pending_stages, set()
+        if "conflicts" in stages:
+            row_ids, self.changed_rows = self.changed_rows, set()
+            self.highlight_conflicts(row_ids)
+            self.gantt.update_tasks(row_ids)
+        if "statusbar" in stages:
+            self.update_statusbar()
+        if "gantt" in stages:
+            self.gantt.flush()
 
     def update_gantt_chart(self, event=None):
         """Обновление диаграммы Ганта"""
@@ -713,55 +2670,9 @@ class App:
                 end_of_month = datetime(now.year, now.month + 1, 1) - timedelta(days=1)
             min_dt, max_dt = start_of_month, end_of_month
 
-        if not self.task_table.get_children():
-            self.ax.clear()
-            self.ax.axis("off")
-            self.canvas.draw()
-            return
-
-        self.ax.clear()
-        self.ax.axis("on")
-
-        # Генерация достаточного количества цветов для задач
-        num_tasks = len(self.task_table.get_children())
-        colors = self.generate_colors(num_tasks)
-
-        # for item in self.task_table.get_children():
-        for index, item in enumerate(self.task_table.get_children()):
-            (
-                id,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            start_dt = datetime.strptime(start_datetime, "%d.%m.%Y %H:%M")
-            end_dt = datetime.strptime(end_datetime, "%d.%m.%Y %H:%M")
-            machine_index = self.all_machines.index(machine)
-
-            # Установка длины бара в зависимости от выбранного диапазона
-            bar_length = (end_dt - start_dt).total_seconds() / (60 * 60 * 24)  # В днях
-
-            # print(f"start_dt: {start_dt}, bar_length: {bar_length}, start_offset: {start_offset}")
-
-            # Строим бар с обводкой и одного цвета бара для каждого станка
-            # self.ax.barh(machine_index, bar_length, left=start_offset, color=plt.cm.tab10(machine_index % 10),
-            #             edgecolor="black", label=detail)
-
-            # Строим бар с индивидуальным цветом для задачи
-            color = colors[index]  # Выбираем цвет
-            self.ax.barh(
-                machine_index, bar_length, left=start_dt, color=color, label=detail
-            )
-
-            # min_dt = min(min_dt, start_dt)
-            # max_dt = max(max_dt, end_dt)
-
-        # Обновление пределов оси X
-        self.ax.set_xlim([min_dt, max_dt])
+        # Дорожки и бары сохраняются между вызовами и лишь обновляются при правках
+        self.gantt.set_machines(self.all_machines)
+        self.gantt.set_view(min_dt, max_dt)
 
         # Установка меток на оси X
         if range_selection == "День":
@@ -774,26 +2685,15 @@ class App:
             self.ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
             self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%d.%m"))
 
-        self.ax.set_xlabel("")
-        self.ax.set_yticks(range(len(self.all_machines)))
-        self.ax.set_yticklabels(self.all_machines)
-        self.ax.xaxis.set_visible(True)
-        self.ax.xaxis.grid(False)
-        self.ax.yaxis.grid(False)
-        self.ax.spines["top"].set_visible(False)
-        self.ax.spines["right"].set_visible(False)
-        self.ax.spines["left"].set_visible(False)
-        self.ax.spines["bottom"].set_visible(False)
-        self.ax.legend(loc="upper left", bbox_to_anchor=(1, 1), fontsize="small")
         plt.setp(
             self.ax.get_xticklabels(), rotation=90, ha="right", rotation_mode="anchor"
         )
-        self.canvas.draw()
+        self.gantt.flush()
 
     def update_statusbar(self):
         """Обновляем статусбар с количеством записей и коротким путём"""
-        num_tasks = len(self.task_table.get_children())
-        num_items = len(self.nomenclature_table.get_children())
+        num_tasks = len(self.tasks)
+        num_items = len(self.nomenclature_table.data)
         if self.current_file_path == "":
             short_path = "Не задано"
         else:
@@ -805,58 +2705,109 @@ class App:
 
     def update_detail_list(self):
         """Обновление списка деталей в комбобоксе"""
-        self.detailList = self.nomenclature_table.get_column_values_by_index(1)
-        self.detail_entry.set_completion_list(self.detailList)
-        self.mark_data_as_modified()
-        self.update_statusbar()
+        self.detail_entry.set_completion_list(self.nomenclature_index.detail_counts)
+        self.update_app(("statusbar",))
+
+    def preferred_details(self):
+        """Детали, записанные для установа и станка, введённых на вкладке планирования"""
+        key = (self.setup_entry.get().strip(), self.machine_combo.get().strip())
+        return self.nomenclature_index.details_by_context.get(key)
 
     def mark_data_as_modified(self, *args):
         self.is_data_modified = True
 
-    def highlight_conflicts(self):
-        if not self.task_table.get_children():
-            return
-        self.task_table.tag_configure("conflict", background="red", foreground="white")
+    def highlight_conflicts(self, row_ids=None):
+        """Подсветка конфликтующих задач; при заданных row_ids проверяются только они"""
+        if row_ids is None:
+            # Полная синхронизация: перестраиваем модели задач и индекс интервалов
+            self.tasks.clear()
+            self.task_index.clear()
+            for row in self.task_table.data:
+                task = Task.from_values(row)
+                self.tasks[task.id] = task
+                self.task_index.add(task.id, task.machine, task.start, task.end)
+
+            self.task_columns = None
+            self.gantt.refresh()
+            row_ids = list(self.tasks)
+            if len(row_ids) >= COLUMNAR_MIN_TASKS:
+                mask = self.get_task_columns().conflict_mask()
+                conflicting = {row_ids[index] for index in np.flatnonzero(mask)}
+            else:
+                records = [
+                    (task.machine, task.start, task.end) for task in self.tasks.values()
+                ]
+                conflicting = {
+                    row_ids[index]
+                    for index in self.conflict_detector.find_conflicting(records)
+                }
+        else:
+            row_ids = [row_id for row_id in row_ids if row_id in self.task_index]
+            conflicting = {
+                row_id for row_id in row_ids if self.task_index.conflicts(row_id)
+            }
+
+        for row_id in row_ids:
+            tags = ("conflict",) if row_id in conflicting else ()
+            self.task_table.set_row_tags(row_id, tags)
+
+    def get_task_columns(self):
+        """Колоночный снимок задач, перестраивается после любого изменения"""
+        if self.task_columns is None:
+            self.task_columns = TaskColumns(self.tasks.values(), self.all_machines)
+        return self.task_columns
+
+    def on_nomenclature_row_change(self, row_id, values):
+        """Учёт добавленной, изменённой или удалённой строки номенклатуры"""
+        index = self.nomenclature_index
+        keys = [index.rows.get(row_id)]
+        index.index_row(row_id, values)
+        keys.append(index.rows.get(row_id))
+        # В подсказках меняются только детали, появившиеся или исчезнувшие целиком
+        parts = {key[0] for key in keys if key is not None}
+        self.detail_entry.update_completions(
+            [part for part in parts if part in index.detail_counts],
+            [part for part in parts if part not in index.detail_counts],
+        )
+        self.nomenclature_changes[row_id] = values
+        self.update_app(("statusbar",))
+
+    def find_nomenclature(self, detail, setup, machine):
+        """Индекс подходящей записи в данных номенклатуры или None"""
+        row_id = self.nomenclature_index.find(detail, setup, machine)
+        if row_id is None:
+            return None
+        return self.nomenclature_table.row_indexes[row_id]
+
+    def nomenclature_editable(self):
+        """False с предупреждением, пока в таблицу загружается база данных"""
+        if self.bulk_load is None:
+            return True
+        messagebox.showwarning(
+            "Предупреждение",
+            "База данных ещё загружается. Дождитесь окончания или нажмите Esc.",
+        )
+        return False
+
+    def on_task_row_change(self, row_id, values):
+        """Обновление модели и индекса для одной строки и постановка соседей в очередь"""
+        self.task_columns = None
+        affected = set()
+        if row_id in self.task_index:
+            affected.update(self.task_index.conflicts(row_id))
+            self.task_index.remove(row_id)
+
+        if values is None:
+            self.tasks.pop(row_id, None)
+        else:
+            task = Task.from_values(values)
+            self.tasks[row_id] = task
+            self.task_index.add(row_id, task.machine, task.start, task.end)
+            affected.update(self.task_index.conflicts(row_id))
 
-        # Удаляем теги конфликтов перед повторной проверкой
-        for item in self.task_table.get_children():
-            self.task_table.item(item, tags="")
-
-        machine_tasks = {}
-
-        for item in self.task_table.get_children():
-            (
-                id,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            start_dt = datetime.strptime(start_datetime, "%d.%m.%Y %H:%M")
-            end_dt = datetime.strptime(end_datetime, "%d.%m.%Y %H:%M")
-
-            # Сохраняем задачи по машине
-            if machine not in machine_tasks:
-                machine_tasks[machine] = []
-            machine_tasks[machine].append((item, start_dt, end_dt))
-
-        # Проверяем конфликты только для каждой машины
-        for machine, tasks in machine_tasks.items():
-            for i in range(len(tasks)):
-                item1, start1, end1 = tasks[i]
-                for j in range(i + 1, len(tasks)):
-                    item2, start2, end2 = tasks[j]
-                    overlap_start = max(start1, start2)
-                    overlap_end = min(end1, end2)
-                    overlap_duration = (
-                        overlap_end - overlap_start
-                    ).total_seconds() / 60
-                    if overlap_duration >= 0.5:  # Время в минутах
-                        self.task_table.item(item1, tags="conflict")
-                        self.task_table.item(item2, tags="conflict")
+        self.changed_rows.update(affected)
+        self.changed_rows.add(row_id)
+        self.update_app(("conflicts", "statusbar", "gantt"))
 
     def load_settings(self):
         """Загрузка настроек из JSON файла"""
@@ -899,7 +2850,9 @@ class App:
         window_state = settings.get("window_state", "normal")
         self.root.state(window_state)
 
-        self.current_file_path = settings.get("last_opened_file", "")
+        # Становится current_file_path, когда база данных загрузится
+        self.last_opened_file = settings.get("last_opened_file") or ""
+        self.current_file_path = ""
         self.save_settings()
 
     def save_settings(self):
@@ -907,8 +2860,10 @@ class App:
         geometry = self.root.geometry()
         window_state = self.root.state()
 
-        if self.current_file_path and Path(self.current_file_path).exists():
-            path = str(self.current_file_path)
+        # База, не успевшая загрузиться, всё равно откроется в следующий раз
+        path = self.current_file_path or self.last_opened_file
+        if path and Path(path).exists():
+            path = str(path)
         else:
             path = None
 
@@ -923,7 +2878,7 @@ class App:
         }
 
         settings_path = Path("settings.json").resolve()
-        with settings_path.open("w", encoding="utf-8") as f:
+        with AtomicFile(settings_path, backup=True, encoding="utf-8") as f:
             json.dump(settings, f)
 
     def change_style(self, style_name):
@@ -943,7 +2898,24 @@ class App:
         self.is_data_modified = False
         # Создаем экземпляр валидатора
         self.validator = Validator(valid_values=self.get_valid_values())
-        self.detailList = []
+        self.conflict_detector = ConflictDetector()
+        self.task_index = IntervalIndex()
+        self.tasks = {}  # ID строки -> Task, разбирается один раз при изменении
+        self.task_columns = None  # Снимок self.tasks в виде TaskColumns
+        self.pending_stages = set()  # Этапы обновления, ожидающие прохода after_idle
+        self.changed_rows = set()  # ID строк, чьи конфликты и бары нужно перепроверить
+        self.update_job = None
+        self.zoom_job = None
+        self.pan_motion = None  # Id обработчика движения во время сдвига
+        self.bulk_load = None  # (loader, on_loaded, on_failed, snapshot)
+        self.load_job = None
+        self.load_escape = None  # Id обработчика Esc, отменяющего загрузку
+        self.nomenclature_index = NomenclatureIndex()  # Строки по детали и станку
+        self.database = None  # NomenclatureDatabase, если файл в формате SQLite
+        self.journal = None  # ChangeJournal открытой базы CSV
+        self.compact_job = None
+        self.compact_rows = None  # Строки на момент сохранения до отложенного сжатия
+        self.nomenclature_changes = {}  # ID строки -> значения (None - удалена)
         self.settings_window = None
         self.about_window = None
 
@@ -975,6 +2947,9 @@ class App:
             command=self.save_to_database,
             accelerator="Ctrl+S",
         )
+        file_menu.add_command(
+            label="Сохранить базу данных как...", command=self.save_database_as
+        )
         file_menu.add_command(label="Закрыть базу данных", command=self.close_database)
         file_menu.add_separator()
         file_menu.add_command(label="Импорт задач из Excel", command=self.import_tasks)
@@ -1091,8 +3066,13 @@ class App:
         # Поля ввода
         tk.Label(frame, text="Деталь").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         # self.detail_entry = tk.Entry(frame, width=100)
-        self.detail_entry = AutoCompleteEntry(frame, width=100)
+        self.detail_entry = AutoCompleteEntry(
+            frame, width=100, preferred=self.preferred_details
+        )
         self.detail_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+        # Время на штуку подставляется, когда известны деталь, установ и станок
+        self.detail_entry.bind("<FocusOut>", self.fill_time_per_unit, add="+")
+        self.detail_entry.bind("<<AutoCompleteSelected>>", self.fill_time_per_unit)
 
         tk.Label(frame, text="Установ").grid(
             row=1, column=0, padx=5, pady=5, sticky="w"
@@ -1101,10 +3081,13 @@ class App:
         self.setup_entry.bind(
             "<FocusOut>", lambda event: self.on_focus_out(event, "setup")
         )
+        self.setup_entry.bind("<FocusOut>", self.fill_time_per_unit, add="+")
         self.setup_entry.grid(row=1, column=1, padx=5, pady=5, sticky="w")
 
         tk.Label(frame, text="Станок").grid(row=2, column=0, padx=5, pady=5, sticky="w")
         self.machine_combo = ttk.Combobox(frame, width=10, values=self.all_machines)
+        self.machine_combo.bind("<<ComboboxSelected>>", self.fill_time_per_unit)
+        self.machine_combo.bind("<FocusOut>", self.fill_time_per_unit)
         self.machine_combo.grid(row=2, column=1, padx=5, pady=5, sticky="w")
 
         tk.Label(frame, text="Количество, шт").grid(
@@ -1185,8 +3168,10 @@ class App:
             ],
             valid_values=self.get_valid_values(),
             update_app=self.update_app,
+            on_row_change=self.on_task_row_change,
         )
         self.task_table.grid(row=9, columnspan=3, pady=10, sticky="nsew")
+        self.task_table.tag_configure("conflict", background="red", foreground="white")
         self.task_table.column(
             "ID", anchor="center", width=1, minwidth=1, stretch=False
         )
@@ -1259,6 +3244,7 @@ class App:
 
         # Создание канваса для графика
         self.canvas = FigureCanvasTkAgg(self.figure, master=canvas_frame)
+        self.gantt = GanttChart(self.ax, self.canvas, self.tasks, self.task_index)
 
         # Создание панели навигации
         self.toolbar = NavigationToolbar2Tk(self.canvas, canvas_frame)
@@ -1268,8 +3254,13 @@ class App:
             side=tk.TOP, fill="both", expand=True
         )  # Центрирование канваса
 
-        # Привязка события прокрутки
+        # Привязка событий прокрутки и наведения
         self.canvas.mpl_connect("scroll_event", self.zoom)
+        self.canvas.mpl_connect("draw_event", self.gantt.on_draw)
+        self.canvas.mpl_connect("motion_notify_event", self.gantt.on_motion)
+        # Подключены после обработчиков нажатия и отпускания панели инструментов
+        self.canvas.mpl_connect("button_press_event", self.start_pan)
+        self.canvas.mpl_connect("button_release_event", self.stop_pan)
 
         # Обновление графика
         self.update_gantt_chart()
@@ -1343,7 +3334,9 @@ class App:
             frame,
             columns=["ID", "Деталь", "Уст", "Станок", "Время/шт"],
             valid_values=self.get_valid_values(),
-            update_app=self.update_app,
+            update_app=lambda: self.update_app(("statusbar",)),
+            on_row_change=self.on_nomenclature_row_change,
+            can_edit=self.nomenclature_editable,
         )
         self.nomenclature_table.grid(row=7, columnspan=3, pady=10, sticky="nsew")
         self.nomenclature_table.column(
@@ -1406,28 +3399,139 @@ class App:
             "Дата окончания": "datetime_format",
         }
 
-    def validate_and_import_data(self, data):
-        """Валидация данных перед загрузкой в таблицу"""
-        valid_data = []
-        errors = []
+    def validate_and_import_data(self, data, start=0):
+        """Проверка строк по столбцам; start — количество строк перед data"""
+        failed = {}  # Позиция строки -> (столбец, значение) первой ошибки
+
+        # ID должны быть целыми; поштучный разбор, только если столбец не прошёл
+        ids = [row[ID_COLUMN] for row in data]
+        if not all(map(str.isdecimal, ids)):
+            for i, value in enumerate(ids):
+                try:
+                    int(value)
+                except ValueError:
+                    failed[i] = (ID_COLUMN, value)
+
+        # Время/шт, если есть, должно быть числом; десятичные запятые заменяются
+        timed = [i for i, row in enumerate(data) if len(row) > TIME_COLUMN]
+        times = [data[i][TIME_COLUMN].replace(",", ".") for i in timed]
+        for i, value in zip(timed, times):
+            data[i][TIME_COLUMN] = value
+        try:
+            for _ in map(float, times):
+                pass
+        except ValueError:
+            for i, value in zip(timed, times):
+                try:
+                    float(value)
+                except ValueError:
+                    failed.setdefault(i, (TIME_COLUMN, value))
+
+        if not failed:
+            return data, []
+        valid_data = [row for i, row in enumerate(data) if i not in failed]
+        # (строка, столбец, значение) для ValidationReport
+        errors = [(start + i + 1, *failed[i]) for i in sorted(failed)]
+        return valid_data, errors
+
+    def start_bulk_load(self, loader, on_loaded, on_failed, snapshot=None):
+        """Чтение базы в рабочем потоке с опросом её строк, Esc отменяет загрузку"""
+        self.cancel_bulk_load()
+        self.bulk_load = (loader, on_loaded, on_failed, snapshot)
+        self.load_escape = self.root.bind("<Escape>", self.cancel_bulk_load, add="+")
+        loader.start()
+        self.load_job = self.root.after(LOAD_POLL_MS, self.poll_bulk_load)
+
+    def poll_bulk_load(self):
+        """Сбор готовых порций и прогресс в статусбаре"""
+        loader, on_loaded, on_failed, snapshot = self.bulk_load
+        try:
+            done = loader.collect()
+        except Exception as e:
+            self.cancel_bulk_load()
+            on_failed(e)
+            return
 
-        for i, row in enumerate(data):
-            try:
-                # Валидация 1-й колонки (должна быть целым числом)
-                int(row[0])
+        if not done:
+            self.statusbar.config(
+                text=f"Загрузка базы: {loader.progress:.0%}, записей: {len(loader.valid_data)} (Esc — отмена)"
+            )
+            self.load_job = self.root.after(LOAD_POLL_MS, self.poll_bulk_load)
+            return
+
+        self.cancel_bulk_load()
+        if snapshot is not None and not snapshot.current:
+            snapshot.save(loader.valid_data, loader.errors)
+        on_loaded(loader.valid_data, loader.errors, loader.prepared)
 
-                # Валидация 5-й колонки (замена запятой и проверка на float)
-                if len(row) > 4:
-                    row[4] = row[4].replace(",", ".")
-                    float(row[4])
+    def cancel_bulk_load(self, event=None):
+        """Остановка текущей загрузки, таблица остаётся прежней"""
+        if self.bulk_load is None:
+            return
+        self.root.after_cancel(self.load_job)
+        self.bulk_load[0].cancel()
+        self.bulk_load = None
+        self.load_job = None
+        # До Python 3.13 unbind с funcid снимает все привязки Esc; снимается только своя
+        script = self.root.bind("<Escape>").splitlines()
+        kept = [line for line in script if self.load_escape not in line]
+        self.root.bind("<Escape>", "\n".join(kept))
+        self.root.deletecommand(self.load_escape)
+        self.load_escape = None
+        self.update_statusbar()
 
-                # Если валидация успешна, добавляем строку в валидные данные
-                valid_data.append(row)
-            except Exception as e:
-                # Если ошибка — добавляем информацию в список ошибок
-                errors.append((i + 1, str(e)))
+    def load_database(self, file_path, delimiter, accept, on_loaded, on_failed):
+        """Фоновое чтение базы SQLite или CSV в таблицу номенклатуры
 
-        return valid_data, errors
+        accept(valid_data, errors) сообщает о прочитанном и возвращает, заменяет
+        ли оно таблицу, on_loaded(count) вызывается после замены, а
+        on_failed(error) сообщает о базе, которую не удалось прочитать.
+        """
+
+        def prepare(valid_data):
+            # Выполняется в потоке загрузчика, интерфейсу остаётся лишь подстановка
+            if not self.is_sqlite(file_path):
+                # Сохранения после последнего сжатия хранятся в журнале
+                valid_data = ChangeJournal(file_path).replay(valid_data)
+            return valid_data, NomenclatureIndex(valid_data)
+
+        def loaded(valid_data, errors, prepared):
+            if not accept(valid_data, errors):
+                return
+
+            valid_data, index = prepared
+            self.attach_database(file_path)
+            # Загрузка валидных данных в TreeView
+            self.nomenclature_table.clear_data()
+            self.nomenclature_table.insert_data(valid_data)
+            self.nomenclature_index = index
+            self.compact_journal()
+            self.current_file_path = file_path
+            self.update_detail_list()
+            self.is_data_modified = False
+            on_loaded(len(valid_data))
+
+        snapshot = None
+        try:
+            # Строки читаются и проверяются в рабочем потоке
+            if self.is_sqlite(file_path):
+                loader = SqliteLoader(file_path, self.validate_and_import_data, prepare)
+            else:
+                # Неизменённая база восстанавливается из снимка без разбора
+                snapshot = DatabaseSnapshot(file_path, self.encoding, delimiter)
+                loader = CsvLoader(
+                    file_path,
+                    delimiter,
+                    self.encoding,
+                    self.validate_and_import_data,
+                    prepare,
+                    snapshot,
+                )
+        except Exception as e:
+            on_failed(e)
+            return
+
+        self.start_bulk_load(loader, loaded, on_failed, snapshot)
 
     def load_database_silently(self, file_path=None, delimiter=","):
         """Загрузка базы данных без отображения ошибок"""
@@ -1435,43 +3539,47 @@ class App:
             return
 
         file_path = Path(file_path) if isinstance(file_path, str) else file_path
-        data = []
-        try:
-            with file_path.open(newline="", encoding=self.encoding) as csvfile:
-                reader = csv.reader(csvfile, delimiter=delimiter)
-                next(reader)  # Пропускаем заголовок
-                for row in reader:
-                    if row:
-                        data.append(row)
-        except FileNotFoundError:
-            print(f"Файл {file_path} не найден.")
-            return
-        except Exception as e:
-            print(f"Ошибка при загрузке файла: {e}")
-            return
 
-        # Проверка и валидация данных перед загрузкой в таблицу
-        valid_data, errors = self.validate_and_import_data(data)
+        def accept(valid_data, errors):
+            # Вывод сводки ошибок в консоль
+            if errors:
+                report = ValidationReport(errors)
+                print(f"Не импортировано строк: {len(errors)}\n{report.summary()}")
+                print("\n".join(report.page(0)))
 
-        # Вывод ошибок в консоль
-        if errors:
-            for error in errors:
-                print(f"Ошибка в строке {error[0]}: {error[1]}")
+            if not valid_data:
+                print("Все строки содержат ошибки.")
+                return False
 
-        if not valid_data:
-            print("Все строки содержат ошибки.")
-            return
+            if self.nomenclature_changes:
+                # Несохранённые изменения, сделанные до загрузки, сохраняются
+                messagebox.showwarning(
+                    "Предупреждение",
+                    f"{file_path} не загружен: "
+                    "в номенклатуре есть несохранённые изменения.",
+                )
+                return False
+            return True
 
-        # Загрузка валидных данных в TreeView
-        self.nomenclature_table.clear_data()
-        self.nomenclature_table.insert_data(valid_data)
-        self.update_detail_list()
-        self.is_data_modified = False
-        print(f"Успешно загружено {len(valid_data)} записей из {file_path}.")
+        def on_loaded(count):
+            print(f"Успешно загружено {count} записей из {file_path}.")
+
+        def on_failed(e):
+            if isinstance(e, FileNotFoundError):
+                print(f"Файл {file_path} не найден.")
+            else:
+                print(f"Ошибка при загрузке файла: {e}")
+
+        self.load_database(file_path, delimiter, accept, on_loaded, on_failed)
 
     def open_database(self):
-        """Открытие базы данных из CSV файла"""
-        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        """Открытие базы данных из файла CSV или SQLite"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[
+                ("CSV Files", "*.csv"),
+                ("Базы SQLite", " ".join(f"*{s}" for s in SQLITE_SUFFIXES)),
+            ]
+        )
         if not file_path:
             return  # Если пользователь отменил выбор файла
         file_path = Path(file_path)
@@ -1490,49 +3598,118 @@ class App:
         if not delimiter:
             return  # Если пользователь не ввел разделитель
 
-        data = []
-        try:
-            with file_path.open(newline="", encoding=self.encoding) as csvfile:
-                reader = csv.reader(csvfile, delimiter=delimiter)
-                header = next(reader)  # Пропускаем первую строку (заголовок)
-                for row in reader:
-                    if row:  # Проверка на пустую строку
-                        data.append(row)
-        except FileNotFoundError:
-            messagebox.showerror("Ошибка", "Указанный файл не найден.")
-            return
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Не удалось открыть файл: {e}")
-            return
+        def accept(valid_data, errors):
+            if not valid_data and not errors:
+                messagebox.showwarning(
+                    "Предупреждение", "Файл пустой или неправильно отформатирован."
+                )
+                return False
 
-        if not data:
-            messagebox.showwarning(
-                "Предупреждение", "Файл пустой или неправильно отформатирован."
+            # Обработка ошибок валидации: сводка, постраничный список и экспорт
+            if errors:
+                ImportErrorsWindow(
+                    self.root, ValidationReport(errors), self.encoding, delimiter
+                )
+                return False  # Прекращаем выполнение, если есть ошибки
+
+            return not self.nomenclature_changes or messagebox.askyesno(
+                "Несохранённые изменения",
+                "В номенклатуре есть несохранённые изменения. Отменить их и открыть файл?",
             )
-            return
 
-        # Валидация данных
-        valid_data, errors = self.validate_and_import_data(data)
+        def on_loaded(count):
+            self.tab_control.select(self.tab_nomenclature)
+            messagebox.showinfo("Успех", f"Успешно импортировано {count} записей.")
 
-        # Обработка ошибок валидации
-        if errors:
-            error_message = "\n".join(
-                [f"Ошибка в строке {i}: {error}" for i, error in errors]
-            )
-            messagebox.showerror(
-                "Ошибки при импорте", f"Обнаружены следующие ошибки:\n{error_message}"
-            )
-            return  # Прекращаем выполнение, если есть ошибки
+        def on_failed(e):
+            if isinstance(e, FileNotFoundError):
+                messagebox.showerror("Ошибка", "Указанный файл не найден.")
+            else:
+                messagebox.showerror("Ошибка", f"Не удалось открыть файл: {e}")
+
+        self.load_database(file_path, delimiter, accept, on_loaded, on_failed)
+
+    def is_sqlite(self, file_path):
+        """Открывается ли файл как база SQLite"""
+        return Path(file_path).suffix.lower() in SQLITE_SUFFIXES
+
+    def attach_database(self, file_path=None):
+        """Подключение базы SQLite или журнала CSV, откуда загружена номенклатура"""
+        # Сжатие, отложенное для прежней базы, к новой не относится
+        self.take_compaction()
+        if self.database is not None:
+            self.database.close()
+        self.database = None
+        self.journal = None
+        self.nomenclature_changes.clear()
+        if file_path and self.is_sqlite(file_path):
+            self.database = NomenclatureDatabase(file_path)
+        elif file_path:
+            self.journal = ChangeJournal(file_path)
+
+    def export_to_sqlite(self, file_path):
+        """Экспорт всей номенклатуры в базу SQLite"""
+        try:
+            database = NomenclatureDatabase(file_path)
+            try:
+                database.replace_all(self.nomenclature_table.data)
+            finally:
+                database.close()
+            return True
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось экспортировать данные: {e}")
+            return False
 
-        # Если валидация прошла, очищаем таблицу и добавляем валидные данные
-        self.nomenclature_table.clear_data()
-        self.tab_control.select(self.tab_nomenclature)
-        self.nomenclature_table.insert_data(valid_data)
-        self.current_file_path = file_path
-        self.update_detail_list()
-        messagebox.showinfo(
-            "Успех", f"Успешно импортировано {len(valid_data)} записей."
+    def save_changes(self):
+        """Запись строк, изменённых с последнего сохранения, в базу SQLite или журнал"""
+        try:
+            (self.database or self.journal).save(self.nomenclature_changes)
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить данные: {e}")
+            return False
+        self.nomenclature_changes.clear()
+        if self.journal is not None:
+            # Копия списка фиксирует сохранённое состояние, ведь строки неизменяемы;
+            # сжатие ждёт паузы между сохранениями
+            self.take_compaction()
+            self.compact_rows = list(self.nomenclature_table.data)
+            if self.journal.size >= JOURNAL_COMPACT_BYTES:
+                self.compact_journal()
+            else:
+                self.compact_job = self.root.after(
+                    JOURNAL_COMPACT_DELAY_MS, self.compact_journal
+                )
+        return True
+
+    def take_compaction(self):
+        """Отмена отложенного сжатия; возвращает строки, которые оно записало бы"""
+        if self.compact_job is not None:
+            self.root.after_cancel(self.compact_job)
+            self.compact_job = None
+        rows, self.compact_rows = self.compact_rows, None
+        return rows
+
+    def compact_journal(self):
+        """Перенос журнала открытой базы CSV в сам файл в фоновом потоке"""
+        rows = self.take_compaction()
+        if self.journal is None or not self.journal.size or not self.csv_separator:
+            return
+        if rows is None:
+            if self.nomenclature_changes:
+                return  # Несохранённые изменения не должны попасть в файл
+            rows = list(self.nomenclature_table.data)
+        started = self.journal.compact(
+            rows,
+            self.nomenclature_table["columns"],
+            self.csv_separator,
+            self.encoding,
         )
+        if not started:
+            # Предыдущее сжатие ещё идёт; повтор после новой паузы
+            self.compact_rows = rows
+            self.compact_job = self.root.after(
+                JOURNAL_COMPACT_DELAY_MS, self.compact_journal
+            )
 
     def export_to_csv(self, file_path):
         """Экспорт данных из Treeview в CSV файл"""
@@ -1547,17 +3724,22 @@ class App:
 
         if not delimiter:
             return  # Если пользователь не ввел разделитель
+        # Идущее сжатие не должно перезаписать экспорт
+        ChangeJournal.wait_for(file_path)
         try:
-            with file_path.open("w", newline="", encoding=self.encoding) as csvfile:
+            with AtomicFile(
+                file_path, backup=True, newline="", encoding=self.encoding
+            ) as csvfile:
                 writer = csv.writer(csvfile, delimiter=delimiter)
 
                 # Запись заголовков (если необходимо)
                 writer.writerow(self.nomenclature_table["columns"])
 
                 # Запись данных из Treeview
-                for row in self.nomenclature_table.get_children():
-                    writer.writerow(self.nomenclature_table.item(row)["values"])
+                writer.writerows(self.nomenclature_table.data)
 
+            # Экспорт уже содержит все изменения из журнала
+            ChangeJournal(file_path).clear()
             self.current_file_path = file_path
             return True  # Успешный экспорт
         except Exception as e:
@@ -1565,27 +3747,55 @@ class App:
             return False  # Неуспешный экспорт
 
     def save_to_database(self):
-        """Сохранение данных из Treeview в CSV файл"""
-        if self.current_file_path and self.current_file_path.exists():
+        """Сохранение данных из Treeview в открытую базу"""
+        if self.database is not None or self.journal is not None:
+            # Записываются только изменённые строки
+            success = self.save_changes()
+        elif self.current_file_path and self.current_file_path.exists():
             success = self.export_to_csv(self.current_file_path)
         else:
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".csv", filetypes=[("CSV files", "*.csv")]
-            )
-            if file_path:
-                success = self.export_to_csv(file_path)
-            else:
-                return  # Если пользователь отменил выбор файла, выходим из функции
+            self.save_database_as()
+            return
+
+        if success:
+            messagebox.showinfo("Успех", "Файл успешно сохранен.")
+            self.update_detail_list()
+            self.is_data_modified = False
+
+    def save_database_as(self):
+        """Сохранение данных в новый файл CSV или SQLite"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("Базы SQLite", " ".join(f"*{s}" for s in SQLITE_SUFFIXES)),
+            ],
+        )
+        if not file_path:
+            return  # Если пользователь отменил выбор файла, выходим из функции
+        file_path = Path(file_path)
+
+        if self.is_sqlite(file_path):
+            success = self.export_to_sqlite(file_path)
+        else:
+            success = self.export_to_csv(file_path)
 
         if success:
+            self.current_file_path = file_path
+            self.attach_database(file_path)
             messagebox.showinfo("Успех", "Файл успешно сохранен.")
             self.update_detail_list()
+            self.is_data_modified = False
 
     def close_database(self):
         """Закрытие базы данных"""
-        for item in self.nomenclature_table.get_children():
-            self.nomenclature_table.delete(item)
+        self.cancel_bulk_load()
+        self.compact_journal()
+        self.nomenclature_table.clear_rows()
+        self.nomenclature_index = NomenclatureIndex()
+        self.attach_database()
         self.current_file_path = ""
+        self.last_opened_file = ""
         self.update_detail_list()
 
     def import_tasks(self):
@@ -1605,8 +3815,12 @@ class App:
                 messagebox.showwarning("Ошибка", "Файл пустой.")
                 return
 
-            self.task_table.clear_data()
+            self.task_table.clear_rows()
+            self.tasks.clear()
+            self.task_columns = None
+            self.task_index.clear()
 
+            rows = []
             for _, row in df.iterrows():
                 # Получаем значения из строк как есть
                 start_date = row.get("Дата запуска", "")
@@ -1621,8 +3835,10 @@ class App:
                     start_date,
                     end_date,
                 ]
-                self.task_table.add_row(task_data)
+                rows.append(task_data)
+            self.task_table.add_rows(rows, notify=False)
 
+            self.highlight_conflicts()
             self.update_app()
             self.is_data_modified = False
             messagebox.showinfo("Успех", "Задачи успешно загружены.")
@@ -1635,7 +3851,8 @@ class App:
         """Сохранение данных в Excel файл"""
         file_path = Path(file_path)
         try:
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+            target = AtomicFile(file_path, "wb")
+            with target as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
                 # Если названия колонок не переданы, используем индексы по умолчанию
                 df = (
                     pd.DataFrame(data, columns=column_names)
@@ -1704,29 +3921,8 @@ class App:
             return
 
         file_path = Path(file_path)
-        data = []
-        for item in self.task_table.get_children():
-            (
-                _,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            data.append(
-                (
-                    detail,
-                    setup,
-                    machine,
-                    quantity,
-                    time_per_unit,
-                    start_datetime,
-                    end_datetime,
-                )
-            )
+        table = self.task_table
+        data = [table.data[index][1:] for index in table.view]
 
         # Передаем названия колонок
         column_names = [
@@ -1758,29 +3954,8 @@ class App:
         self.figure.savefig(image_path, bbox_inches="tight")
         plt.close()
 
-        data = []
-        for item in self.task_table.get_children():
-            (
-                _,
-                detail,
-                setup,
-                machine,
-                quantity,
-                time_per_unit,
-                start_datetime,
-                end_datetime,
-            ) = self.task_table.item(item, "values")
-            data.append(
-                [
-                    detail,
-                    setup,
-                    machine,
-                    quantity,
-                    time_per_unit,
-                    start_datetime,
-                    end_datetime,
-                ]
-            )
+        table = self.task_table
+        data = [list(table.data[index][1:]) for index in table.view]
 
         # Передаем названия колонок
         column_names = [
@@ -1816,6 +3991,12 @@ class App:
                 "Есть несохранённые изменения в базе данных. Вы действительно хотите выйти?",
             ):
                 return
+        if self.journal is not None:
+            # Сохранения переносятся в CSV до того, как выход остановит рабочие потоки
+            self.journal.wait()
+            self.compact_journal()
+        # Журналы ранее закрытых баз тоже могут ещё переноситься
+        ChangeJournal.wait_all()
         self.root.quit()
         self.root.destroy()
 
@@ -1894,22 +4075,26 @@ class App:
             )
             return
 
-        for child in self.nomenclature_table.get_children():
-            row_values = self.nomenclature_table.item(child, "values")
-
-            if (
-                row_values[1] == search_row[0]
-                and row_values[2] == search_row[1]
-                and row_values[3] == search_row[2]
-            ):
-                messagebox.showinfo(
-                    "Результат поиска", f"Найдена номенклатура: {row_values}"
-                )
-                self.time_entry.delete(0, tk.END)
-                self.time_entry.insert(0, row_values[4])
-                return
+        index = self.find_nomenclature(*search_row)
+        if index is None:
+            messagebox.showwarning("Результат поиска", "Номенклатура не найдена.")
+            return
 
-        messagebox.showwarning("Результат поиска", "Номенклатура не найдена.")
+        row_values = self.nomenclature_table.data[index]
+        messagebox.showinfo("Результат поиска", f"Найдена номенклатура: {row_values}")
+        self.time_entry.delete(0, tk.END)
+        self.time_entry.insert(0, row_values[4])
+
+    def fill_time_per_unit(self, event=None):
+        """Подстановка времени на штуку, как только деталь, установ и станок найдены"""
+        index = self.find_nomenclature(
+            self.detail_entry.get().strip(),
+            self.setup_entry.get().strip(),
+            self.machine_combo.get().strip(),
+        )
+        if index is not None:
+            self.time_entry.delete(0, tk.END)
+            self.time_entry.insert(0, self.nomenclature_table.data[index][4])
 
     def add_task(self):
         """Добавление задачи"""
@@ -1967,8 +4152,11 @@ class App:
 
     def clear_tasks(self):
         """Очистка задач"""
-        for item in self.task_table.get_children():
-            self.task_table.delete(item)
+        self.task_table.clear_rows()
+        self.tasks.clear()
+        self.task_columns = None
+        self.task_index.clear()
+        self.gantt.refresh()
         self.update_app()
 
     def add_nomenclature(self):
@@ -1981,44 +4169,33 @@ class App:
 
         if type_detail and drawing_number and setup and machine and time_per_unit:
             detail = f"{type_detail} {drawing_number}"
+            if not self.nomenclature_editable():
+                return
 
             # Проверяем наличие записи с такими же detail, setup и machine
-            for row_id in self.nomenclature_table.get_children():
-                values = self.nomenclature_table.item(row_id, "values")
-                existing_detail = values[1].strip()
-                existing_setup = values[2].strip()
-                existing_machine = values[3].strip()
-
-                if (
-                    existing_detail == detail
-                    and existing_setup == setup
-                    and existing_machine == machine
-                ):
-                    messagebox.showinfo(
-                        "Информация",
-                        f"Запись с такими данными уже существует под номером {self.nomenclature_table.index(row_id) + 1}",
-                    )
+            index = self.find_nomenclature(detail, setup, machine)
+            if index is not None:
+                messagebox.showinfo(
+                    "Информация",
+                    f"Запись с такими данными уже существует под номером {index + 1}",
+                )
 
-                    # Выделяем существующую запись
-                    self.nomenclature_table.selection_set(row_id)
-                    self.nomenclature_table.see(row_id)
-                    return
+                # Выделяем существующую запись
+                self.nomenclature_table.select_row(index)
+                return
 
             # Если такой записи нет, добавляем новую строку
             self.nomenclature_table.add_row([detail, setup, machine, time_per_unit])
-            self.update_detail_list()
         else:
             messagebox.showwarning("Внимание", "Пожалуйста, заполните все поля.")
 
     def edit_nomenclature(self):
         """Редактирование номенклатуры"""
         self.nomenclature_table.on_edit_row()
-        self.update_detail_list()
 
     def delete_nomenclature(self):
         """Удаление номенклатуры"""
         self.nomenclature_table.delete_row()
-        self.update_detail_list()
 
     def zoom(self, event):
         """Обработка события прокрутки мыши для изменения масштаба графика"""
@@ -2042,13 +4219,39 @@ class App:
         else:
             self.ax.xaxis.set_major_locator(mdates.DayLocator(interval=5))
             self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%d.%m.%Y"))
-        self.canvas.draw_idle()
 
-    def generate_colors(self, num_colors):
-        """Генерация цветов в формате HSV"""
-        return [
-            mcolors.hsv_to_rgb((i / num_colors, 0.8, 0.8)) for i in range(num_colors)
-        ]
+        # Во время прокрутки перерисовываются только бары и ось X
+        self.gantt.blit()
+        if self.zoom_job is not None:
+            self.root.after_cancel(self.zoom_job)
+        self.zoom_job = self.root.after(ZOOM_SETTLE_MS, self.stop_zoom)
+
+    def is_panning(self):
+        """Включён ли режим панорамирования панели инструментов"""
+        return self.toolbar.mode == "pan/zoom"
+
+    def start_pan(self, event):
+        """Блиттинг диаграммы, пока панель инструментов её сдвигает"""
+        if self.is_panning() and event.inaxes is self.ax:
+            self.gantt.start_blit()
+            # Панель подключает свой обработчик сдвига при нажатии, этот идёт после него
+            self.pan_motion = self.canvas.mpl_connect("motion_notify_event", self.pan)
+
+    def pan(self, event):
+        """Перерисовка баров и оси X после сдвига"""
+        self.gantt.blit()
+
+    def stop_pan(self, event):
+        """Завершение панорамирования полной перерисовкой"""
+        if self.pan_motion is not None:
+            self.canvas.mpl_disconnect(self.pan_motion)
+            self.pan_motion = None
+            self.gantt.stop_blit()
+
+    def stop_zoom(self):
+        """Завершение прокрутки полной перерисовкой диаграммы"""
+        self.zoom_job = None
+        self.gantt.stop_blit()
 
     def get_monday_at_midnight(self, reference_date):
         """Возвращает дату понедельника этой недели с установленным временем на 0:00."""